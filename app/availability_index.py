@@ -0,0 +1,141 @@
+import threading
+from datetime import datetime
+from typing import Dict, Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+# Times are stored as seconds; room codes are spread far enough apart that
+# (room, time) pairs can be packed into a single sortable int64 key
+_ROOM_SPAN = 1 << 34
+
+
+def _seconds(values) -> np.ndarray:
+    """Wall-clock seconds since the epoch; timezone-aware values keep their local time"""
+    index = pd.DatetimeIndex(values)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.values.astype('datetime64[s]').astype(np.int64)
+
+
+class AvailabilityIndex:
+    """In-memory per-room interval index of existing bookings.
+
+    Bookings are kept sorted by (room, start) together with a running maximum
+    of their end times, so whether any booking of a room overlaps a slot is one
+    binary search: take the last booking starting before the slot ends and
+    check whether the bookings up to it end after the slot starts. Overlapping
+    bookings are fine. New bookings go to a small unsorted buffer, merged into
+    the sorted arrays once it grows past ``merge_threshold``.
+    """
+
+    def __init__(self, slot_minutes: int = 60, merge_threshold: int = 1024):
+        self.slot_seconds = slot_minutes * 60
+        self.merge_threshold = merge_threshold
+        self._room_codes = {}
+        self._start_keys = np.empty(0, dtype=np.int64)
+        self._end_keys = np.empty(0, dtype=np.int64)
+        self._max_end_keys = np.empty(0, dtype=np.int64)
+        self._recent = []
+        self._code_cache = (None, None, 0)
+        self._lock = threading.Lock()
+        # Bumped on every change, so cached results can tell they are stale
+        self.version = 0
+
+    @classmethod
+    def from_bookings(cls, bookings: pd.DataFrame, **kwargs) -> 'AvailabilityIndex':
+        """Build from a frame with room_id, start_time and end_time columns"""
+        index = cls(**kwargs)
+        index.add_bookings(bookings['room_id'], bookings['start_time'], bookings['end_time'])
+        return index
+
+    @classmethod
+    def from_csv(cls, path: str, **kwargs) -> 'AvailabilityIndex':
+        """Build from a bookings CSV such as data/dataset.csv"""
+        bookings = pd.read_csv(path, usecols=['room_id', 'start_time', 'end_time'],
+                               parse_dates=['start_time', 'end_time'])
+        return cls.from_bookings(bookings, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self._start_keys) + len(self._recent)
+
+    def _codes(self, room_ids: Iterable) -> np.ndarray:
+        """Room code per room id, assigning codes to rooms seen for the first time"""
+        codes = self._room_codes
+        return np.array([codes.setdefault(room_id, len(codes)) for room_id in room_ids], dtype=np.int64)
+
+    def add_bookings(self, room_ids, start_times, end_times):
+        """Add many bookings at once and rebuild the sorted arrays"""
+        starts, ends = _seconds(start_times), _seconds(end_times)
+        with self._lock:
+            offsets = self._codes(room_ids) * _ROOM_SPAN
+            self._rebuild(np.concatenate([self._start_keys, offsets + starts]),
+                          np.concatenate([self._end_keys, offsets + ends]))
+
+    def add_booking(self, room_id: str, start_time: datetime, end_time: datetime):
+        """Record one new booking; cheap, merged into the sorted arrays in bulk later"""
+        start, end = _seconds([start_time, end_time])
+        with self._lock:
+            offset = self._codes([room_id])[0] * _ROOM_SPAN
+            self._recent.append((offset + start, offset + end))
+            if len(self._recent) >= self.merge_threshold:
+                self._rebuild(self._start_keys, self._end_keys)
+            else:
+                self.version += 1
+
+    def _rebuild(self, start_keys: np.ndarray, end_keys: np.ndarray):
+        if self._recent:
+            recent = np.array(self._recent, dtype=np.int64)
+            start_keys = np.concatenate([start_keys, recent[:, 0]])
+            end_keys = np.concatenate([end_keys, recent[:, 1]])
+            self._recent = []
+        order = np.argsort(start_keys, kind='stable')
+        self._start_keys = start_keys[order]
+        self._end_keys = end_keys[order]
+        # Keys of a room are above all keys of lower rooms, so one running max serves every room
+        self._max_end_keys = np.maximum.accumulate(self._end_keys) if len(order) else self._end_keys
+        self.version += 1
+
+    def _lookup_codes(self, room_ids: np.ndarray) -> np.ndarray:
+        """Room codes for a room array, -1 for rooms without bookings; reused while rooms are unchanged"""
+        cached_ids, cached_codes, n_rooms = self._code_cache
+        if cached_ids is room_ids and n_rooms == len(self._room_codes):
+            return cached_codes
+        codes = np.array([self._room_codes.get(room_id, -1) for room_id in room_ids], dtype=np.int64)
+        self._code_cache = (room_ids, codes, len(self._room_codes))
+        return codes
+
+    def busy_grid(self, room_ids: np.ndarray, slot_starts, rooms: np.ndarray = None) -> np.ndarray:
+        """(slots x rooms) mask, True where the room has a booking overlapping the slot.
+
+        ``rooms`` optionally selects a subset of ``room_ids`` by position.
+        """
+        slot_starts = _seconds(slot_starts)[:, None]
+        with self._lock:
+            codes = self._lookup_codes(room_ids)
+            if rooms is not None:
+                codes = codes[rooms]
+            start_keys, max_end_keys, recent = self._start_keys, self._max_end_keys, list(self._recent)
+
+        slot_start_keys = codes * _ROOM_SPAN + slot_starts
+        slot_end_keys = slot_start_keys + self.slot_seconds
+
+        busy = np.zeros(slot_start_keys.shape, dtype=bool)
+        if len(start_keys):
+            last = np.searchsorted(start_keys, slot_end_keys, side='left') - 1
+            busy = (last >= 0) & (max_end_keys[np.maximum(last, 0)] > slot_start_keys)
+        if recent:
+            recent = np.array(recent, dtype=np.int64)
+            busy |= ((recent[:, 0] < slot_end_keys[..., None]) &
+                     (recent[:, 1] > slot_start_keys[..., None])).any(axis=-1)
+        return busy & (codes >= 0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'bookings': len(self),
+            'rooms': len(self._room_codes),
+            'pending_merge': len(self._recent),
+            'version': self.version,
+            'slot_minutes': self.slot_seconds // 60,
+        }
@@ -0,0 +1,166 @@
+import numpy as np
+
+# With the 'auto' backend, larger matrices go to predict_proba, whose per-call
+# overhead is amortized by then. This is the break-even of a 100-tree forest;
+# the service measures it for every model it loads
+COMPILED_MAX_ROWS = 256
+
+
+class CompiledForest:
+    """Array-backed evaluator for a fitted sklearn RandomForestClassifier.
+
+    All trees are flattened into one set of contiguous node arrays, with tree
+    ``t`` rooted at ``roots[t]``. ``children`` interleaves the left and right
+    child of every node, and leaves point to themselves, so prediction is a
+    vectorized walk of every (tree, row) pair down to its leaf followed by a
+    mean of the leaf class distributions over trees.
+    """
+
+    # Levels descended between two removals of finished (tree, row) pairs
+    LEVELS_PER_PASS = 2
+
+    # Node arrays saved by to_arrays and accepted by from_arrays
+    ARRAY_NAMES = ('feature', 'threshold', 'children', 'value', 'roots', 'classes', 'is_leaf')
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, classes: np.ndarray,
+                 n_features: int, is_leaf: np.ndarray = None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+        self.is_leaf = is_leaf if is_leaf is not None else children[0::2] == np.arange(len(feature))
+        # Upper bound of the right branch, set for compact input (see with_compact_input)
+        self.upper = None
+
+    @classmethod
+    def from_sklearn(cls, model) -> 'CompiledForest':
+        """Flatten the trees of a fitted forest classifier"""
+        estimators = getattr(model, 'estimators_', None)
+        if not estimators:
+            raise ValueError("Model is not a fitted tree ensemble")
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("Multi-output forests are not supported")
+
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+
+            roots.append(offset)
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            children.append(np.column_stack([
+                np.where(leaf, node_ids, tree.children_left),
+                np.where(leaf, node_ids, tree.children_right),
+            ]).ravel() + offset)
+
+            value = tree.value[:, 0, :].astype(np.float64)
+            values.append(value / value.sum(axis=1, keepdims=True))
+            offset += tree.node_count
+
+        if offset >= np.iinfo(np.int32).max // 2:
+            raise ValueError("Forest has too many nodes for 32-bit node indices")
+
+        return cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=cls._float32_thresholds(np.concatenate(thresholds)),
+            children=np.concatenate(children).astype(np.int32),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=np.asarray(model.classes_),
+            n_features=model.n_features_in_,
+        )
+
+    def to_arrays(self) -> dict:
+        """Node arrays by name, for saving as .npy files"""
+        return {
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'children': self.children,
+            'value': self.value,
+            'roots': self.roots,
+            'classes': self.classes_,
+            'is_leaf': self.is_leaf,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, n_features: int) -> 'CompiledForest':
+        """Rebuild a forest from node arrays, e.g. read-only memory maps"""
+        return cls(n_features=n_features, **{name: arrays[name] for name in cls.ARRAY_NAMES})
+
+    def with_compact_input(self, slot: np.ndarray, match: np.ndarray) -> 'CompiledForest':
+        """The same forest reading compact matrices from FeatureCompiler(compact=True).
+
+        ``slot`` and ``match`` come from FeatureCompiler.column_slots. A split
+        on a one-hot column sends the row right when its compact column holds
+        that column's position ``m``, i.e. when ``m - 1 < x <= m`` as positions
+        are integers; other splits keep ``x > threshold`` with no upper bound.
+        """
+        match = np.take(match, self.feature)
+        one_hot = (match >= 0) & ~self.is_leaf
+        forest = CompiledForest(np.take(slot, self.feature).astype(np.int32),
+                                np.where(one_hot, match - 1, self.threshold).astype(np.float32),
+                                self.children, self.value, self.roots, self.classes_,
+                                n_features=int(slot.max()) + 1, is_leaf=self.is_leaf)
+        forest.upper = np.where(one_hot, match, np.inf).astype(np.float32)
+        return forest
+
+    @staticmethod
+    def _float32_thresholds(threshold: np.ndarray) -> np.ndarray:
+        """Largest float32 not above each threshold.
+
+        sklearn compares float32 inputs against float64 thresholds; for a float32
+        ``x``, ``x <= t`` holds exactly when ``x`` is at most the largest float32
+        that does not exceed ``t``, so the comparison can stay in float32.
+        """
+        threshold32 = threshold.astype(np.float32)
+        rounded_up = threshold32.astype(np.float64) > threshold
+        threshold32[rounded_up] = np.nextafter(threshold32[rounded_up], np.float32(-np.inf))
+        return threshold32
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node reached by every row in every tree, shape (n_trees, n_rows)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+
+        # One entry per (tree, row) pair still descending; offsets into flat_X are intp, rows x features can pass 2**31
+        node = np.repeat(self.roots, n_rows)
+        row_offset = np.tile(np.arange(n_rows, dtype=np.intp) * n_features, self.n_estimators)
+        position = np.arange(node.size)
+        leaves = np.empty(node.size, dtype=np.int32)
+
+        while node.size:
+            for _ in range(self.LEVELS_PER_PASS):
+                x = np.take(flat_X, row_offset + np.take(self.feature, node))
+                right = x > np.take(self.threshold, node)
+                if self.upper is not None:
+                    right &= x <= np.take(self.upper, node)
+                node = np.take(self.children, 2 * node + right)
+
+            done = np.take(self.is_leaf, node)
+            if done.any():
+                leaves[position[done]] = node[done]
+                pending = ~done
+                node, row_offset, position = node[pending], row_offset[pending], position[pending]
+
+        return leaves.reshape(self.n_estimators, n_rows)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Mean class probabilities over all trees, like RandomForestClassifier.predict_proba"""
+        leaves = self.apply(X)
+        proba = np.zeros((leaves.shape[1], self.value.shape[1]), dtype=np.float64)
+        for tree_leaves in leaves:
+            proba += np.take(self.value, tree_leaves, axis=0)
+        proba /= self.n_estimators
+        return proba
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from typing import Dict, Any, Tuple
+
+
+class FeatureCompiler:
+    """Assemble the model input matrix straight from candidate columns.
+
+    Built once from the fitted encoder and ``model_info.json``, it produces the
+    same matrix as ``encoder.transform`` + ``pd.concat`` at serving time: every
+    one-hot category and numerical feature gets a fixed column offset, and the
+    part of each row that only depends on the room is precomputed per room.
+
+    With ``compact``, each categorical feature takes a single column holding
+    the one-hot position of its category (-1 when unknown) instead of a block
+    of one-hot columns, so the width is the number of features however many
+    users there are. CompiledForest.with_compact_input reads such matrices and
+    ``expand`` turns one back into the one-hot matrix, as a sparse one.
+    """
+
+    def __init__(self, encoder, feature_info: Dict[str, Any], room_columns: Dict[str, np.ndarray],
+                 compact: bool = False):
+        if getattr(encoder, 'drop', None) is not None:
+            raise ValueError("Encoders with dropped categories are not supported")
+        if getattr(encoder, 'min_frequency', None) is not None or \
+                getattr(encoder, 'max_categories', None) is not None:
+            raise ValueError("Encoders with infrequent categories are not supported")
+
+        cat_features = feature_info['categorical_features']
+        num_features = [f for f in feature_info['features'] if f not in cat_features]
+        self.ignore_unknown = encoder.handle_unknown != 'error'
+        self.feature_names = list(encoder.get_feature_names_out(cat_features)) + num_features
+        self.n_model_features = len(self.feature_names)
+        self.compact = compact
+        # Positions are stored as float32 by the compiled forest
+        if compact and self.n_model_features >= 2 ** 24:
+            raise ValueError("Too many one-hot columns for a compact feature matrix")
+
+        # One-hot column of every known category, per categorical feature
+        self.category_offsets = {}
+        offset = 0
+        for name, categories in zip(cat_features, encoder.categories_):
+            self.category_offsets[name] = {value: offset + i for i, value in enumerate(categories)}
+            offset += len(categories)
+        self._numeric_positions = np.arange(offset, self.n_model_features)
+        if compact:
+            self.category_slots = {name: i for i, name in enumerate(cat_features)}
+            self.numeric_offsets = {name: len(cat_features) + i for i, name in enumerate(num_features)}
+            self.n_features = len(cat_features) + len(num_features)
+        else:
+            self.numeric_offsets = {name: offset + i for i, name in enumerate(num_features)}
+            self.n_features = self.n_model_features
+
+        # Features fixed by the room are written once per room into a block holding only the columns they touch
+        self.room_features = [name for name in room_columns if name in feature_info['features']]
+        n_rooms = len(next(iter(room_columns.values()))) if room_columns else 0
+        room_rows, room_cols, room_values = [], [], []
+        for name in self.room_features:
+            if name in self.category_offsets:
+                cols, values = self._category_entries(name, room_columns[name])
+            else:
+                cols = np.full(n_rooms, self.numeric_offsets[name], dtype=np.intp)
+                values = np.asarray(room_columns[name], dtype=np.float64)
+            written = cols >= 0
+            room_rows.append(np.flatnonzero(written))
+            room_cols.append(cols[written])
+            room_values.append(values[written])
+        self.room_columns = np.unique(np.concatenate(room_cols)) if room_cols else np.empty(0, dtype=np.intp)
+        self.room_block = np.zeros((n_rooms, len(self.room_columns)), dtype=np.float64)
+        if room_cols:
+            self.room_block[np.concatenate(room_rows),
+                            np.searchsorted(self.room_columns, np.concatenate(room_cols))] = np.concatenate(room_values)
+
+        self.request_features = [f for f in feature_info['features'] if f not in self.room_features]
+
+    def _category_columns(self, name: str, values) -> np.ndarray:
+        """One-hot column for each value, -1 for unknown categories"""
+        offsets = self.category_offsets[name]
+        cols = np.array([offsets.get(value, -1) for value in np.atleast_1d(values)], dtype=np.intp)
+        if not self.ignore_unknown and (cols < 0).any():
+            unknown = np.atleast_1d(values)[cols < 0][0]
+            raise ValueError(f"Found unknown category {unknown!r} in column {name!r} during transform")
+        return cols
+
+    def _category_entries(self, name: str, values) -> Tuple[np.ndarray, np.ndarray]:
+        """Output column and value written for each category value; nothing is written where the column is -1"""
+        cols = self._category_columns(name, values)
+        if self.compact:
+            return np.full(len(cols), self.category_slots[name], dtype=np.intp), cols.astype(np.float64)
+        return cols, np.ones(len(cols))
+
+    def compile(self, columns: Dict[str, Any], out: np.ndarray = None) -> np.ndarray:
+        """Build the feature matrix for a candidate block.
+
+        ``columns`` holds ``room_index`` (one row per candidate) plus every
+        non-room feature, either as a scalar shared by all candidates or as a
+        per-candidate array. Rows are written into ``out`` when given.
+        """
+        room_index = columns['room_index']
+        if out is None:
+            out = np.zeros((len(room_index), self.n_features), dtype=np.float64)
+        else:
+            out[...] = 0.0
+        out[:, self.room_columns] = np.take(self.room_block, room_index, axis=0)
+
+        for name in self.request_features:
+            value = columns[name]
+            if name in self.category_offsets:
+                cols, values = self._category_entries(name, value)
+                if np.ndim(value) == 0:
+                    if cols[0] >= 0:
+                        out[:, cols[0]] = values[0]
+                else:
+                    rows = np.flatnonzero(cols >= 0)
+                    out[rows, cols[rows]] = values[rows]
+            else:
+                out[:, self.numeric_offsets[name]] = value
+        return out
+
+    def column_slots(self) -> Tuple[np.ndarray, np.ndarray]:
+        """For every one-hot matrix column, the compact column holding it and the position it
+        stands for (-1 for numerical columns, which are copied as they are)"""
+        n_categorical = len(self.category_offsets)
+        slot = np.empty(self.n_model_features, dtype=np.intp)
+        match = np.full(self.n_model_features, -1, dtype=np.intp)
+        for name, offsets in self.category_offsets.items():
+            positions = np.fromiter(offsets.values(), dtype=np.intp, count=len(offsets))
+            slot[positions] = self.category_slots[name]
+            match[positions] = positions
+        slot[self._numeric_positions] = n_categorical + np.arange(len(self._numeric_positions))
+        return slot, match
+
+    def expand(self, X: np.ndarray) -> sp.csr_matrix:
+        """The float32 one-hot matrix of a compact matrix, as CSR"""
+        n_rows = len(X)
+        n_categorical = len(self.category_offsets)
+        cols = np.hstack([X[:, :n_categorical].astype(np.intp),
+                          np.broadcast_to(self._numeric_positions, (n_rows, len(self._numeric_positions)))])
+        values = np.hstack([np.ones((n_rows, n_categorical), dtype=np.float32),
+                            np.asarray(X[:, n_categorical:], dtype=np.float32)])
+        # Categorical blocks come before the numerical columns, so each row's columns are sorted
+        kept = cols >= 0
+        indptr = np.concatenate([[0], np.cumsum(kept.sum(axis=1))])
+        return sp.csr_matrix((values[kept], cols[kept], indptr), shape=(n_rows, self.n_model_features))
+
+    def to_frame(self, X: np.ndarray) -> pd.DataFrame:
+        """Wrap a compiled matrix with the column names the model was fitted on"""
+        return pd.DataFrame(X, columns=self.feature_names, copy=False)
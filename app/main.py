@@ -1,41 +1,171 @@
+import hmac
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
 from typing import Optional
-from fastapi import FastAPI, HTTPException, Query
-from recommendation_service import RecommendationService
+from fastapi import BackgroundTasks, Depends, FastAPI, Header, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, PlainTextResponse
+from json_response import FastJSONResponse
+from micro_batcher import MicroBatcher
+from metrics import ServingMetrics, SampledProfiler
 import traceback
-from schema import RecommendRequest
+from schema import RecommendRequest, BatchRecommendRequest, BookingEvent
 
-app = FastAPI()
+# Artifact folders; unset means models/, model_info/ and encoder/ at the repository root
+MODELS_DIR = os.environ.get('MODELS_DIR')
+MODEL_INFO_DIR = os.environ.get('MODEL_INFO_DIR')
+ENCODER_DIR = os.environ.get('ENCODER_DIR')
+# Seconds between checks for newly trained artifacts, 0 disables the watcher
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', '0'))
+# How long /recommend waits to gather concurrent requests into one model call, 0 disables batching
+RECOMMEND_BATCH_WINDOW_MS = float(os.environ.get('RECOMMEND_BATCH_WINDOW_MS', '2'))
+RECOMMEND_MAX_BATCH_SIZE = int(os.environ.get('RECOMMEND_MAX_BATCH_SIZE', '32'))
+# Recommendation cache bounds, a size of 0 disables caching
+RECOMMEND_CACHE_SIZE = int(os.environ.get('RECOMMEND_CACHE_SIZE', '1024'))
+RECOMMEND_CACHE_TTL = float(os.environ.get('RECOMMEND_CACHE_TTL', '30'))
+# Bookings CSV (room_id, start_time, end_time) used to skip slots that are already taken
+AVAILABILITY_BOOKINGS_CSV = os.environ.get('AVAILABILITY_BOOKINGS_CSV')
+AVAILABILITY_SLOT_MINUTES = int(os.environ.get('AVAILABILITY_SLOT_MINUTES', '60'))
+# Drop rooms that are too small or lack what the purpose needs before scoring
+ROOM_PREFILTER = os.environ.get('ROOM_PREFILTER', '1') == '1'
+PURPOSE_REQUIREMENTS_FILE = os.environ.get('PURPOSE_REQUIREMENTS_FILE')
+ROOM_MAX_UTILIZATION = float(os.environ.get('ROOM_MAX_UTILIZATION', '1.0'))
+# Answer requests from the materialized score table (scripts/materialize_scores.py) when the model has one
+SCORE_LOOKUP = os.environ.get('SCORE_LOOKUP', '0') == '1'
+# 'fast' renders responses with orjson when installed (compact json.dumps otherwise), 'standard' keeps FastAPI's encoder
+JSON_RESPONSE = os.environ.get('JSON_RESPONSE', 'fast')
+ResponseClass = FastJSONResponse if JSON_RESPONSE == 'fast' else JSONResponse
+# Fraction of scoring calls run under cProfile, dumped as .prof files to PROFILE_DIR; 0 disables profiling
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(os.path.dirname(__file__), '..', 'logs', 'profiles'))
+# Load artifacts on a background thread so the server accepts connections right away; /readyz tells when it is done
+BACKGROUND_LOADING = os.environ.get('BACKGROUND_LOADING', '1') == '1'
+# Full-day requests scored after loading and before reporting ready, 0 skips the warm-up
+WARMUP_REQUESTS = int(os.environ.get('WARMUP_REQUESTS', '4'))
+# When set, endpoints that change serving state (/admin/*, POST /bookings) require it in the X-Admin-Token
+# header; unset leaves them open to any client
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
 
+serving_metrics = ServingMetrics()
 
-try:
-    recommendation_service = RecommendationService()
-except Exception as e:
-    print(f"Failed to initialize recommendation service: {str(e)}")
-    recommendation_service = None
+# Set by load_service once the artifacts are loaded and warmed up
+recommendation_service = None
+model_watcher = None
+startup_status = {'state': 'starting', 'error': None, 'load_seconds': None, 'warmup_seconds': None}
 
+micro_batcher = MicroBatcher(None, RECOMMEND_BATCH_WINDOW_MS, RECOMMEND_MAX_BATCH_SIZE)
+
+
+def load_service():
+    """Build and warm up the recommendation service, then start serving with it.
+
+    pandas, scikit-learn and the model artifacts are only imported and loaded
+    here, so importing this module and answering /healthz stay fast.
+    """
+    global recommendation_service, model_watcher
+    started = time.perf_counter()
+    try:
+        from recommendation_service import RecommendationService
+        from recommendation_cache import RecommendationCache
+        from availability_index import AvailabilityIndex
+        from room_index import load_purpose_requirements
+
+        availability_index = None
+        if AVAILABILITY_BOOKINGS_CSV:
+            availability_index = AvailabilityIndex.from_csv(AVAILABILITY_BOOKINGS_CSV,
+                                                            slot_minutes=AVAILABILITY_SLOT_MINUTES)
+        service = RecommendationService(
+            models_dir=MODELS_DIR,
+            info_dir=MODEL_INFO_DIR,
+            encoder_dir=ENCODER_DIR,
+            inference_backend=os.environ.get('INFERENCE_BACKEND', 'sklearn'),
+            cache=RecommendationCache(RECOMMEND_CACHE_SIZE, RECOMMEND_CACHE_TTL),
+            availability=availability_index,
+            purpose_requirements=load_purpose_requirements(PURPOSE_REQUIREMENTS_FILE) if ROOM_PREFILTER else None,
+            max_utilization=ROOM_MAX_UTILIZATION,
+            metrics=serving_metrics,
+            score_lookup=SCORE_LOOKUP,
+            profiler=SampledProfiler(PROFILE_SAMPLE_RATE, PROFILE_DIR) if PROFILE_SAMPLE_RATE > 0 else None
+        )
+        startup_status['load_seconds'] = round(time.perf_counter() - started, 3)
+
+        if WARMUP_REQUESTS > 0:
+            warmup_started = time.perf_counter()
+            service.warm_up(WARMUP_REQUESTS)
+            startup_status['warmup_seconds'] = round(time.perf_counter() - warmup_started, 3)
+    except Exception as e:
+        print(f"Failed to initialize recommendation service: {str(e)}")
+        print(traceback.format_exc())
+        startup_status.update(state='failed', error=str(e))
+        return
+
+    micro_batcher.service = service
+    recommendation_service = service
+    if MODEL_WATCH_INTERVAL > 0:
+        from model_watcher import ModelWatcher
+        model_watcher = ModelWatcher(service, MODEL_WATCH_INTERVAL)
+        model_watcher.start()
+    startup_status['state'] = 'ready'
+    print(f"✅ Ready to serve after {time.perf_counter() - started:.2f}s")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if BACKGROUND_LOADING:
+        threading.Thread(target=load_service, name='service-loader', daemon=True).start()
+    else:
+        load_service()
+    yield
+    if model_watcher is not None:
+        model_watcher.stop()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ResponseClass)
+
+
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving HTTP, whether or not artifacts are loaded"""
+    return {'success': True, 'status': 'alive'}
+
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: artifacts are loaded and warmed up, 503 until then"""
+    if recommendation_service is None:
+        return ResponseClass({'success': False, 'status': startup_status['state'], 'startup': startup_status},
+                             status_code=503)
+
+    return {
+        'success': True,
+        'status': 'ready',
+        'startup': startup_status,
+        'model': recommendation_service.model_version,
+    }
 
 
 @app.post("/recommend")
-def get_recommendations(req: RecommendRequest):
+async def get_recommendations(req: RecommendRequest):
     """Get slot recommendations"""
+    started = time.perf_counter()
     try:
         if recommendation_service is None:
             raise HTTPException(status_code=500, detail="Service Not Initialized")
 
-        recommendations = recommendation_service.recommend_slots(
-            user_id=req.user_id,
-            purpose=req.purpose,
-            attendees=req.attendees,
-            target_date=req.target_date,
-            target_hours=req.target_hours,
-            top_k=req.top_k
-        )
+        recommendations = await micro_batcher.submit(req.model_dump())
 
-        return {
+        # Records are plain Python values already, so skip FastAPI's jsonable_encoder pass
+        serialize_started = time.perf_counter()
+        response = ResponseClass({
             'success': True,
             'recommendations': recommendations,
             'total_recommendations': len(recommendations),
-        }
+        })
+        serving_metrics.request_seconds.observe(
+            serving_metrics.observe_stage('serialization', serialize_started) - started, '/recommend')
+        return response
 
     except Exception as e:
         print(f"Error in recommendation endpoint: {str(e)}")
@@ -43,6 +173,113 @@ def get_recommendations(req: RecommendRequest):
         raise HTTPException(status_code=500, detail=f"*internal Server Error: {str(e)}")
 
 
+@app.post("/recommend/batch")
+def get_batch_recommendations(req: BatchRecommendRequest):
+    """Get slot recommendations for several booking requests in one model call"""
+    started = time.perf_counter()
+    try:
+        if recommendation_service is None:
+            raise HTTPException(status_code=500, detail="Service Not Initialized")
+
+        results = recommendation_service.recommend_batch([item.model_dump() for item in req.requests])
+
+        serialize_started = time.perf_counter()
+        response = ResponseClass({
+            'success': True,
+            'results': results,
+            'total_requests': len(results),
+        })
+        serving_metrics.request_seconds.observe(
+            serving_metrics.observe_stage('serialization', serialize_started) - started, '/recommend/batch')
+        return response
+
+    except Exception as e:
+        print(f"Error in batch recommendation endpoint: {str(e)}")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"*internal Server Error: {str(e)}")
+
+
+def reload_model():
+    try:
+        recommendation_service.load_model_artifacts()
+    except Exception as e:
+        print(f"Model reload failed, keeping current model: {str(e)}")
+
+
+def check_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Dependency of the endpoints that change serving state"""
+    if ADMIN_TOKEN and not hmac.compare_digest((x_admin_token or '').encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.post("/admin/reload", status_code=202, dependencies=[Depends(check_admin_token)])
+def trigger_model_reload(background_tasks: BackgroundTasks, response: Response, wait: bool = Query(False)):
+    """Load the latest model artifacts and swap them in once validated.
+
+    Answers 202 once the reload is scheduled, or 200 with ``wait`` once it is done.
+    """
+    if recommendation_service is None:
+        raise HTTPException(status_code=500, detail="Service not initialized")
+
+    if not wait:
+        background_tasks.add_task(reload_model)
+        return {'success': True, 'status': 'reload scheduled'}
+
+    try:
+        version = recommendation_service.load_model_artifacts()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model reload failed: {str(e)}")
+
+    response.status_code = 200
+    return {'success': True, 'status': 'reloaded', 'model': version}
+
+
+@app.get("/model/version")
+def get_model_version():
+    """Model version currently serving requests"""
+    if recommendation_service is None:
+        raise HTTPException(status_code=500, detail="Service not initialized")
+
+    return {
+        'success': True,
+        'model': recommendation_service.model_version,
+        'last_reload': recommendation_service.last_reload,
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Per-stage latency, candidate count, batch size and model load histograms in the Prometheus text format"""
+    return PlainTextResponse(serving_metrics.render(), media_type='text/plain; version=0.0.4')
+
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    """Recommendation cache size and hit/miss counters"""
+    if recommendation_service is None or recommendation_service.cache is None:
+        raise HTTPException(status_code=500, detail="Service not initialized")
+
+    return {
+        'success': True,
+        'cache': recommendation_service.cache.stats(),
+    }
+
+
+@app.post("/bookings", dependencies=[Depends(check_admin_token)])
+def add_booking(booking: BookingEvent):
+    """Record a new booking so its slot is no longer recommended"""
+    if recommendation_service is None or recommendation_service.availability is None:
+        raise HTTPException(status_code=500, detail="Availability index not initialized")
+
+    availability = recommendation_service.availability
+    availability.add_booking(booking.room_id, booking.start_time, booking.end_time)
+
+    return {
+        'success': True,
+        'availability': availability.stats(),
+    }
+
+
 @app.get("/room")
 def get_room(room_id: Optional[str] = Query(None)):
     try:
@@ -0,0 +1,130 @@
+import bisect
+import cProfile
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Sequence
+
+
+# Seconds; the serving stages run from tens of microseconds to a few hundred milliseconds
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+LOAD_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with an optional single label, rendered in the Prometheus text format"""
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float], label_name: str = None):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.label_name = label_name
+        # label value -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, label: str = None):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label)
+            if series is None:
+                series = self._series[label] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {label: (list(counts), total) for label, (counts, total) in self._series.items()}
+        for label, (counts, total) in sorted(series.items(), key=lambda item: item[0] or ''):
+            prefix = f'{self.label_name}="{label}",' if self.label_name else ''
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            labels = f'{{{prefix.rstrip(",")}}}' if prefix else ''
+            lines.append(f"{self.name}_sum{labels} {total!r}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class ServingMetrics:
+    """Latency and size histograms for the recommendation serving path.
+
+    Recording one value is a bisect and a short locked update, cheap enough to
+    leave on for every request.
+    """
+
+    def __init__(self):
+        self.stage_seconds = Histogram(
+            'recommend_stage_seconds',
+            'Time spent in each stage of the recommendation path',
+            LATENCY_BUCKETS, 'stage')
+        self.request_seconds = Histogram(
+            'recommend_request_seconds',
+            'Time spent handling a recommendation endpoint, serialization included',
+            LATENCY_BUCKETS, 'endpoint')
+        self.candidates = Histogram(
+            'recommend_candidates',
+            'Candidate slots scored per request',
+            SIZE_BUCKETS)
+        self.batch_size = Histogram(
+            'recommend_batch_size',
+            'Requests scored together in one model call',
+            SIZE_BUCKETS)
+        self.model_load_seconds = Histogram(
+            'model_load_seconds',
+            'Time to load and validate model artifacts, by outcome',
+            LOAD_BUCKETS, 'outcome')
+        self._histograms = [self.stage_seconds, self.request_seconds, self.candidates,
+                            self.batch_size, self.model_load_seconds]
+
+    def observe_stage(self, stage: str, started: float) -> float:
+        """Record the time since ``started`` (a perf_counter value) for a stage; returns now"""
+        now = time.perf_counter()
+        self.stage_seconds.observe(now - started, stage)
+        return now
+
+    def render(self) -> str:
+        lines = []
+        for histogram in self._histograms:
+            lines.extend(histogram.render())
+        return '\n'.join(lines) + '\n'
+
+
+class SampledProfiler:
+    """Run cProfile on a random sample of calls and dump each profile to a .prof file.
+
+    Only one call is profiled at a time; calls that arrive meanwhile run unprofiled.
+    Open the dumps with ``python -m pstats`` or snakeviz.
+    """
+
+    def __init__(self, sample_rate: float, output_dir: str):
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self._active = threading.Lock()
+        self._count = 0
+
+    @contextmanager
+    def profile(self, name: str):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate or not self._active.acquire(blocking=False):
+            yield
+            return
+
+        try:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                self._count += 1
+                os.makedirs(self.output_dir, exist_ok=True)
+                path = os.path.join(self.output_dir, f"{name}_{time.strftime('%Y-%m-%d_%H-%M-%S')}_{self._count}.prof")
+                profiler.dump_stats(path)
+        finally:
+            self._active.release()
@@ -0,0 +1,75 @@
+import asyncio
+from typing import List, Dict, Any
+
+
+class MicroBatcher:
+    """Coalesce concurrent recommendation requests into shared inference calls.
+
+    Requests arriving within ``window_ms`` of the first queued one, up to
+    ``max_batch_size`` of them, are scored together with a single
+    ``RecommendationService.recommend_many`` call on a worker thread. When
+    nothing is queued or running, a request skips the window and is scored
+    straight away, so an idle service pays no batching delay.
+    """
+
+    def __init__(self, service, window_ms: float = 2.0, max_batch_size: int = 32):
+        self.service = service
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._pending = []
+        self._timer = None
+        self._in_flight = 0
+        self._tasks = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0 and self.max_batch_size > 1
+
+    async def submit(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Recommendations for one request; raises the error that stopped it"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        if not self.enabled or (not self._pending and self._in_flight == 0):
+            self._start_batch(loop, [(request, future)])
+        else:
+            self._pending.append((request, future))
+            if len(self._pending) >= self.max_batch_size:
+                self._flush(loop)
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._flush, loop)
+
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self._start_batch(loop, batch)
+
+    def _start_batch(self, loop: asyncio.AbstractEventLoop, batch: list):
+        self._in_flight += 1
+        task = loop.create_task(self._run_batch(loop, batch))
+        # The loop only keeps weak references to tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, loop: asyncio.AbstractEventLoop, batch: list):
+        try:
+            results = await loop.run_in_executor(
+                None, self.service.recommend_many, [request for request, _ in batch]
+            )
+        except Exception as e:
+            results = [e] * len(batch)
+        finally:
+            self._in_flight -= 1
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
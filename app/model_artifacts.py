@@ -0,0 +1,264 @@
+import glob
+import joblib
+import json
+import numpy as np
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Any, List
+
+from compiled_forest import COMPILED_MAX_ROWS, CompiledForest
+from feature_compiler import FeatureCompiler
+from room_index import RoomIndex
+from score_table import ScoreTable, scores_dir_for
+from serving_artifacts import (serving_dir_for, load_serving_artifacts, forest_from_serving_artifacts,
+                               room_arrays, preference_arrays)
+
+
+INFERENCE_BACKENDS = ('sklearn', 'compiled', 'auto')
+
+
+def latest_model_file(models_dir: str) -> str:
+    """Newest versioned model file, by the timestamp in its name"""
+    model_files = glob.glob(os.path.join(models_dir, 'model_*.pkl'))
+    if not model_files:
+        raise FileNotFoundError("No versioned model files found in models directory.")
+    return sorted(model_files)[-1]
+
+
+class ModelArtifacts:
+    """One consistent, read-only snapshot of everything a model version needs to serve.
+
+    A snapshot is fully built before it is handed to the service and is never
+    mutated afterwards, so a request that holds on to it sees the same model,
+    encoder and lookups from start to finish even if a reload swaps in a newer
+    snapshot meanwhile.
+    """
+
+    def __init__(self, models_dir: str, info_dir: str, encoder_dir: str,
+                 inference_backend: str = 'sklearn',
+                 purpose_requirements: Dict[str, Dict[str, Any]] = None,
+                 max_utilization: float = 1.0, score_lookup: bool = False):
+        """Load all saved model artifacts.
+
+        With ``purpose_requirements``, a RoomIndex is built so infeasible rooms
+        can be dropped before scoring. With ``score_lookup``, the materialized
+        score table of the model is mapped when one exists.
+        """
+        self.inference_backend = inference_backend
+        self.model_file = latest_model_file(models_dir)
+
+        # Arrays written next to the model by training are memory-mapped when present
+        self.serving_dir = serving_dir_for(self.model_file)
+        serving = load_serving_artifacts(self.serving_dir) if os.path.isdir(self.serving_dir) else None
+        self.memory_mapped = serving is not None
+
+        self._model = None
+        self._model_lock = threading.Lock()
+        self.compiled_model = None
+        if serving is not None and inference_backend in ('compiled', 'auto'):
+            self.compiled_model = forest_from_serving_artifacts(serving)
+        if self.compiled_model is None or inference_backend != 'compiled':
+            self._model = joblib.load(self.model_file)
+        if self.compiled_model is None:
+            self._build_inference_backend()
+        # Largest candidate matrix the 'auto' backend scores with the compiled forest, calibrated by the service
+        self.compiled_max_rows = COMPILED_MAX_ROWS
+        # Input width of the forest, before the compiled one is switched to compact input
+        self.model_n_features = getattr(self.compiled_model, 'n_features_in_', None)
+
+        # Load the encoder
+        encoder_path = os.path.join(encoder_dir, 'encoder.pkl')
+        self.encoder = joblib.load(encoder_path)
+
+        self._room_lookup = None
+        self._user_preferences = None
+        if serving is not None:
+            arrays = serving
+        else:
+            # Load room lookup
+            room_lookup_path = os.path.join(info_dir, 'room_lookup.json')
+            with open(room_lookup_path, 'r') as f:
+                self._room_lookup = json.load(f)
+
+            # Load user preferences
+            user_pref_path = os.path.join(info_dir, 'user_preferences.json')
+            with open(user_pref_path, 'r') as f:
+                self._user_preferences = json.load(f)
+
+            arrays = room_arrays(self._room_lookup)
+            arrays.update(preference_arrays(self._user_preferences, arrays['room_ids']))
+
+        self.room_ids = arrays['room_ids']
+        self.room_types = arrays['room_types']
+        self.room_capacities = arrays['room_capacities']
+        self.room_has_projector = arrays['room_has_projector']
+        self.room_has_whiteboard = arrays['room_has_whiteboard']
+        self.preference_user_ids = arrays['preference_user_ids']
+        self.preference_indptr = arrays['preference_indptr']
+        self.preference_indices = arrays['preference_indices']
+
+        self.room_index = None
+        if purpose_requirements is not None:
+            self.room_index = RoomIndex(self.room_types, self.room_capacities, self.room_has_projector,
+                                        self.room_has_whiteboard, purpose_requirements, max_utilization)
+
+        # Load model info
+        info_path = os.path.join(info_dir, 'model_info.json')
+        with open(info_path, 'r') as f:
+            self.feature_info = json.load(f)
+
+        self.feature_compiler = None
+        self._build_feature_compiler()
+
+        self.score_table = None
+        if score_lookup:
+            self._load_score_table()
+        self.loaded_at = datetime.now()
+
+    @property
+    def model(self):
+        """The sklearn model; only unpickled on first use when the compiled forest is mapped"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = joblib.load(self.model_file)
+        return self._model
+
+    @property
+    def room_lookup(self) -> Dict[str, Dict[str, Any]]:
+        if self._room_lookup is None:
+            self._room_lookup = {
+                str(room_id): {
+                    'room_capacity': int(capacity),
+                    'room_type': str(room_type),
+                    'has_projector': bool(projector),
+                    'has_whiteboard': bool(whiteboard),
+                }
+                for room_id, capacity, room_type, projector, whiteboard in zip(
+                    self.room_ids, self.room_capacities, self.room_types,
+                    self.room_has_projector, self.room_has_whiteboard)
+            }
+        return self._room_lookup
+
+    @property
+    def user_preferences(self) -> Dict[str, List[str]]:
+        if self._user_preferences is None:
+            self._user_preferences = {
+                str(user_id): self.preferred_room_ids(user_id) for user_id in self.preference_user_ids.tolist()
+            }
+        return self._user_preferences
+
+    def preferred_room_indices(self, user_id: int) -> np.ndarray:
+        """Indices of the rooms that the user has booked before"""
+        row = np.searchsorted(self.preference_user_ids, user_id)
+        if row < len(self.preference_user_ids) and self.preference_user_ids[row] == user_id:
+            return self.preference_indices[self.preference_indptr[row]:self.preference_indptr[row + 1]]
+        return self.preference_indices[:0]
+
+    def preferred_room_ids(self, user_id: int) -> List[str]:
+        return self.room_ids[self.preferred_room_indices(user_id)].tolist()
+
+    def preferred_rooms_mask(self, user_id: int) -> np.ndarray:
+        """Boolean mask over rooms that the user has booked before"""
+        mask = np.zeros(len(self.room_ids), dtype=bool)
+        mask[self.preferred_room_indices(user_id)] = True
+        return mask
+
+    def model_input(self, X):
+        """X in the form the sklearn model was fitted on.
+
+        Models trained on a DataFrame expect its column names; models trained
+        on the sparse matrix from scripts/training_features.py have none and
+        take a bare matrix; compact compiled matrices are expanded to a sparse
+        one-hot one.
+        """
+        if hasattr(self.model, 'feature_names_in_'):
+            if isinstance(X, np.ndarray):
+                return self.feature_compiler.to_frame(X)
+            return X
+        if hasattr(X, 'to_numpy'):
+            return X.to_numpy(dtype=np.float32)
+        compiler = self.feature_compiler
+        if compiler is not None and compiler.compact and isinstance(X, np.ndarray):
+            return compiler.expand(X)
+        return X
+
+    def _build_inference_backend(self):
+        """Flatten the forest for the compiled backend; falls back to sklearn if it cannot be compiled"""
+        if self.inference_backend in ('compiled', 'auto'):
+            try:
+                self.compiled_model = CompiledForest.from_sklearn(self.model)
+            except ValueError as e:
+                print(f"⚠️ Compiled inference unavailable, using predict_proba: {str(e)}")
+
+    def build_feature_compiler(self, compact: bool = False) -> FeatureCompiler:
+        """A FeatureCompiler for these artifacts"""
+        return FeatureCompiler(self.encoder, self.feature_info, {
+            'room_type': self.room_types,
+            'has_projector': self.room_has_projector,
+            'has_whiteboard': self.room_has_whiteboard,
+            'room_capacity': self.room_capacities,
+        }, compact=compact)
+
+    def _build_feature_compiler(self):
+        """Precompile feature assembly; falls back to the encoder if it cannot be compiled.
+
+        Candidate matrices are compact, one column per feature, so their width
+        does not grow with the number of users; only models fitted on a
+        DataFrame get the one-hot columns, by name.
+        """
+        compact = self._model is None or not hasattr(self._model, 'feature_names_in_')
+        try:
+            self.feature_compiler = self.build_feature_compiler(compact)
+        except ValueError as e:
+            print(f"⚠️ Feature compiler unavailable, using encoder.transform: {str(e)}")
+            return
+        if compact and self.compiled_model is not None:
+            self.compiled_model = self.compiled_model.with_compact_input(*self.feature_compiler.column_slots())
+
+    def _load_score_table(self):
+        """Map the materialized scores; serving falls back to live inference without them"""
+        scores_dir = scores_dir_for(self.model_file)
+        if not os.path.isdir(scores_dir):
+            print(f"⚠️ No score table at {scores_dir}, using live inference")
+            return
+        try:
+            table = ScoreTable.load(scores_dir)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Score table unusable, using live inference: {str(e)}")
+            return
+        if table.meta.get('model_file') != os.path.basename(self.model_file):
+            print(f"⚠️ Score table was built for {table.meta.get('model_file')}, using live inference")
+        elif not np.array_equal(table.room_ids, self.room_ids):
+            print("⚠️ Score table rooms do not match the room lookup, using live inference")
+        else:
+            self.score_table = table
+
+    @property
+    def version(self) -> Dict[str, Any]:
+        """Identifies the model version served by this snapshot"""
+        return {
+            'model_file': os.path.basename(self.model_file),
+            'model_version': self.feature_info.get('model_version'),
+            'trained_date': self.feature_info.get('trained_date'),
+            'loaded_at': self.loaded_at.isoformat(),
+            'memory_mapped': self.memory_mapped,
+            'score_table': self.score_table is not None,
+        }
+
+    def validate(self):
+        """Check the artifacts fit together before they are put in service"""
+        features = self.feature_info.get('features', [])
+        missing = [f for f in self.feature_info.get('categorical_features', []) if f not in features]
+        if missing:
+            raise ValueError(f"Categorical features {missing} are not listed in model features")
+        if not len(self.room_ids):
+            raise ValueError("Room lookup is empty")
+
+        n_encoded = len(self.encoder.get_feature_names_out(self.feature_info['categorical_features']))
+        n_features = n_encoded + len(features) - len(self.feature_info['categorical_features'])
+        expected = getattr(self._model, 'n_features_in_', None) if self._model is not None else self.model_n_features
+        expected = n_features if expected is None else expected
+        if expected != n_features:
+            raise ValueError(f"Model expects {expected} features but encoder and model info produce {n_features}")
@@ -0,0 +1,62 @@
+import glob
+import os
+import threading
+from typing import Tuple
+
+from score_table import scores_dir_for
+
+
+class ModelWatcher:
+    """Reload the recommendation service when training publishes new artifacts.
+
+    Polls the artifact directories every ``interval`` seconds. A change is only
+    acted on once it has been seen unchanged on two consecutive polls, so a
+    training run that is still writing its files is not picked up halfway.
+    """
+
+    def __init__(self, service, interval: float = 30.0):
+        self.service = service
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._active = self.fingerprint()
+
+    def fingerprint(self) -> Tuple:
+        """Latest model file plus the modification times of the files served with it"""
+        model_files = sorted(glob.glob(os.path.join(self.service.models_dir, 'model_*.pkl')))
+        # The score table is published after its model, so its arrival triggers a reload as well
+        paths = model_files[-1:] + [scores_dir_for(path) for path in model_files[-1:]] + [
+            os.path.join(self.service.encoder_dir, 'encoder.pkl'),
+            os.path.join(self.service.info_dir, 'room_lookup.json'),
+            os.path.join(self.service.info_dir, 'user_preferences.json'),
+            os.path.join(self.service.info_dir, 'model_info.json'),
+        ]
+        return tuple((path, os.path.getmtime(path) if os.path.exists(path) else None) for path in paths)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        pending = None
+        while not self._stop.wait(self.interval):
+            current = self.fingerprint()
+            if current == self._active:
+                pending = None
+            elif current != pending:
+                pending = current
+            else:
+                try:
+                    self.service.load_model_artifacts()
+                except Exception as e:
+                    print(f"❌ Model reload failed, keeping current model: {str(e)}")
+                # Either way, do not retry the same artifacts until they change again
+                self._active = current
+                pending = None
@@ -0,0 +1,15 @@
+# Room requirements per booking purpose, shared by the data generators and the room prefilter.
+# The generators only book rooms that meet them; RoomIndex ignores keys other than room_type,
+# has_projector, has_whiteboard, min_capacity and max_capacity (such as max_noise).
+PURPOSE_REQUIREMENTS = {
+    "Team meeting": {"room_type": ["meeting", "flex"], "min_capacity": 8},
+    "Project presentation": {"has_projector": True, "room_type": ["training", "meeting"]},
+    "Interview": {"room_type": ["interview"], "max_noise": True},
+    "Training session": {"has_whiteboard": True, "min_capacity": 10},
+    "Client meeting": {"room_type": ["meeting"], "min_capacity": 5},
+    "Workshop": {"has_whiteboard": True, "room_type": ["training"]},
+    "Conference call": {"room_type": ["flex", "meeting"], "min_capacity": 3},
+    "Brainstorming": {"has_whiteboard": True, "room_type": ["meeting", "flex"]},
+    "Demo": {"has_projector": True, "room_type": ["meeting", "training"]},
+    "One-on-one": {"room_type": ["interview", "flex"], "max_capacity": 5}
+}
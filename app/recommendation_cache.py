@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+
+def canonical_hours(target_hours: List[int]) -> List[int]:
+    """Requested hours sorted and without duplicates"""
+    return sorted(set(target_hours))
+
+
+class RecommendationCache:
+    """Bounded in-process cache of ranked recommendations, with LRU eviction and a TTL.
+
+    Scores only depend on the date through its weekday and season, so entries
+    are keyed on those plus the user, purpose, attendee count, canonical hour
+    list and a ``scope`` naming whatever else the result depends on, such as
+    the model file that produced it. On a hit the cached start times are moved
+    onto the requested date. An entry computed for a larger ``top_k`` also
+    answers smaller ones.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    @staticmethod
+    def key(request: Dict[str, Any], scope: Any) -> Tuple:
+        target_date = request['target_date']
+        return (
+            scope,
+            request['user_id'],
+            request['purpose'],
+            request['attendees'],
+            target_date.weekday(),
+            ((target_date.month % 12) // 3) + 1,
+            tuple(canonical_hours(request['target_hours'])),
+        )
+
+    def get(self, request: Dict[str, Any], scope: Any) -> Optional[List[Dict[str, Any]]]:
+        """Cached recommendations for the request, or None on a miss"""
+        key = self.key(request, scope)
+        top_k = self._top_k(request)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry['stored_at'] > self.ttl:
+                del self._entries[key]
+                entry = None
+            # A shorter list than its top_k already holds every candidate
+            if entry is None or (entry['top_k'] < top_k and len(entry['records']) >= entry['top_k']):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            records = entry['records'][:top_k]
+
+        return [self._move_to_date(record, request['target_date']) for record in records]
+
+    def put(self, request: Dict[str, Any], scope: Any, records: List[Dict[str, Any]]):
+        key = self.key(request, scope)
+        with self._lock:
+            self._entries[key] = {
+                'top_k': self._top_k(request),
+                'records': [dict(record) for record in records],
+                'stored_at': time.monotonic(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    @staticmethod
+    def _top_k(request: Dict[str, Any]) -> int:
+        top_k = request.get('top_k')
+        return 10 if top_k is None else top_k
+
+    @staticmethod
+    def _move_to_date(record: Dict[str, Any], target_date: datetime) -> Dict[str, Any]:
+        hour = datetime.fromisoformat(record['start_time']).hour
+        start_time = target_date.replace(hour=hour, minute=0, second=0, microsecond=0)
+        return dict(record, start_time=start_time.isoformat())
@@ -1,149 +1,609 @@
-import glob
-import joblib
-import json
+import heapq
+import numpy as np
 import pandas as pd
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta
 from typing import List, Dict, Any
 import os
 
+from model_artifacts import ModelArtifacts, INFERENCE_BACKENDS
+from recommendation_cache import RecommendationCache, canonical_hours
+from availability_index import AvailabilityIndex
+from metrics import ServingMetrics, SampledProfiler
+
+
+# Date-range requests score this many candidates per model call, whatever the range length
+RANGE_CHUNK_ROWS = 4096
+MAX_RANGE_DAYS = 366
+# Candidate counts at which the 'auto' backend compares the compiled forest with predict_proba
+CALIBRATION_ROWS = (32, 64, 128, 256, 512, 1024)
+
 
 class RecommendationService:
-    def __init__(self):
-        """Initialize the recommendation service by loading all model artifacts"""
-        self.models_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
-        self.info_dir = os.path.join(os.path.dirname(__file__), '..', 'model_info')
-        self.encoder_dir = os.path.join(os.path.dirname(__file__), '..', 'encoder')
-        self.model = None
-        self.encoder = None
-        self.room_lookup = None
-        self.user_preferences = None
-        self.feature_info = None
+    def __init__(self, models_dir: str = None, info_dir: str = None, encoder_dir: str = None,
+                 inference_backend: str = 'sklearn', cache: RecommendationCache = None,
+                 availability: AvailabilityIndex = None,
+                 purpose_requirements: Dict[str, Dict[str, Any]] = None, max_utilization: float = 1.0,
+                 metrics: ServingMetrics = None, profiler: SampledProfiler = None,
+                 score_lookup: bool = False):
+        """Initialize the recommendation service by loading all model artifacts.
+
+        ``purpose_requirements`` (see purposes.PURPOSE_REQUIREMENTS)
+        turns on hard-constraint room prefiltering; rooms that cannot host a
+        booking at ``max_utilization`` or lack what its purpose needs are not scored.
+        ``profiler`` optionally profiles a sample of scoring calls. With
+        ``score_lookup``, requests covered by the model's materialized score
+        table (see scripts/materialize_scores.py) are answered from it.
+        """
+        if inference_backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unknown inference backend {inference_backend!r}, expected one of {INFERENCE_BACKENDS}")
+        base_dir = os.path.join(os.path.dirname(__file__), '..')
+        self.models_dir = models_dir or os.path.join(base_dir, 'models')
+        self.info_dir = info_dir or os.path.join(base_dir, 'model_info')
+        self.encoder_dir = encoder_dir or os.path.join(base_dir, 'encoder')
+        self.inference_backend = inference_backend
+        self.cache = cache
+        # Existing bookings; slots that overlap one are never recommended
+        self.availability = availability
+        self.purpose_requirements = purpose_requirements
+        self.max_utilization = max_utilization
+        self.score_lookup = score_lookup
+        # Per-stage timings and sizes, exposed on /metrics
+        self.metrics = metrics or ServingMetrics()
+        self.profiler = profiler
+
+        # Current artifact snapshot; replaced as a whole on reload
+        self.artifacts = None
+        self.last_reload = None
+        self._reload_lock = threading.Lock()
 
         self.load_model_artifacts()
 
-    def load_model_artifacts(self):
-        """Load all saved model artifacts"""
-        try:
-            # Find latest model with timestamp
-            model_files = glob.glob(os.path.join(self.models_dir, 'model_*.pkl'))
-            if not model_files:
-                raise FileNotFoundError("No versioned model files found in models directory.")
-            # Sort by timestamp in filename
-            latest_model_file = sorted(model_files)[-1]
-            self.model = joblib.load(latest_model_file)
-            print(f"✅ Loaded latest model: {os.path.basename(latest_model_file)}")
-
-            # Load the encoder
-            encoder_path = os.path.join(self.encoder_dir, 'encoder.pkl')
-            self.encoder = joblib.load(encoder_path)
-
-            # Load room lookup
-            room_lookup_path = os.path.join(self.info_dir, 'room_lookup.json')
-            with open(room_lookup_path, 'r') as f:
-                self.room_lookup = json.load(f)
-
-            # Load user preferences
-            user_pref_path = os.path.join(self.info_dir, 'user_preferences.json')
-            with open(user_pref_path, 'r') as f:
-                self.user_preferences = json.load(f)
-
-            # Load model info
-            info_path = os.path.join(self.info_dir, 'model_info.json')
-            with open(info_path, 'r') as f:
-                self.feature_info = json.load(f)
-
-        except Exception as e:
-            print(f"❌ Error loading model artifacts: {str(e)}")
-            raise
+    def load_model_artifacts(self) -> Dict[str, Any]:
+        """Load, validate and swap in the latest model artifacts.
+
+        The new snapshot only replaces the current one once it has been fully
+        loaded and passed validation; on failure the current one stays active.
+        """
+        with self._reload_lock:
+            started = time.perf_counter()
+            try:
+                artifacts = ModelArtifacts(self.models_dir, self.info_dir, self.encoder_dir,
+                                           self.inference_backend, self.purpose_requirements,
+                                           self.max_utilization, self.score_lookup)
+                self._validate_artifacts(artifacts)
+                self._calibrate_auto_backend(artifacts)
+            except Exception as e:
+                print(f"❌ Error loading model artifacts: {str(e)}")
+                self.metrics.model_load_seconds.observe(time.perf_counter() - started, 'failure')
+                self.last_reload = {'success': False, 'error': str(e), 'at': datetime.now().isoformat()}
+                raise
+
+            self.artifacts = artifacts
+            if self.cache is not None:
+                # Entries are keyed by model file, this only frees the memory they hold
+                self.cache.clear()
+            self.last_reload = {'success': True, 'error': None, 'at': datetime.now().isoformat()}
+            self.metrics.model_load_seconds.observe(time.perf_counter() - started, 'success')
+            print(f"✅ Loaded latest model: {artifacts.version['model_file']}")
+            return artifacts.version
+
+    @staticmethod
+    def _sample_requests(artifacts: ModelArtifacts, n_requests: int, target_hours: List[int],
+                         top_k: int) -> List[Dict[str, Any]]:
+        """Requests for users and purposes the encoder knows, for probing and warming up"""
+        categories = dict(zip(artifacts.feature_info['categorical_features'], artifacts.encoder.categories_))
+        users = [user.item() for user in categories['user_id']] if 'user_id' in categories else [0]
+        purposes = [str(purpose) for purpose in categories['purpose']] if 'purpose' in categories else ['']
+        return [{
+            'user_id': users[i % len(users)],
+            'purpose': purposes[i % len(purposes)],
+            'attendees': 1 + i,
+            'target_date': datetime.now(),
+            'target_hours': target_hours,
+            'top_k': top_k,
+        } for i in range(n_requests)]
+
+    def _validate_artifacts(self, artifacts: ModelArtifacts):
+        """Run a probe request through a new snapshot before it takes traffic"""
+        artifacts.validate()
+        probe = self.recommend_many(self._sample_requests(artifacts, 1, [12], 1), artifacts, use_cache=False)[0]
+        if isinstance(probe, Exception):
+            raise ValueError(f"Probe inference failed: {str(probe)}")
+        if not all(0.0 <= r['success_probability'] <= 1.0 for r in probe):
+            raise ValueError("Probe inference returned probabilities outside [0, 1]")
+
+    def _calibrate_auto_backend(self, artifacts: ModelArtifacts):
+        """Measure up to how many candidates the compiled forest beats predict_proba for this model.
+
+        Both backends score growing slices of the candidates of a few sample
+        requests; the 'auto' backend then uses the compiled forest up to the
+        last size it won before first losing.
+        """
+        if artifacts.inference_backend != 'auto' or artifacts.compiled_model is None:
+            return
+        blocks = [columns for columns in (
+            self._candidate_columns(artifacts, request['user_id'], request['purpose'], request['attendees'],
+                                    request['target_date'], request['target_hours'])
+            for request in self._sample_requests(artifacts, 16, list(range(24)), 1)) if columns]
+        X = self._feature_matrix(artifacts, blocks)
+
+        def best_of(score, X_slice):
+            timings = []
+            for _ in range(3):
+                started = time.perf_counter()
+                score(X_slice)
+                timings.append(time.perf_counter() - started)
+            return min(timings)
+
+        compiled = lambda X_slice: artifacts.compiled_model.predict_proba(np.asarray(X_slice, dtype=np.float32))  # noqa: E731
+        sklearn = lambda X_slice: artifacts.model.predict_proba(artifacts.model_input(X_slice))  # noqa: E731
+        max_rows = 0
+        for n_rows in CALIBRATION_ROWS:
+            if n_rows > len(X) or best_of(compiled, X[:n_rows]) > best_of(sklearn, X[:n_rows]):
+                break
+            max_rows = n_rows
+        artifacts.compiled_max_rows = max_rows
+        print(f"⚙️ auto backend: compiled forest up to {max_rows} candidates")
+
+    def warm_up(self, n_requests: int = 4):
+        """Score a few full-day requests so the first real ones do not pay one-off costs.
+
+        Covers a batch of requests and a single one, which can take different
+        inference paths, and touches the mapped artifact pages they need.
+        """
+        requests = self._sample_requests(self.artifacts, n_requests, list(range(24)), 10)
+        for result in self.recommend_many(requests, use_cache=False) + self.recommend_many(requests[:1], use_cache=False):
+            if isinstance(result, Exception):
+                raise result
+
+    @property
+    def model_version(self) -> Dict[str, Any]:
+        """Version of the model currently serving requests"""
+        return self.artifacts.version
+
+    # Shortcuts to the current snapshot
+    @property
+    def model(self):
+        return self.artifacts.model
+
+    @property
+    def encoder(self):
+        return self.artifacts.encoder
+
+    @property
+    def room_lookup(self) -> Dict[str, Any]:
+        return self.artifacts.room_lookup
+
+    @property
+    def user_preferences(self) -> Dict[str, List[str]]:
+        return self.artifacts.user_preferences
+
+    @property
+    def feature_info(self) -> Dict[str, Any]:
+        return self.artifacts.feature_info
+
+    @property
+    def feature_compiler(self):
+        return self.artifacts.feature_compiler
+
+    @staticmethod
+    def _candidate_columns(artifacts: ModelArtifacts, user_id: int, purpose: str, attendees: int,
+                           target_date: datetime, target_hours: List[int],
+                           availability: AvailabilityIndex = None) -> Dict[str, Any]:
+        """Build the candidate block as columns.
+
+        Candidates form an (hours x rooms) block, flattened hour-major so rows
+        come out in the same order as a nested ``for hour: for room:`` loop.
+        Values shared by every candidate are kept as scalars. Rooms that the
+        room index rules out, and (room, hour) pairs that the availability
+        index shows as booked, are dropped before any feature is built.
+        """
+        rooms = None
+        if artifacts.room_index is not None:
+            rooms = np.flatnonzero(artifacts.room_index.feasible_rooms(purpose, attendees))
+
+        def per_room(values):
+            return values if rooms is None else values[rooms]
+
+        n_hours = len(target_hours)
+        n_rooms = len(artifacts.room_ids) if rooms is None else len(rooms)
+        if n_hours == 0 or n_rooms == 0:
+            return {}
+
+        # Everything that only depends on the hour is computed once per hour
+        start_times = pd.DatetimeIndex([
+            target_date.replace(hour=hour, minute=0, second=0, microsecond=0)
+            for hour in target_hours
+        ])
+        day_of_week = target_date.weekday()
+
+        is_preferred = per_room(artifacts.preferred_rooms_mask(user_id)).astype(np.int64)
+        capacity_utilization = attendees / per_room(artifacts.room_capacities)
+
+        hours = np.asarray(target_hours, dtype=np.int64)[:, None]
+        shape = (n_hours, n_rooms)
+        free = None
+        if availability is not None:
+            free = ~availability.busy_grid(artifacts.room_ids, start_times, rooms).ravel()
+
+        def grid(values):
+            flat = np.broadcast_to(values, shape).ravel()
+            return flat if free is None else flat[free]
+
+        grid_start_times = start_times.repeat(n_rooms)
+
+        return {
+            'room_index': grid(np.arange(n_rooms) if rooms is None else rooms),
+            'user_id': user_id,
+            'purpose': purpose,
+            'room_type': grid(per_room(artifacts.room_types)),
+            'has_projector': grid(per_room(artifacts.room_has_projector)),
+            'has_whiteboard': grid(per_room(artifacts.room_has_whiteboard)),
+            'attendees': attendees,
+            'room_capacity': grid(per_room(artifacts.room_capacities)),
+            'hour_of_day': grid(hours),
+            'day_of_week': day_of_week,
+            'is_weekend': 1 if day_of_week >= 5 else 0,
+            'is_preferred_room': grid(is_preferred),
+            'capacity_utilization': grid(capacity_utilization),
+            'season': ((target_date.month % 12) // 3) + 1,
+            'room_id': grid(per_room(artifacts.room_ids)),
+            'start_time': grid_start_times if free is None else grid_start_times[free],
+        }
 
     def get_candidate_slots(self, user_id: int, purpose: str, attendees: int,
                             target_date: datetime, target_hours: List[int]) -> pd.DataFrame:
         """Generate candidate slots for a booking request"""
+        columns = self._candidate_columns(self.artifacts, user_id, purpose, attendees,
+                                          target_date, target_hours, self.availability)
+        return self._candidates_frame(columns)
 
-        candidates = []
-        user_preferred_rooms = self.user_preferences.get(str(user_id), [])
-
-        for hour in target_hours:
-            for room_id in self.room_lookup.keys():
-                start_time = target_date.replace(hour=hour, minute=0, second=0, microsecond=0)
-
-                candidate = {
-                    'user_id': user_id,
-                    'purpose': purpose,
-                    'room_type': self.room_lookup[room_id]['room_type'],
-                    'has_projector': self.room_lookup[room_id]['has_projector'],
-                    'has_whiteboard': self.room_lookup[room_id]['has_whiteboard'],
-                    'attendees': attendees,
-                    'room_capacity': self.room_lookup[room_id]['room_capacity'],
-                    'hour_of_day': hour,
-                    'day_of_week': start_time.weekday(),
-                    'is_weekend': 1 if start_time.weekday() >= 5 else 0,
-                    'is_preferred_room': 1 if room_id in user_preferred_rooms else 0,
-                    'capacity_utilization': attendees / self.room_lookup[room_id]['room_capacity'],
-                    'season': ((start_time.month % 12) // 3) + 1,
-                    'room_id': room_id,
-                    'start_time': start_time
-                }
-
-                candidates.append(candidate)
-
-        return pd.DataFrame(candidates)
-
-    def recommend_slots(self, user_id: int, purpose: str, attendees: int,
-                        target_date: datetime, target_hours: List[int],
-                        top_k: int = 10) -> List[Dict[str, Any]]:
-        """Get slot recommendations for a booking request"""
-
-        # Generate candidates
-        candidates = self.get_candidate_slots(user_id, purpose, attendees,
-                                              target_date, target_hours)
+    @staticmethod
+    def _candidates_frame(columns: Dict[str, Any]) -> pd.DataFrame:
+        """Candidate columns as a DataFrame, without the internal room index"""
+        return pd.DataFrame({name: values for name, values in columns.items() if name != 'room_index'})
 
-        # Prepare features
-        X_candidate = candidates[self.feature_info['features']]
+    def encode_candidates(self, candidates: pd.DataFrame, artifacts: ModelArtifacts = None) -> pd.DataFrame:
+        """Encode a candidate DataFrame with the fitted encoder"""
+        artifacts = artifacts or self.artifacts
+        X_candidate = candidates[artifacts.feature_info['features']]
 
         # Split categorical and numerical features
-        cat_features = self.feature_info['categorical_features']
+        cat_features = artifacts.feature_info['categorical_features']
         X_cat = X_candidate[cat_features]
         X_num = X_candidate.drop(columns=cat_features)
 
         # Encode categorical features
         X_encoded_cat = pd.DataFrame(
-            self.encoder.transform(X_cat).toarray(),
-            columns=self.encoder.get_feature_names_out(cat_features)
+            artifacts.encoder.transform(X_cat).toarray(),
+            columns=artifacts.encoder.get_feature_names_out(cat_features)
         )
 
         # Combine features
-        X_final = pd.concat([X_encoded_cat, X_num.reset_index(drop=True)], axis=1)
-
-        # Get predictions
-        success_probabilities = self.model.predict_proba(X_final)[:, 1]
-        candidates['success_probability'] = success_probabilities
-
-        # Sort and get top recommendations
-        top_recommendations = candidates.sort_values('success_probability', ascending=False).head(top_k)
-
-        # Convert to list of dictionaries for API response
-        recommendations = []
-        for _, row in top_recommendations.iterrows():
-            recommendations.append({
-                'room_id': row['room_id'],
-                'start_time': row['start_time'].isoformat(),
-                'success_probability': float(row['success_probability']),
-                'room_type': row['room_type'],
-                'room_capacity': int(row['room_capacity']),
-                'has_projector': bool(row['has_projector']),
-                'has_whiteboard': bool(row['has_whiteboard']),
-                'capacity_utilization': float(row['capacity_utilization'])
-            })
-
-        return recommendations
+        return pd.concat([X_encoded_cat, X_num.reset_index(drop=True)], axis=1)
+
+    def _feature_matrix(self, artifacts: ModelArtifacts, blocks: List[Dict[str, Any]]):
+        """Stack the model input for several candidate blocks into one matrix"""
+        compiler = artifacts.feature_compiler
+        if compiler is not None:
+            sizes = [len(columns['room_index']) for columns in blocks]
+            X = np.empty((sum(sizes), compiler.n_features), dtype=np.float64)
+            offset = 0
+            for columns, size in zip(blocks, sizes):
+                compiler.compile(columns, out=X[offset:offset + size])
+                offset += size
+            return X
+
+        candidates = pd.concat([self._candidates_frame(columns) for columns in blocks], ignore_index=True)
+        return self.encode_candidates(candidates, artifacts)
+
+    @staticmethod
+    def _predict_success(artifacts: ModelArtifacts, X) -> np.ndarray:
+        """Success probability for each row of a feature matrix"""
+        use_compiled = artifacts.compiled_model is not None and (
+            artifacts.inference_backend == 'compiled' or len(X) <= artifacts.compiled_max_rows
+        )
+        if use_compiled:
+            return artifacts.compiled_model.predict_proba(np.asarray(X, dtype=np.float32))[:, 1]
+        return artifacts.model.predict_proba(artifacts.model_input(X))[:, 1]
+
+    @staticmethod
+    def _top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+        """Positions of the top_k highest scores, best first.
+
+        Uses argpartition so only the selected candidates get sorted. Ties are
+        broken by candidate order, which makes the result the same as a stable
+        descending sort cut at top_k.
+        """
+        n = len(scores)
+        k = max(0, min(10 if top_k is None else top_k, n))
+        if k == 0:
+            return np.empty(0, dtype=np.intp)
+        if k < n:
+            # Keep every candidate tied with the k-th score so the tie-break below sees them all
+            kth = np.partition(scores, n - k)[n - k]
+            selected = np.flatnonzero(scores >= kth)
+        else:
+            selected = np.arange(n)
+        order = np.lexsort((selected, -scores[selected]))
+        return selected[order[:k]]
+
+    def _rank_candidates(self, columns: Dict[str, Any], success_probabilities: np.ndarray,
+                         top_k: int) -> List[Dict[str, Any]]:
+        """Turn scored candidates into the top_k recommendation records"""
+        top = self._top_k_indices(np.asarray(success_probabilities, dtype=np.float64), top_k)
+        return self._records(columns, success_probabilities, top)
+
+    @staticmethod
+    def _records(columns: Dict[str, Any], success_probabilities: np.ndarray,
+                 top: np.ndarray) -> List[Dict[str, Any]]:
+        """Recommendation records for the candidates at positions ``top``, in that order"""
+        # Gather only the selected rows, then box them in one tolist() per column
+        start_times = [start_time.isoformat() for start_time in columns['start_time'][top]]
+        return [
+            {
+                'room_id': room_id,
+                'start_time': start_time,
+                'success_probability': probability,
+                'room_type': room_type,
+                'room_capacity': room_capacity,
+                'has_projector': has_projector,
+                'has_whiteboard': has_whiteboard,
+                'capacity_utilization': capacity_utilization
+            }
+            for room_id, start_time, probability, room_type, room_capacity,
+                has_projector, has_whiteboard, capacity_utilization in zip(
+                columns['room_id'][top].tolist(),
+                start_times,
+                success_probabilities[top].astype(np.float64).tolist(),
+                columns['room_type'][top].tolist(),
+                columns['room_capacity'][top].astype(np.int64).tolist(),
+                columns['has_projector'][top].astype(bool).tolist(),
+                columns['has_whiteboard'][top].astype(bool).tolist(),
+                columns['capacity_utilization'][top].astype(np.float64).tolist()
+            )
+        ]
+
+    @staticmethod
+    def _cache_scope(artifacts: ModelArtifacts, availability: AvailabilityIndex,
+                     request: Dict[str, Any]):
+        """What a cached result depends on besides the normalized request"""
+        if availability is None:
+            return artifacts.model_file
+        # Free slots depend on the exact date and on the bookings known so far
+        return artifacts.model_file, request['target_date'].date(), availability.version
+
+    def recommend_many(self, requests: List[Dict[str, Any]], artifacts: ModelArtifacts = None,
+                       use_cache: bool = True) -> List[Any]:
+        """Score several booking requests with a single model call.
+
+        Returns one entry per request: its recommendations, or the exception
+        that stopped that request. All requests are served from one artifact
+        snapshot, taken once up front.
+        """
+        if self.profiler is not None:
+            with self.profiler.profile('recommend_many'):
+                return self._score_requests(requests, artifacts or self.artifacts, use_cache)
+        return self._score_requests(requests, artifacts or self.artifacts, use_cache)
+
+    def _score_requests(self, requests: List[Dict[str, Any]], artifacts: ModelArtifacts,
+                        use_cache: bool) -> List[Any]:
+        metrics = self.metrics
+        metrics.batch_size.observe(len(requests))
+        cache = self.cache if use_cache and self.cache is not None and self.cache.enabled else None
+        results = [None] * len(requests)
+        blocks = []
+        # (position, request, candidate columns, scores) ready for ranking
+        scored = []
+        availability = self.availability
+        score_table = artifacts.score_table
+        scopes = {}
+        for i, request in enumerate(requests):
+            try:
+                # Duplicate hours count once and hours are scored in order, cached or not
+                request = dict(request, target_hours=canonical_hours(request['target_hours']))
+                if self._is_range(request):
+                    # Scored on their own, a chunk of days at a time
+                    results[i] = self._recommend_range(artifacts, request)
+                    continue
+                if cache is not None:
+                    scopes[i] = self._cache_scope(artifacts, availability, request)
+                    cached = cache.get(request, scopes[i])
+                    if cached is not None:
+                        results[i] = cached
+                        continue
+
+                started = time.perf_counter()
+                columns = self._candidate_columns(artifacts, request['user_id'], request['purpose'],
+                                                  request['attendees'], request['target_date'],
+                                                  request['target_hours'], availability)
+                metrics.observe_stage('candidates', started)
+                if not columns:
+                    raise ValueError("No candidate slots for the requested hours")
+                if not len(columns['room_index']):
+                    # Every candidate slot is already booked
+                    results[i] = []
+                    continue
+                metrics.candidates.observe(len(columns['room_index']))
+
+                if score_table is not None:
+                    started = time.perf_counter()
+                    scores = score_table.lookup(columns)
+                    if scores is not None:
+                        metrics.observe_stage('lookup', started)
+                        scored.append((i, request, columns, scores))
+                        continue
+                # Off the materialized grid (or no table): score with the model
+                blocks.append((i, request, columns))
+            except Exception as e:
+                results[i] = e
+
+        if blocks:
+            try:
+                block_scores = self._score_blocks(artifacts, [columns for _, _, columns in blocks])
+            except Exception as e:
+                for i, _, _ in blocks:
+                    results[i] = e
+                block_scores = []
+            for (i, request, columns), scores in zip(blocks, block_scores):
+                scored.append((i, request, columns, scores))
+
+        for i, request, columns, scores in scored:
+            try:
+                started = time.perf_counter()
+                results[i] = self._rank_candidates(columns, scores, request.get('top_k', 10))
+                metrics.observe_stage('top_k', started)
+                if cache is not None:
+                    cache.put(request, scopes[i], results[i])
+            except Exception as e:
+                results[i] = e
+        return results
+
+    def _score_blocks(self, artifacts: ModelArtifacts, blocks: List[Dict[str, Any]]) -> List[np.ndarray]:
+        """Score several candidate blocks with one model call; returns one score array per block"""
+        started = time.perf_counter()
+        X_final = self._feature_matrix(artifacts, blocks)
+        started = self.metrics.observe_stage('encoding', started)
+        success_probabilities = self._predict_success(artifacts, X_final)
+        self.metrics.observe_stage('inference', started)
+        sizes = [len(columns['room_index']) for columns in blocks]
+        return np.split(success_probabilities, np.cumsum(sizes)[:-1])
+
+    @staticmethod
+    def _is_range(request: Dict[str, Any]) -> bool:
+        return request.get('end_date') is not None or request.get('weekdays') is not None
+
+    def _recommend_range(self, artifacts: ModelArtifacts, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Best slots between target_date and end_date (inclusive), on the allowed weekdays.
+
+        Days are turned into candidates lazily and scored about
+        RANGE_CHUNK_ROWS candidates at a time; only the best top_k records seen
+        so far are kept, in a min-heap. Memory therefore depends on the chunk
+        size and top_k, not on the length of the range. Ties are broken by
+        date, then by candidate order, as for a single day.
+        """
+        start = request['target_date']
+        end = request.get('end_date') or start
+        n_days = (end.date() - start.date()).days + 1
+        if n_days < 1:
+            raise ValueError("end_date is before target_date")
+        if n_days > MAX_RANGE_DAYS:
+            raise ValueError(f"Date range spans {n_days} days, at most {MAX_RANGE_DAYS} are supported")
+        weekdays = request.get('weekdays')
+        if weekdays is not None and not all(0 <= day <= 6 for day in weekdays):
+            raise ValueError("weekdays must be between 0 (Monday) and 6 (Sunday)")
+        if not request['target_hours']:
+            raise ValueError("No candidate slots for the requested hours")
+        top_k = request.get('top_k', 10)
+        top_k = 10 if top_k is None else top_k
+        if top_k <= 0:
+            return []
+
+        metrics = self.metrics
+        availability = self.availability
+
+        def day_blocks():
+            for offset in range(n_days):
+                day = start + timedelta(days=offset)
+                if weekdays is not None and day.weekday() not in weekdays:
+                    continue
+                started = time.perf_counter()
+                columns = self._candidate_columns(artifacts, request['user_id'], request['purpose'],
+                                                  request['attendees'], day, request['target_hours'],
+                                                  availability)
+                metrics.observe_stage('candidates', started)
+                if columns and len(columns['room_index']):
+                    yield columns
+
+        def chunks():
+            chunk, rows = [], 0
+            for columns in day_blocks():
+                chunk.append(columns)
+                rows += len(columns['room_index'])
+                if rows >= RANGE_CHUNK_ROWS:
+                    yield chunk
+                    chunk, rows = [], 0
+            if chunk:
+                yield chunk
+
+        # Min-heap of (probability, -candidate sequence number, record)
+        heap = []
+        seen = 0
+        for chunk in chunks():
+            chunk_scores = None
+            if artifacts.score_table is not None:
+                chunk_scores = [artifacts.score_table.lookup(columns) for columns in chunk]
+                if any(scores is None for scores in chunk_scores):
+                    chunk_scores = None
+            if chunk_scores is None:
+                chunk_scores = self._score_blocks(artifacts, chunk)
+
+            started = time.perf_counter()
+            for columns, scores in zip(chunk, chunk_scores):
+                # Only a block's own top_k can make it into the overall top_k
+                top = self._top_k_indices(np.asarray(scores, dtype=np.float64), top_k)
+                for position, record in zip(top.tolist(), self._records(columns, scores, top)):
+                    item = (record['success_probability'], -(seen + position), record)
+                    if len(heap) < top_k:
+                        heapq.heappush(heap, item)
+                    elif item[:2] > heap[0][:2]:
+                        heapq.heapreplace(heap, item)
+                seen += len(scores)
+            metrics.observe_stage('top_k', started)
+
+        metrics.candidates.observe(seen)
+        return [record for _, _, record in sorted(heap, key=lambda item: item[:2], reverse=True)]
+
+    def recommend_slots(self, user_id: int, purpose: str, attendees: int,
+                        target_date: datetime, target_hours: List[int],
+                        top_k: int = 10, end_date: datetime = None,
+                        weekdays: List[int] = None) -> List[Dict[str, Any]]:
+        """Get slot recommendations for a booking request.
+
+        With ``end_date`` and/or ``weekdays`` (0 = Monday), every matching day
+        from target_date through end_date is searched.
+        """
+        result = self.recommend_many([{
+            'user_id': user_id,
+            'purpose': purpose,
+            'attendees': attendees,
+            'target_date': target_date,
+            'target_hours': target_hours,
+            'top_k': top_k,
+            'end_date': end_date,
+            'weekdays': weekdays,
+        }])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def recommend_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Get slot recommendations for many booking requests in one inference pass.
+
+        Each request uses the same keys as the ``recommend_slots`` arguments.
+        Failures are reported per request instead of failing the whole batch.
+        """
+        results = []
+        for result in self.recommend_many(requests):
+            if isinstance(result, Exception):
+                results.append({'success': False, 'error': str(result)})
+            else:
+                results.append({
+                    'success': True,
+                    'recommendations': result,
+                    'total_recommendations': len(result),
+                })
+        return results
 
     def get_room_info(self, room_id: str = None) -> Dict[str, Any]:
         """Get information about rooms"""
+        room_lookup = self.artifacts.room_lookup
         if room_id:
-            return self.room_lookup.get(room_id, {})
-        return self.room_lookup
+            return room_lookup.get(room_id, {})
+        return room_lookup
 
     def get_user_preferences(self, user_id: int) -> List[str]:
         """Get user's preferred rooms"""
-        return self.user_preferences.get(str(user_id), [])
\ No newline at end of file
+        return self.artifacts.preferred_room_ids(user_id)
\ No newline at end of file
@@ -0,0 +1,96 @@
+import json
+import math
+from typing import Dict, Any
+
+import numpy as np
+
+from purposes import PURPOSE_REQUIREMENTS
+
+
+def load_purpose_requirements(path: str = None) -> Dict[str, Dict[str, Any]]:
+    """Purpose requirements from a JSON file shaped like purposes.PURPOSE_REQUIREMENTS"""
+    if not path:
+        return PURPOSE_REQUIREMENTS
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+class RoomIndex:
+    """Static room-attribute index for dropping infeasible rooms before scoring.
+
+    Rooms are kept in capacity order, so a capacity range is one contiguous
+    slice found with ``searchsorted``. Projector, whiteboard and each room type
+    are packed bitsets in that same order, and a purpose's requirements reduce
+    to a few bitwise ANDs, unpacked once at the end.
+    """
+
+    def __init__(self, room_types: np.ndarray, room_capacities: np.ndarray,
+                 room_has_projector: np.ndarray, room_has_whiteboard: np.ndarray,
+                 purpose_requirements: Dict[str, Dict[str, Any]] = None,
+                 max_utilization: float = 1.0):
+        self.n_rooms = len(room_capacities)
+        self.order = np.argsort(room_capacities, kind='stable')
+        self.sorted_capacities = np.asarray(room_capacities)[self.order]
+        self.max_utilization = max_utilization
+        self.purpose_requirements = purpose_requirements or {}
+
+        def bits(mask):
+            return np.packbits(np.asarray(mask, dtype=bool)[self.order])
+
+        self.all_rooms = bits(np.ones(self.n_rooms, dtype=bool))
+        self.feature_bits = {
+            'has_projector': bits(room_has_projector),
+            'has_whiteboard': bits(room_has_whiteboard),
+        }
+        room_types = np.asarray(room_types)
+        self.room_type_bits = {str(t): bits(room_types == t) for t in np.unique(room_types)}
+        self.no_rooms = np.zeros_like(self.all_rooms)
+
+    def _capacity_bits(self, min_capacity: float, max_capacity: float) -> np.ndarray:
+        lo = np.searchsorted(self.sorted_capacities, min_capacity, side='left')
+        hi = np.searchsorted(self.sorted_capacities, max_capacity, side='right')
+        mask = np.zeros(self.n_rooms, dtype=bool)
+        mask[lo:hi] = True
+        return np.packbits(mask)
+
+    def _purpose_bits(self, purpose: str) -> np.ndarray:
+        bits = self.all_rooms
+        requirements = self.purpose_requirements.get(purpose, {})
+        for key in ('has_projector', 'has_whiteboard'):
+            if key in requirements:
+                feature = self.feature_bits[key]
+                bits = bits & (feature if requirements[key] else ~feature)
+        if 'room_type' in requirements:
+            allowed = requirements['room_type']
+            allowed = allowed if isinstance(allowed, list) else [allowed]
+            type_bits = self.no_rooms
+            for room_type in allowed:
+                type_bits = type_bits | self.room_type_bits.get(room_type, self.no_rooms)
+            bits = bits & type_bits
+        return bits
+
+    def _unpack(self, bits: np.ndarray) -> np.ndarray:
+        """Bitset in capacity order to a boolean mask in room order"""
+        mask = np.zeros(self.n_rooms, dtype=bool)
+        mask[self.order] = np.unpackbits(bits, count=self.n_rooms).astype(bool)
+        return mask
+
+    def feasible_rooms(self, purpose: str, attendees: int) -> np.ndarray:
+        """Boolean mask over rooms that can host the booking.
+
+        A room must fit the attendees at no more than ``max_utilization`` and
+        meet the purpose requirements. Like the data generator, it falls back to
+        rooms that only fit the attendees, then to every room, rather than
+        returning nothing.
+        """
+        requirements = self.purpose_requirements.get(purpose, {})
+        min_capacity = max(math.ceil(attendees / self.max_utilization), requirements.get('min_capacity', 0))
+        max_capacity = requirements.get('max_capacity', np.inf)
+
+        capacity = self._capacity_bits(min_capacity, max_capacity)
+        bits = capacity & self._purpose_bits(purpose)
+        if not bits.any():
+            bits = self._capacity_bits(math.ceil(attendees / self.max_utilization), np.inf)
+        if not bits.any():
+            return np.ones(self.n_rooms, dtype=bool)
+        return self._unpack(bits)
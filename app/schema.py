@@ -9,3 +9,16 @@ class RecommendRequest(BaseModel):
     target_date: datetime
     target_hours: List[int]
     top_k: Optional[int] = 10
+    # Search every day from target_date through end_date, optionally only on some weekdays (0 = Monday)
+    end_date: Optional[datetime] = None
+    weekdays: Optional[List[int]] = None
+
+
+class BatchRecommendRequest(BaseModel):
+    requests: List[RecommendRequest]
+
+
+class BookingEvent(BaseModel):
+    room_id: str
+    start_time: datetime
+    end_time: datetime
@@ -0,0 +1,79 @@
+"""Precomputed success probabilities for the whole low-cardinality input grid.
+
+``scripts/materialize_scores.py`` scores every (user, purpose, attendee bucket,
+season, weekday, hour, room) combination for one model and writes the result
+to ``<model file>.scores/`` as a uint16 ``scores.npy`` plus a ``meta.json``.
+The service maps the array read-only and answers on-grid requests by indexing
+into it instead of running the model.
+
+Attendees are bucketed: bucket ``i`` covers ``[edges[i], edges[i + 1])`` and
+is scored at a single representative head count, so lookups are exact only
+for that count. Pass one edge per head count for an exact table.
+"""
+import json
+import os
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+
+SCORE_TABLE_FORMAT_VERSION = 1
+# Probabilities are stored as round(p * SCORE_SCALE), an absolute error of at most 7.7e-6
+SCORE_SCALE = 65535
+DEFAULT_ATTENDEE_EDGES = (1, 2, 4, 6, 9, 13, 18, 25, 35)
+# Month used to stand for each season (see the season feature: ((month % 12) // 3) + 1)
+SEASON_MONTHS = {1: 1, 2: 4, 3: 7, 4: 10}
+
+
+def scores_dir_for(model_file: str) -> str:
+    """Directory holding the materialized score table of a model pickle"""
+    return os.path.splitext(model_file)[0] + '.scores'
+
+
+def attendee_values(edges: Sequence[int]) -> List[int]:
+    """Head count each attendee bucket is scored at: the middle of the bucket"""
+    return [(low + high - 1) // 2 for low, high in zip(edges[:-1], edges[1:])]
+
+
+def quantize(probabilities: np.ndarray) -> np.ndarray:
+    return np.rint(np.asarray(probabilities, dtype=np.float64) * SCORE_SCALE).astype(np.uint16)
+
+
+class ScoreTable:
+    """Read-only view over a materialized score table"""
+
+    def __init__(self, scores: np.ndarray, meta: Dict[str, Any]):
+        self.scores = scores
+        self.meta = meta
+        self.user_ids = np.asarray(meta['user_ids'], dtype=np.int64)
+        self.purpose_index = {purpose: i for i, purpose in enumerate(meta['purposes'])}
+        self.room_ids = np.asarray(meta['room_ids'], dtype=str)
+        self.attendee_edges = np.asarray(meta['attendee_edges'], dtype=np.int64)
+
+        expected = (len(self.user_ids), len(self.purpose_index), len(self.attendee_edges) - 1,
+                    4, 7, 24, len(self.room_ids))
+        if scores.shape != expected:
+            raise ValueError(f"Score table has shape {scores.shape}, expected {expected}")
+
+    @classmethod
+    def load(cls, scores_dir: str) -> 'ScoreTable':
+        with open(os.path.join(scores_dir, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        if meta.get('format_version') != SCORE_TABLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported score table format {meta.get('format_version')!r}")
+        return cls(np.load(os.path.join(scores_dir, 'scores.npy'), mmap_mode='r'), meta)
+
+    def lookup(self, columns: Dict[str, Any]) -> np.ndarray:
+        """Scores for a candidate block, or None when the request is off the grid"""
+        user = np.searchsorted(self.user_ids, columns['user_id'])
+        if user >= len(self.user_ids) or self.user_ids[user] != columns['user_id']:
+            return None
+        purpose = self.purpose_index.get(columns['purpose'])
+        if purpose is None:
+            return None
+        bucket = np.searchsorted(self.attendee_edges, columns['attendees'], side='right') - 1
+        if bucket < 0 or bucket >= len(self.attendee_edges) - 1:
+            return None
+
+        block = self.scores[user, purpose, bucket, columns['season'] - 1, columns['day_of_week']]
+        return block[columns['hour_of_day'], columns['room_index']] / SCORE_SCALE
@@ -0,0 +1,113 @@
+"""Serving artifacts stored as plain .npy files that workers can memory-map.
+
+Training writes one ``<model file>.serving`` directory next to every model
+pickle. It holds the flattened forest, the room table and the user preferences
+(a CSR matrix over room indices) as uncompressed arrays, plus a small
+``meta.json``. Loading them with
+``mmap_mode='r'`` lets every uvicorn worker share one physical copy through the
+page cache instead of unpickling its own.
+"""
+import itertools
+import json
+import os
+import shutil
+from typing import Dict, Any, List
+
+import numpy as np
+
+from compiled_forest import CompiledForest
+
+
+SERVING_FORMAT_VERSION = 2
+
+
+def serving_dir_for(model_file: str) -> str:
+    """Directory holding the serving arrays of a model pickle"""
+    return os.path.splitext(model_file)[0] + '.serving'
+
+
+def room_arrays(room_lookup: Dict[str, Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Room attributes as arrays, in room_lookup order"""
+    rooms = list(room_lookup.items())
+    return {
+        'room_ids': np.array([room_id for room_id, _ in rooms], dtype=str),
+        'room_types': np.array([info['room_type'] for _, info in rooms], dtype=str),
+        'room_capacities': np.array([info['room_capacity'] for _, info in rooms], dtype=np.int64),
+        'room_has_projector': np.array([info['has_projector'] for _, info in rooms], dtype=bool),
+        'room_has_whiteboard': np.array([info['has_whiteboard'] for _, info in rooms], dtype=bool),
+    }
+
+
+def preference_arrays(user_preferences: Dict[str, List[str]], room_ids: np.ndarray) -> Dict[str, np.ndarray]:
+    """User preferences as sorted user ids plus a CSR (users x rooms) matrix.
+
+    The preferred rooms of the user at row ``i`` are the room indices
+    ``preference_indices[preference_indptr[i]:preference_indptr[i + 1]]``, in
+    the order of the user's list (training ranks it), without duplicates.
+    """
+    user_ids = np.array(sorted(int(user_id) for user_id in user_preferences), dtype=np.int64)
+    room_index = {str(room_id): i for i, room_id in enumerate(room_ids)}
+    rows = [list(dict.fromkeys(room_index[r] for r in user_preferences[str(user_id)] if r in room_index))
+            for user_id in user_ids]
+    indptr = np.zeros(len(user_ids) + 1, dtype=np.int64)
+    np.cumsum([len(row) for row in rows], out=indptr[1:])
+    indices = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int32, count=int(indptr[-1]))
+    return {'preference_user_ids': user_ids, 'preference_indptr': indptr, 'preference_indices': indices}
+
+
+def _dense_to_csr(matrix: np.ndarray) -> Dict[str, np.ndarray]:
+    """CSR preference arrays from the (users x rooms) boolean matrix of format 1"""
+    rows, cols = np.nonzero(matrix)
+    indptr = np.zeros(len(matrix) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(matrix)), out=indptr[1:])
+    return {'preference_indptr': indptr, 'preference_indices': cols.astype(np.int32)}
+
+
+def write_serving_artifacts(model_file: str, model, room_lookup: Dict[str, Dict[str, Any]],
+                            user_preferences: Dict[str, List[str]]) -> str:
+    """Write the serving arrays for a model; call before the model pickle is published"""
+    serving_dir = serving_dir_for(model_file)
+    tmp_dir = serving_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    forest = CompiledForest.from_sklearn(model)
+    rooms = room_arrays(room_lookup)
+    arrays = {f'forest_{name}': values for name, values in forest.to_arrays().items()}
+    arrays.update(rooms)
+    arrays.update(preference_arrays(user_preferences, rooms['room_ids']))
+    for name, values in arrays.items():
+        np.save(os.path.join(tmp_dir, f'{name}.npy'), np.ascontiguousarray(values))
+
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump({'format_version': SERVING_FORMAT_VERSION, 'n_features': int(forest.n_features_in_)}, f)
+
+    # Publish the directory in one step so a loader never sees half of it
+    shutil.rmtree(serving_dir, ignore_errors=True)
+    os.rename(tmp_dir, serving_dir)
+    return serving_dir
+
+
+def load_serving_artifacts(serving_dir: str) -> Dict[str, Any]:
+    """Map every serving array read-only; returns arrays by name plus 'meta'"""
+    with open(os.path.join(serving_dir, 'meta.json'), 'r') as f:
+        meta = json.load(f)
+    if meta.get('format_version') not in (1, SERVING_FORMAT_VERSION):
+        raise ValueError(f"Unsupported serving artifact format {meta.get('format_version')!r}")
+
+    arrays = {'meta': meta}
+    for file_name in os.listdir(serving_dir):
+        if file_name.endswith('.npy'):
+            arrays[file_name[:-4]] = np.load(os.path.join(serving_dir, file_name), mmap_mode='r')
+    if meta['format_version'] == 1:
+        # Models trained before preferences were stored sparse
+        arrays.update(_dense_to_csr(arrays.pop('preference_matrix')))
+    return arrays
+
+
+def forest_from_serving_artifacts(arrays: Dict[str, Any]) -> CompiledForest:
+    """CompiledForest backed by the mapped forest arrays"""
+    return CompiledForest.from_arrays(
+        {name: arrays[f'forest_{name}'] for name in CompiledForest.ARRAY_NAMES},
+        n_features=arrays['meta']['n_features'],
+    )
@@ -0,0 +1,104 @@
+"""Time to build the room lookup and user preferences: the per-user loop against the grouped builder.
+
+Generates random bookings (users, rooms and start times drawn uniformly) at
+each requested size and times what train_model.py did before, one boolean scan
+of the dataset per user, against scripts/artifact_builder.py for every
+ranking, from the DataFrame and from a Parquet file. Checks that the
+first-seen ranking reproduces the loop's output exactly, including order. The
+loop is skipped above ``--legacy-max-rows``.
+
+    python benchmarks/bench_artifact_builder.py --rows 300000 3000000 30000000 --users 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from artifact_builder import RANKINGS, build_room_lookup, build_user_preferences  # noqa: E402
+
+
+def make_bookings(n_rows, n_users, n_rooms, rng):
+    """Bookings with the columns and dtypes of the training data that the builder reads"""
+    room = rng.integers(0, n_rooms, n_rows)
+    return pd.DataFrame({
+        'user_id': rng.integers(1, n_users + 1, n_rows).astype(np.int32),
+        'room_id': pd.Categorical.from_codes(room, [f'R{i + 1}' for i in range(n_rooms)]),
+        'room_capacity': (5 + room % 26).astype(np.int16),
+        'room_type': pd.Categorical.from_codes(room % 4, ['meeting', 'training', 'interview', 'flex']),
+        'has_projector': room % 2 == 0,
+        'has_whiteboard': room % 3 == 0,
+        'start_time': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365 * 24, n_rows), unit='h'),
+    })
+
+
+def legacy_lookups(df):
+    """The loops train_model.py used to run"""
+    room_info = df[['room_id', 'room_capacity', 'room_type', 'has_projector', 'has_whiteboard']].drop_duplicates()
+    room_lookup = room_info.set_index('room_id').to_dict('index')
+    room_lookup_json = {
+        room_id: {
+            'room_capacity': int(info['room_capacity']),
+            'room_type': str(info['room_type']),
+            'has_projector': bool(info['has_projector']),
+            'has_whiteboard': bool(info['has_whiteboard'])
+        }
+        for room_id, info in room_lookup.items()
+    }
+    user_preferences = {}
+    for user_id in df['user_id'].unique():
+        preferred_rooms = df[df['user_id'] == user_id]['room_id'].unique().tolist()
+        user_preferences[str(user_id)] = preferred_rooms
+    return room_lookup_json, user_preferences
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[300_000, 3_000_000, 30_000_000])
+    parser.add_argument('--users', type=int, default=5_000)
+    parser.add_argument('--rooms', type=int, default=200)
+    parser.add_argument('--legacy-max-rows', type=int, default=3_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{args.users} users, {args.rooms} rooms")
+    print(f"{'rows':>9} {'build':>22} {'seconds':>8}")
+    for n_rows in args.rows:
+        df = make_bookings(n_rows, args.users, args.rooms, rng)
+
+        if n_rows <= args.legacy_max_rows:
+            (legacy_rooms, legacy_preferences), legacy_s = timed(lambda: legacy_lookups(df))
+            assert list(build_room_lookup(df).items()) == list(legacy_rooms.items()), "room lookup differs"
+            assert list(build_user_preferences(df).items()) == list(legacy_preferences.items()), \
+                "user preferences differ"
+            print(f"{n_rows:>9} {'per-user loop':>22} {legacy_s:>8.2f}")
+        else:
+            print(f"{n_rows:>9} {'per-user loop':>22} {'skipped':>8}")
+
+        _, rooms_s = timed(lambda: build_room_lookup(df))
+        print(f"{n_rows:>9} {'room lookup':>22} {rooms_s:>8.2f}")
+        for rank_by in RANKINGS:
+            _, preferences_s = timed(lambda: build_user_preferences(df, rank_by))
+            print(f"{n_rows:>9} {'preferences ' + rank_by:>22} {preferences_s:>8.2f}")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bookings.parquet')
+            df.to_parquet(path, index=False)
+            _, parquet_s = timed(lambda: (build_room_lookup(path), build_user_preferences(path)))
+            print(f"{n_rows:>9} {'both from Parquet':>22} {parquet_s:>8.2f}")
+        del df
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Startup and preference-lookup cost of the JSON lookups against the binary serving arrays.
+
+Builds a room table and user preferences at the requested scale and writes them
+both as the indented JSON files training used to produce and as the .npy
+serving arrays (CSR preferences over room indices). Times what a worker does
+at startup with each, then the per-request preferred-room lookup: a list
+membership test per candidate room against a CSR gather.
+
+    python benchmarks/bench_artifact_load.py --users 50000 --rooms 20000 --preferred 30
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from bench_candidates import best_of
+from serving_artifacts import room_arrays, preference_arrays
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=50_000)
+    parser.add_argument('--rooms', type=int, default=20_000)
+    parser.add_argument('--preferred', type=int, default=30, help='average preferred rooms per user')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    room_ids = [f'R{i}' for i in range(1, args.rooms + 1)]
+    room_lookup = {
+        room_id: {'room_capacity': int(capacity), 'room_type': str(room_type),
+                  'has_projector': bool(projector), 'has_whiteboard': bool(whiteboard)}
+        for room_id, capacity, room_type, projector, whiteboard in zip(
+            room_ids, rng.integers(2, 40, args.rooms), rng.choice(['meeting', 'conference', 'training'], args.rooms),
+            rng.random(args.rooms) < 0.5, rng.random(args.rooms) < 0.5)
+    }
+    counts = rng.poisson(args.preferred, args.users)
+    user_preferences = {
+        str(user_id): [room_ids[i] for i in rng.choice(args.rooms, size=min(count, args.rooms), replace=False)]
+        for user_id, count in zip(range(1, args.users + 1), counts)
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_files = {'room_lookup.json': room_lookup, 'user_preferences.json': user_preferences}
+        for name, data in json_files.items():
+            with open(os.path.join(tmp, name), 'w') as f:
+                json.dump(data, f, indent=2)
+        arrays = room_arrays(room_lookup)
+        arrays.update(preference_arrays(user_preferences, arrays['room_ids']))
+        for name, values in arrays.items():
+            np.save(os.path.join(tmp, f'{name}.npy'), values)
+
+        json_mb = sum(os.path.getsize(os.path.join(tmp, name)) for name in json_files) / 1e6
+        npy_mb = sum(os.path.getsize(os.path.join(tmp, f'{name}.npy')) for name in arrays) / 1e6
+
+        def load_json():
+            loaded = {}
+            for name in json_files:
+                with open(os.path.join(tmp, name)) as f:
+                    loaded[name] = json.load(f)
+            return loaded
+
+        def load_npy():
+            return {name: np.load(os.path.join(tmp, f'{name}.npy'), mmap_mode='r') for name in arrays}
+
+        loaded_json, json_s = timed(load_json)
+        loaded_npy, npy_s = timed(load_npy)
+        print(f"{args.users} users, {args.rooms} rooms, {int(counts.sum())} preferences")
+        print(f"{'format':>8} {'size MB':>8} {'load s':>8}")
+        print(f"{'json':>8} {json_mb:>8.1f} {json_s:>8.3f}")
+        print(f"{'npy':>8} {npy_mb:>8.1f} {npy_s:>8.3f}")
+
+        # One request's worth of preference flags for every room
+        user_ids, indptr, indices = (loaded_npy['preference_user_ids'], loaded_npy['preference_indptr'],
+                                     loaded_npy['preference_indices'])
+        user_id = args.users // 2
+        preferred_list = loaded_json['user_preferences.json'][str(user_id)]
+
+        def list_lookup():
+            return np.array([1 if room_id in preferred_list else 0 for room_id in room_lookup])
+
+        def csr_lookup():
+            row = np.searchsorted(user_ids, user_id)
+            mask = np.zeros(len(room_ids), dtype=bool)
+            mask[indices[indptr[row]:indptr[row + 1]]] = True
+            return mask
+
+        assert np.array_equal(list_lookup().astype(bool), csr_lookup())
+        list_s = best_of(list_lookup, args.repeat)
+        csr_s = best_of(csr_lookup, args.repeat)
+        print(f"preferred-room flags for {args.rooms} rooms: list {list_s * 1e3:.2f} ms, CSR {csr_s * 1e3:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Measure availability index build and lookup cost, and how many candidates it prunes.
+
+Uses the bookings in a dataset CSV when given (e.g. data/dataset.csv from
+data_faker/data_generator.py), otherwise synthesizes bookings with the same
+shape: 25 rooms, start times spread over the last 90 days, 30-120 minutes.
+
+    python benchmarks/bench_availability.py --rows 300000
+    python benchmarks/bench_availability.py --csv ../data/dataset.csv
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import synthetic  # noqa: F401  (puts app/ on the path)
+from availability_index import AvailabilityIndex
+
+
+def synthetic_bookings(n_rows: int, n_rooms: int, days: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.now().floor('min')
+    start_time = end - pd.to_timedelta(rng.integers(0, days * 24 * 60, n_rows), unit='min')
+    return pd.DataFrame({
+        'room_id': np.array([f"R{i + 1}" for i in range(n_rooms)])[rng.integers(0, n_rooms, n_rows)],
+        'start_time': start_time,
+        'end_time': start_time + pd.to_timedelta(rng.choice([30, 60, 90, 120], n_rows), unit='min'),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--csv', help="bookings CSV with room_id, start_time and end_time")
+    parser.add_argument('--rows', type=int, default=300_000)
+    parser.add_argument('--rooms', type=int, default=25)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--queries', type=int, default=2_000)
+    args = parser.parse_args()
+
+    if args.csv:
+        bookings = pd.read_csv(args.csv, usecols=['room_id', 'start_time', 'end_time'],
+                               parse_dates=['start_time', 'end_time'])
+    else:
+        bookings = synthetic_bookings(args.rows, args.rooms, args.days)
+    room_ids = np.array(sorted(bookings['room_id'].unique()), dtype=object)
+    print(f"{len(bookings)} bookings, {len(room_ids)} rooms, "
+          f"{bookings['start_time'].min()} to {bookings['start_time'].max()}")
+
+    start = time.perf_counter()
+    index = AvailabilityIndex.from_bookings(bookings)
+    print(f"build: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    # Working-day requests (08:00-18:00) on random dates inside the booked range
+    rng = np.random.default_rng(0)
+    first, last = bookings['start_time'].min().normalize(), bookings['start_time'].max().normalize()
+    n_days = max((last - first).days, 1)
+    dates = first + pd.to_timedelta(rng.integers(0, n_days, args.queries), unit='D')
+    hours = pd.to_timedelta(np.arange(8, 19), unit='h')
+    slot_lists = [date + hours for date in dates]
+
+    busy = 0
+    start = time.perf_counter()
+    for slots in slot_lists:
+        busy += index.busy_grid(room_ids, slots).sum()
+    elapsed = time.perf_counter() - start
+    candidates = args.queries * len(hours) * len(room_ids)
+    print(f"lookup: {elapsed / args.queries * 1e6:.1f} us per request "
+          f"({len(hours)} hours x {len(room_ids)} rooms), "
+          f"{elapsed / candidates * 1e9:.0f} ns per candidate")
+    print(f"pruned: {busy / candidates * 100:.1f}% of candidates overlap an existing booking")
+
+    n_adds = 10_000
+    start = time.perf_counter()
+    for i in range(n_adds):
+        slot = slot_lists[i % len(slot_lists)][0]
+        index.add_booking(room_ids[i % len(room_ids)], slot, slot + pd.Timedelta(minutes=30))
+    print(f"incremental add: {(time.perf_counter() - start) / n_adds * 1e6:.1f} us per booking")
+
+
+if __name__ == '__main__':
+    main()
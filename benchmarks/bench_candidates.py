@@ -0,0 +1,56 @@
+"""Compare vectorized candidate generation against the original per-row loop.
+
+Checks that both paths produce the same ranked recommendations, then times
+candidate generation for a full working day across a growing number of rooms.
+
+    python benchmarks/bench_candidates.py --rooms 25 100 500
+"""
+import argparse
+import time
+from datetime import datetime
+
+from synthetic import build_artifacts
+from reference import legacy_candidate_slots, legacy_recommend_slots, same_ranking
+from recommendation_service import RecommendationService
+
+REQUESTS = [
+    dict(user_id=7, purpose='Team meeting', attendees=6,
+         target_date=datetime(2025, 3, 14), target_hours=list(range(8, 19)), top_k=10),
+    dict(user_id=42, purpose='Interview', attendees=2,
+         target_date=datetime(2025, 8, 2, 15, 30), target_hours=[9, 13, 17], top_k=50),
+    dict(user_id=999, purpose='Unknown purpose', attendees=40,
+         target_date=datetime(2025, 12, 28), target_hours=list(range(8, 19)), top_k=5),
+]
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rooms', type=int, nargs='+', default=[25, 100, 500])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rooms':>6} {'legacy ms':>10} {'vector ms':>10} {'speedup':>8}")
+    for n_rooms in args.rooms:
+        service = RecommendationService(**build_artifacts(n_rooms=n_rooms, n_rows=5_000, n_estimators=20))
+
+        for req in REQUESTS:
+            assert same_ranking(service.recommend_slots(**req), legacy_recommend_slots(service, **req)), \
+                f"ranked output differs for {req} with {n_rooms} rooms"
+
+        req = {k: v for k, v in REQUESTS[0].items() if k != 'top_k'}
+        legacy_s = best_of(lambda: legacy_candidate_slots(service, **req), args.repeat)
+        vector_s = best_of(lambda: service.get_candidate_slots(**req), args.repeat)
+        print(f"{n_rooms:>6} {legacy_s * 1e3:>10.2f} {vector_s * 1e3:>10.2f} {legacy_s / vector_s:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
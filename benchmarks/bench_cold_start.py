@@ -0,0 +1,76 @@
+"""Time from launching the API process until it is live (/healthz) and ready (/readyz).
+
+Starts uvicorn on app.main:app against the artifacts in the repository's
+models/, model_info/ and encoder/ folders and polls both endpoints. Runs once
+with background loading (the default) and once with BACKGROUND_LOADING=0,
+where artifacts are loaded before the server accepts connections, as they
+were when main.py built the service at import time.
+
+    python benchmarks/bench_cold_start.py --runs 3
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def status(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+
+def cold_start(env: dict, timeout: float) -> tuple:
+    """Seconds until /healthz and /readyz first answer 200"""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=APP_DIR, env={**os.environ, **env}, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    live = ready = None
+    try:
+        while ready is None and time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            if live is None and status(f'http://127.0.0.1:{port}/healthz') == 200:
+                live = time.perf_counter() - started
+            if live is not None and status(f'http://127.0.0.1:{port}/readyz') == 200:
+                ready = time.perf_counter() - started
+            time.sleep(0.1)
+    finally:
+        process.terminate()
+        process.wait()
+    return live, ready
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=120.0)
+    args = parser.parse_args()
+
+    print(f"{'mode':>12} {'live s':>7} {'ready s':>8}")
+    for mode, env in [('background', {'BACKGROUND_LOADING': '1'}), ('blocking', {'BACKGROUND_LOADING': '0'})]:
+        for _ in range(args.runs):
+            live, ready = cold_start(env, args.timeout)
+            print(f"{mode:>12} {live:>7.2f} {ready:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
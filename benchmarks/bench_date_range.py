@@ -0,0 +1,73 @@
+"""Latency and peak memory of date-range searches as the range grows.
+
+Compares the streaming range search (per-day candidate chunks merged through a
+bounded heap) with materializing and scoring the whole range at once. Checks
+that both return the same top-k probabilities, then reports the best-of time
+and the tracemalloc peak of each.
+
+    python benchmarks/bench_date_range.py --days 1 7 30 90
+"""
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from synthetic import build_artifacts
+from bench_candidates import best_of
+from recommendation_service import RecommendationService
+
+REQUEST = dict(user_id=7, purpose='Team meeting', attendees=6,
+               target_date=datetime(2025, 3, 14), target_hours=list(range(8, 19)), top_k=10)
+
+
+def materialized_top_k(service, days):
+    """Build every day's candidates up front and score them in a single call"""
+    artifacts = service.artifacts
+    blocks = [service._candidate_columns(artifacts, REQUEST['user_id'], REQUEST['purpose'], REQUEST['attendees'],
+                                         REQUEST['target_date'] + timedelta(days=offset), REQUEST['target_hours'])
+              for offset in range(days)]
+    X = service._feature_matrix(artifacts, blocks)
+    return np.sort(service._predict_success(artifacts, X))[::-1][:REQUEST['top_k']].tolist()
+
+
+def streamed(service, days):
+    return service.recommend_slots(**REQUEST, end_date=REQUEST['target_date'] + timedelta(days=days - 1))
+
+
+def peak_mb(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, nargs='+', default=[1, 7, 30, 90])
+    parser.add_argument('--rooms', type=int, default=25)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    service = RecommendationService(**build_artifacts(n_rooms=args.rooms, n_rows=5_000, n_estimators=50))
+
+    print(f"{'days':>5} {'candidates':>11} {'stream ms':>10} {'all-at-once ms':>15} "
+          f"{'stream peak MB':>15} {'all-at-once peak MB':>20}")
+    for days in args.days:
+        records = streamed(service, days)
+        expected = materialized_top_k(service, days)
+        assert [r['success_probability'] for r in records] == expected, f"top-k differs for {days} days"
+
+        stream_s = best_of(lambda: streamed(service, days), args.repeat)
+        full_s = best_of(lambda: materialized_top_k(service, days), args.repeat)
+        stream_mb = peak_mb(lambda: streamed(service, days))
+        full_mb = peak_mb(lambda: materialized_top_k(service, days))
+        n_candidates = days * len(REQUEST['target_hours']) * args.rooms
+        print(f"{days:>5} {n_candidates:>11} {stream_s * 1e3:>10.1f} {full_s * 1e3:>15.1f} "
+              f"{stream_mb:>15.1f} {full_mb:>20.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Compare compiled feature assembly against encoder.transform + pd.concat.
+
+Checks that FeatureCompiler produces exactly the original X_final, then times
+both paths for a full working day across a growing number of rooms.
+
+    python benchmarks/bench_features.py --rooms 25 100 500
+"""
+import argparse
+
+import numpy as np
+
+from synthetic import build_artifacts
+from reference import legacy_feature_matrix
+from bench_candidates import REQUESTS, best_of
+from recommendation_service import RecommendationService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rooms', type=int, nargs='+', default=[25, 100, 500])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rooms':>6} {'encoder ms':>11} {'compiled ms':>12} {'speedup':>8}")
+    for n_rooms in args.rooms:
+        service = RecommendationService(**build_artifacts(n_rooms=n_rooms, n_rows=5_000, n_estimators=20))
+        # One-hot columns, to compare with the encoder output column by column
+        compiler = service.artifacts.build_feature_compiler()
+
+        for req in REQUESTS:
+            req = {k: v for k, v in req.items() if k != 'top_k'}
+            columns = service._candidate_columns(service.artifacts, **req)
+            expected = legacy_feature_matrix(service, service.get_candidate_slots(**req))
+            compiled = compiler.to_frame(compiler.compile(columns))
+            assert list(compiled.columns) == list(expected.columns)
+            assert np.array_equal(compiled.to_numpy(), expected.to_numpy(dtype=np.float64)), \
+                f"feature matrix differs for {req} with {n_rooms} rooms"
+
+        req = {k: v for k, v in REQUESTS[0].items() if k != 'top_k'}
+        columns = service._candidate_columns(service.artifacts, **req)
+        candidates = service.get_candidate_slots(**req)
+        encoder_s = best_of(lambda: service.encode_candidates(candidates), args.repeat)
+        compiled_s = best_of(lambda: compiler.to_frame(compiler.compile(columns)), args.repeat)
+        print(f"{n_rooms:>6} {encoder_s * 1e3:>11.2f} {compiled_s * 1e3:>12.2f} {encoder_s / compiled_s:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Compare the compiled forest backend against RandomForestClassifier.predict_proba.
+
+Checks that both backends return the same probabilities within tolerance, then
+times a single inference call across a range of candidate counts.
+
+    python benchmarks/bench_inference.py --rows 25 275 1000 5000
+"""
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from synthetic import build_artifacts
+from bench_candidates import best_of
+from compiled_forest import CompiledForest
+from recommendation_service import RecommendationService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[25, 275, 1000, 5000])
+    parser.add_argument('--trees', type=int, default=100)
+    parser.add_argument('--train-rows', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--atol', type=float, default=1e-9)
+    args = parser.parse_args()
+
+    dirs = build_artifacts(n_rows=args.train_rows, n_estimators=args.trees)
+    service = RecommendationService(**dirs)
+    model = service.model
+    # As served, reading the compact matrices of the service's feature compiler
+    compiled = CompiledForest.from_sklearn(model).with_compact_input(*service.feature_compiler.column_slots())
+    print(f"{compiled.n_estimators} trees, {len(compiled.feature)} nodes")
+
+    rng = np.random.default_rng(0)
+    columns = service._candidate_columns(service.artifacts, 7, 'Team meeting', 6,
+                                         datetime(2025, 3, 14), list(range(24)))
+    pool = service.feature_compiler.compile(columns)
+
+    print(f"{'rows':>6} {'sklearn ms':>11} {'compiled ms':>12} {'speedup':>8} {'max abs diff':>13}")
+    for n_rows in args.rows:
+        X = pool[rng.integers(0, len(pool), n_rows)]
+        # Perturb numerical columns so rows do not all land in the same leaves
+        X[:, -5:] += rng.normal(0, 1, (n_rows, 5))
+        frame = service.artifacts.model_input(X)
+
+        expected = model.predict_proba(frame)
+        actual = compiled.predict_proba(X)
+        max_diff = np.abs(expected - actual).max()
+        assert np.allclose(expected, actual, rtol=0, atol=args.atol), f"probabilities differ by {max_diff}"
+
+        sklearn_s = best_of(lambda: model.predict_proba(frame), args.repeat)
+        compiled_s = best_of(lambda: compiled.predict_proba(X), args.repeat)
+        print(f"{n_rows:>6} {sklearn_s * 1e3:>11.2f} {compiled_s * 1e3:>12.2f} "
+              f"{sklearn_s / compiled_s:>7.1f}x {max_diff:>13.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Time the post-inference stages: top-k selection, response records and JSON serialization.
+
+Checks that the argpartition ranking matches the original sort_values ranking
+(up to the order of tied scores), then times ranking and serialization across
+a range of candidate counts and top_k values.
+
+    python benchmarks/bench_ranking.py --candidates 25 275 5000 50000 --top-k 1 10 100
+"""
+import argparse
+import json
+from datetime import datetime
+
+import numpy as np
+
+from synthetic import build_artifacts
+from bench_candidates import best_of
+from reference import legacy_rank_candidates, same_ranking
+from json_response import FastJSONResponse
+from recommendation_service import RecommendationService
+
+
+def tile_columns(columns, n_candidates):
+    """Repeat a candidate block until it holds n_candidates rows"""
+    rows = np.arange(n_candidates) % len(columns['room_index'])
+    return {name: values[rows] if np.ndim(values) else values for name, values in columns.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--candidates', type=int, nargs='+', default=[25, 275, 5000, 50000])
+    parser.add_argument('--top-k', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    service = RecommendationService(**build_artifacts(n_rows=5_000, n_estimators=20))
+    block = service._candidate_columns(service.artifacts, 7, 'Team meeting', 6,
+                                       datetime(2025, 3, 14), list(range(24)))
+    rng = np.random.default_rng(0)
+
+    print(f"{'candidates':>10} {'top_k':>6} {'sort ms':>8} {'argpart ms':>11} {'speedup':>8} "
+          f"{'json ms':>8} {'fast ms':>8}")
+    for n_candidates in args.candidates:
+        columns = tile_columns(block, n_candidates)
+        # Two decimals, like a 100-tree forest, so ties are common
+        probs = np.round(rng.random(n_candidates), 2)
+        for top_k in args.top_k:
+            def legacy():
+                return legacy_rank_candidates(service._candidates_frame(columns), probs, top_k)
+
+            def ranked():
+                return service._rank_candidates(columns, probs, top_k)
+
+            records = ranked()
+            assert same_ranking(records, legacy()), f"ranking differs for {n_candidates} candidates, top_k={top_k}"
+            assert records == sorted(records, key=lambda r: -r['success_probability'])
+
+            payload = {'success': True, 'recommendations': records, 'total_recommendations': len(records)}
+            legacy_s = best_of(legacy, args.repeat)
+            ranked_s = best_of(ranked, args.repeat)
+            json_s = best_of(lambda: json.dumps(payload).encode('utf-8'), args.repeat)
+            fast_s = best_of(lambda: FastJSONResponse(payload), args.repeat)
+            print(f"{n_candidates:>10} {top_k:>6} {legacy_s * 1e3:>8.3f} {ranked_s * 1e3:>11.3f} "
+                  f"{legacy_s / ranked_s:>7.1f}x {json_s * 1e3:>8.3f} {fast_s * 1e3:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+"""Benchmark suite: serving stages, artifact loading, training, data generation and HTTP load, saved as JSON.
+
+``run`` builds synthetic data and artifacts locally and measures:
+
+- serving: for every combination of ``--users``, ``--rooms``, ``--hours`` and
+  ``--top-k``, each stage of RecommendationService (candidates, encoding,
+  inference, top_k, serialization) and recommend_slots end to end, plus
+  load_model_artifacts per users/rooms combination
+- load: /recommend through the FastAPI app at each ``--concurrency`` level
+  (see load_test.py), on the first users/rooms/hours/top_k values
+- generator: data_faker/fast_generator.py tables, chunk generation and CSV writing
+- training: the stages of scripts/train_model.py (CSV load, cached load,
+  features, fit, room lookup and preferences) on the generated CSV, without
+  touching the repository's models/ or model_info/
+
+Results go to ``results/<timestamp>.json`` (``--output``), one entry per
+measurement keyed by section, name and parameters. ``compare`` lines up two
+result files and exits with status 1 when a measurement got worse by more
+than ``--threshold``.
+
+    python bench_suite.py run --users 100 1000 --rooms 25 100 --hours 4 11 24 --top-k 10 100
+    python bench_suite.py compare results/before.json results/after.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+
+from synthetic import FEATURES, CATEGORICAL_FEATURES, build_artifacts
+from load_test import load_app, make_payloads, run_load_test
+from json_response import FastJSONResponse
+from recommendation_service import RecommendationService
+from artifact_builder import build_room_lookup, preference_stats, rank_preferences
+from training_data import load_training_data
+from training_features import encode_training_features, fit_input
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'data_faker'))
+import fast_generator  # noqa: E402
+
+SECTIONS = ('serving', 'load', 'generator', 'training')
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+# Metrics compared between runs, and whether a higher value is better
+METRICS = {'median_ms': False, 'p50_ms': False, 'p95_ms': False, 'p99_ms': False,
+           'throughput_rps': True, 'rows_per_s': True}
+
+
+def timed(fn: Callable, repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {'median_ms': round(float(np.median(timings)) * 1e3, 4), 'min_ms': round(min(timings) * 1e3, 4)}
+
+
+def result_key(section: str, name: str, params: Dict[str, Any]) -> str:
+    return f"{section}/{name}[{','.join(f'{k}={v}' for k, v in params.items())}]"
+
+
+class Results:
+    """Measurements of one run, keyed by section, name and parameters"""
+
+    def __init__(self):
+        self.entries = {}
+
+    def add(self, section: str, name: str, params: Dict[str, Any], **values):
+        key = result_key(section, name, params)
+        self.entries[key] = {'section': section, 'name': name, 'params': params, **values}
+        shown = ', '.join(f"{k}={v}" for k, v in values.items())
+        print(f"  {key}: {shown}")
+
+
+def hours_window(n_hours: int) -> List[int]:
+    """n_hours consecutive hours, starting at 8 when they fit in the day"""
+    first_hour = max(0, min(8, 24 - n_hours))
+    return list(range(first_hour, first_hour + n_hours))
+
+
+def bench_serving(args, results: Results):
+    for n_users in args.users:
+        for n_rooms in args.rooms:
+            dirs = build_artifacts(n_users=n_users, n_rooms=n_rooms, n_rows=args.rows,
+                                   n_estimators=args.trees, serving_arrays=True)
+            service = RecommendationService(**dirs, inference_backend=args.backend)
+            artifacts = service.artifacts
+            results.add('serving', 'load_model_artifacts', {'users': n_users, 'rooms': n_rooms},
+                        **timed(service.load_model_artifacts, max(1, args.repeat // 2)))
+
+            for n_hours in args.hours:
+                request = dict(user_id=7, purpose='Team meeting', attendees=6,
+                               target_date=datetime(2025, 3, 14), target_hours=hours_window(n_hours))
+                columns = service._candidate_columns(artifacts, **request)
+                X = service._feature_matrix(artifacts, [columns])
+                scores = service._predict_success(artifacts, X)
+                base = {'users': n_users, 'rooms': n_rooms, 'hours': n_hours}
+                extra = {'candidates': len(columns['room_index'])}
+                results.add('serving', 'candidates', base, **extra, **timed(
+                    lambda: service._candidate_columns(artifacts, **request), args.repeat))
+                results.add('serving', 'encoding', base, **extra, **timed(
+                    lambda: service._feature_matrix(artifacts, [columns]), args.repeat))
+                results.add('serving', 'inference', base, **extra, **timed(
+                    lambda: service._predict_success(artifacts, X), args.repeat))
+
+                for top_k in args.top_k:
+                    params = {**base, 'top_k': top_k}
+                    records = service._rank_candidates(columns, scores, top_k)
+                    payload = {'success': True, 'recommendations': records, 'total_recommendations': len(records)}
+                    results.add('serving', 'top_k', params, **timed(
+                        lambda: service._rank_candidates(columns, scores, top_k), args.repeat))
+                    results.add('serving', 'serialization', params, **timed(
+                        lambda: FastJSONResponse(payload), args.repeat))
+                    results.add('serving', 'recommend_slots', params, **extra, **timed(
+                        lambda: service.recommend_slots(**request, top_k=top_k), args.repeat))
+
+
+def bench_load(args, results: Results):
+    n_users, n_rooms, n_hours, top_k = args.users[0], args.rooms[0], args.hours[0], args.top_k[0]
+    dirs = build_artifacts(n_users=n_users, n_rooms=n_rooms, n_rows=args.rows,
+                           n_estimators=args.trees, serving_arrays=True)
+    os.environ.setdefault('INFERENCE_BACKEND', args.backend)
+    app = load_app(dirs)
+    payloads = make_payloads(256, n_users, n_hours, top_k)
+    for row in run_load_test(app, payloads, args.concurrency, args.load_requests):
+        params = {'users': n_users, 'rooms': n_rooms, 'hours': n_hours, 'top_k': top_k,
+                  'concurrency': row.pop('concurrency')}
+        results.add('load', 'recommend', params, **row)
+
+
+def generate_csv(args, csv_path: str, results: Results = None):
+    """Write args.generator_rows bookings with fast_generator, timing each step when results is given"""
+    params = {'rows': args.generator_rows, 'users': args.generator_users, 'rooms': args.generator_rooms}
+    started = time.perf_counter()
+    tables = fast_generator.build_tables(args.generator_users, args.generator_rooms, 42,
+                                         args.description_pool, datetime(2025, 6, 1))
+    tables_s = time.perf_counter() - started
+    fast_generator.init_worker(tables)
+
+    started = time.perf_counter()
+    df = fast_generator.generate_chunk(args.generator_rows, np.random.default_rng(42))
+    generate_s = time.perf_counter() - started
+    started = time.perf_counter()
+    df.to_csv(csv_path, index=False)
+    write_s = time.perf_counter() - started
+
+    if results is not None:
+        results.add('generator', 'tables', params, median_ms=round(tables_s * 1e3, 1))
+        results.add('generator', 'generate_chunk', params, median_ms=round(generate_s * 1e3, 1),
+                    rows_per_s=round(args.generator_rows / generate_s))
+        results.add('generator', 'write_csv', params, median_ms=round(write_s * 1e3, 1),
+                    rows_per_s=round(args.generator_rows / write_s))
+
+
+def bench_training(args, results: Results, csv_path: str):
+    params = {'rows': args.generator_rows, 'users': args.generator_users, 'rooms': args.generator_rooms,
+              'trees': args.trees}
+
+    def stage(name: str, fn: Callable):
+        started = time.perf_counter()
+        value = fn()
+        results.add('training', name, params, median_ms=round((time.perf_counter() - started) * 1e3, 1))
+        return value
+
+    # The first load parses the CSV and writes the Parquet cache, the second reads the cache
+    stage('load_csv', lambda: load_training_data(csv_path))
+    df = stage('load_cached', lambda: load_training_data(csv_path))
+    target = ((df['overloaded'] == 0) & (df['conflict_flag'] == 0) & (df['anomaly_flag'] == 0)).astype(int)
+    _, X = stage('features', lambda: encode_training_features(df, FEATURES, CATEGORICAL_FEATURES))
+    stage('fit', lambda: RandomForestClassifier(n_estimators=args.trees, random_state=42)
+          .fit(fit_input(X), target))
+    stage('room_lookup', lambda: build_room_lookup(df))
+    stage('user_preferences', lambda: rank_preferences(preference_stats(df)))
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    results = Results()
+    started = time.perf_counter()
+    if 'serving' in args.sections:
+        print("⏱️ Serving stages")
+        bench_serving(args, results)
+    if 'generator' in args.sections or 'training' in args.sections:
+        with tempfile.TemporaryDirectory(prefix='booking_bench_') as tmp_dir:
+            csv_path = os.path.join(tmp_dir, 'dataset.csv')
+            print("⏱️ Data generator")
+            generate_csv(args, csv_path, results if 'generator' in args.sections else None)
+            if 'training' in args.sections:
+                print("⏱️ Training")
+                bench_training(args, results, csv_path)
+    if 'load' in args.sections:
+        print("⏱️ HTTP load")
+        bench_load(args, results)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    parameters = {k: v for k, v in vars(args).items() if k not in ('command', 'func', 'output')}
+    with open(output, 'w') as f:
+        json.dump({
+            'meta': {
+                'created': datetime.now().isoformat(),
+                'git_commit': git_commit(),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'pandas': pd.__version__,
+                'sklearn': sklearn.__version__,
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'parameters': parameters,
+            },
+            'results': results.entries,
+        }, f, indent=2)
+    print(f"✅ {len(results.entries)} measurements in {time.perf_counter() - started:.1f}s, written to {output}")
+
+
+def compare(args):
+    with open(args.base, 'r') as f:
+        base = json.load(f)['results']
+    with open(args.new, 'r') as f:
+        new = json.load(f)['results']
+
+    regressions = 0
+    print(f"{'measurement':<70} {'metric':>14} {'base':>10} {'new':>10} {'change':>8}")
+    for key in sorted(base.keys() & new.keys()) if args.sort else [k for k in base if k in new]:
+        for metric, higher_is_better in METRICS.items():
+            if metric not in base[key] or metric not in new[key] or not base[key][metric]:
+                continue
+            old_value, new_value = base[key][metric], new[key][metric]
+            change = new_value / old_value - 1
+            worse = -change if higher_is_better else change
+            flag = ''
+            if worse > args.threshold:
+                flag = ' ⚠️'
+                regressions += 1
+            elif worse < -args.threshold:
+                flag = ' ✅'
+            print(f"{key:<70} {metric:>14} {old_value:>10.4g} {new_value:>10.4g} {change * 100:>+7.1f}%{flag}")
+
+    only = sorted(base.keys() ^ new.keys())
+    if only:
+        print(f"{len(only)} measurements are only in one of the runs")
+    print(f"{regressions} regressions beyond {args.threshold * 100:.0f}%")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the benchmarks and write a result file')
+    run_parser.add_argument('--sections', nargs='+', choices=SECTIONS, default=list(SECTIONS))
+    run_parser.add_argument('--users', type=int, nargs='+', default=[100, 1000])
+    run_parser.add_argument('--rooms', type=int, nargs='+', default=[25, 100])
+    run_parser.add_argument('--hours', type=int, nargs='+', default=[4, 11, 24], help='target hours per request')
+    run_parser.add_argument('--top-k', type=int, nargs='+', default=[10, 100])
+    run_parser.add_argument('--rows', type=int, default=20_000, help='training rows of the synthetic models')
+    run_parser.add_argument('--trees', type=int, default=100)
+    run_parser.add_argument('--backend', choices=['sklearn', 'compiled', 'auto'], default='sklearn')
+    run_parser.add_argument('--repeat', type=int, default=20)
+    run_parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    run_parser.add_argument('--load-requests', type=int, default=500, help='requests per concurrency level')
+    run_parser.add_argument('--generator-rows', type=int, default=200_000)
+    run_parser.add_argument('--generator-users', type=int, default=100)
+    run_parser.add_argument('--generator-rooms', type=int, default=25)
+    run_parser.add_argument('--description-pool', type=int, default=100)
+    run_parser.add_argument('--output', help='result file (default: results/<timestamp>.json)')
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser('compare', help='compare two result files')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='relative change counted as a regression (default 0.10)')
+    compare_parser.add_argument('--sort', action='store_true', help='list measurements sorted by key')
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Fit time and peak memory of training on the dense one-hot frame against the sparse feature matrix.
+
+Repeats the rows of an existing bookings CSV up to each requested size, then,
+in a fresh process per mode, encodes the features and fits the forest. The
+dense mode is what train_model.py did before (``encoder.fit_transform(...)
+.toarray()`` wrapped in a DataFrame); the sparse mode fits on the matrix from
+scripts/training_features.py as is, and the auto mode goes through its
+``fit_input``, as train_model.py does. Reports the encoding and fit time, the
+peak RSS growth over the loaded data and the size of the feature matrix. With
+``--new-users`` every repetition gets its own user ids, so the number of
+one-hot columns grows with the rows. Linux only (reads ru_maxrss).
+
+    python benchmarks/bench_training_features.py --rows 300000 3000000 --trees 10
+"""
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+MODES = ['dense', 'sparse', 'auto']
+FEATURES = [
+    'user_id', 'purpose', 'room_type',
+    'has_projector', 'has_whiteboard', 'attendees', 'room_capacity',
+    'hour_of_day', 'day_of_week', 'is_weekend', 'is_preferred_room',
+    'capacity_utilization', 'season'
+]
+CATEGORICAL_FEATURES = ['user_id', 'purpose', 'room_type']
+
+
+def peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def dense_features(df):
+    """The feature frame train_model.py used to build"""
+    import pandas as pd
+    from sklearn.preprocessing import OneHotEncoder
+
+    X_cat = df[CATEGORICAL_FEATURES]
+    X_num = df[FEATURES].drop(columns=CATEGORICAL_FEATURES)
+    encoder = OneHotEncoder(handle_unknown='ignore')
+    X_encoded_cat = pd.DataFrame(
+        encoder.fit_transform(X_cat).toarray(),
+        columns=encoder.get_feature_names_out(CATEGORICAL_FEATURES)
+    )
+    return pd.concat([X_encoded_cat, X_num.reset_index(drop=True)], axis=1)
+
+
+def load_rows(csv_path, n_rows, new_users):
+    import pandas as pd
+    from training_data import load_training_data
+
+    df = load_training_data(csv_path)
+    copies = -(-n_rows // len(df))
+    parts = [df.assign(user_id=df['user_id'] + i * (int(df['user_id'].max()) + 1)) if new_users else df
+             for i in range(copies)]
+    df = pd.concat(parts, ignore_index=True).head(n_rows)
+    df['target'] = ((df['overloaded'] == 0) & (df['conflict_flag'] == 0) & (df['anomaly_flag'] == 0)).astype(int)
+    return df
+
+
+def train(mode, csv_path, n_rows, new_users, n_trees, results):
+    import numpy as np
+    from sklearn.ensemble import RandomForestClassifier
+    from training_features import encode_training_features, fit_input
+
+    df = load_rows(csv_path, n_rows, new_users)
+    if mode != 'dense':
+        # Same columns, in the same order, as the dense frame
+        head = df.head(1000)
+        assert np.array_equal(encode_training_features(head, FEATURES, CATEGORICAL_FEATURES)[1].toarray(),
+                              dense_features(head).to_numpy(dtype=np.float32))
+
+    before = peak_mb()
+    start = time.perf_counter()
+    if mode == 'dense':
+        X = dense_features(df)
+        matrix_mb = X.memory_usage(deep=True).sum() / 1e6
+    else:
+        _, X = encode_training_features(df, FEATURES, CATEGORICAL_FEATURES)
+        matrix_mb = (X.data.nbytes + X.indices.nbytes + X.indptr.nbytes) / 1e6
+        X = fit_input(X) if mode == 'auto' else X.tocsc()
+    encoded = time.perf_counter()
+    RandomForestClassifier(n_estimators=n_trees, random_state=42).fit(X, df['target'])
+    fitted = time.perf_counter()
+    results.put((X.shape[1], encoded - start, fitted - encoded, peak_mb() - before, matrix_mb))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--csv', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'dataset.csv'))
+    parser.add_argument('--rows', type=int, nargs='+', default=[300_000, 3_000_000])
+    parser.add_argument('--trees', type=int, default=10)
+    parser.add_argument('--new-users', action='store_true', help='give every repetition of the CSV its own user ids')
+    args = parser.parse_args()
+
+    ctx = mp.get_context('spawn')
+    results = ctx.Queue()
+    print(f"{'rows':>9} {'mode':>7} {'columns':>8} {'encode s':>9} {'fit s':>7} {'peak RSS MB':>12} {'matrix MB':>10}")
+    for n_rows in args.rows:
+        for mode in MODES:
+            process = ctx.Process(target=train, args=(mode, args.csv, n_rows, args.new_users, args.trees, results))
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                # Typically the OOM killer (exit code -9) on the dense frame
+                print(f"{n_rows:>9} {mode:>7} failed with exit code {process.exitcode}")
+                continue
+            n_columns, encode_s, fit_s, peak, matrix_mb = results.get()
+            print(f"{n_rows:>9} {mode:>7} {n_columns:>8} {encode_s:>9.2f} {fit_s:>7.1f} {peak:>12.0f} {matrix_mb:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
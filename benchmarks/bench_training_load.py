@@ -0,0 +1,73 @@
+"""Load time and peak memory of the training data: default read_csv against the typed, cached loader.
+
+Builds a larger bookings CSV by repeating an existing one, then loads it in a
+fresh process per mode and reports wall time, the peak RSS growth during the
+load and the size of the resulting frame. Linux only (reads ru_maxrss).
+
+    python benchmarks/bench_training_load.py --csv data/dataset.csv --copies 10
+"""
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+MODES = ['read_csv', 'typed', 'typed+cache write', 'cached']
+
+
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+
+
+def load(mode, csv_path, results):
+    import pandas as pd
+    from training_data import load_training_data, read_training_csv
+
+    before = rss_mb()
+    start = time.perf_counter()
+    if mode == 'read_csv':
+        # What train_model.py did before
+        df = pd.read_csv(csv_path, parse_dates=['start_time', 'end_time'])
+    elif mode == 'typed':
+        df = read_training_csv(csv_path)
+    else:
+        df = load_training_data(csv_path)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3 - before
+    results.put((mode, len(df), elapsed, peak, df.memory_usage(deep=True).sum() / 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--csv', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'dataset.csv'))
+    parser.add_argument('--copies', type=int, default=10, help='times the CSV rows are repeated')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'dataset.csv')
+        with open(args.csv) as src, open(csv_path, 'w') as dst:
+            header = src.readline()
+            body = src.read()
+            dst.write(header)
+            for _ in range(args.copies):
+                dst.write(body)
+        print(f"{os.path.getsize(csv_path) / 1e6:.0f} MB CSV")
+
+        ctx = mp.get_context('spawn')
+        results = ctx.Queue()
+        print(f"{'mode':>18} {'rows':>9} {'load s':>7} {'peak RSS MB':>12} {'frame MB':>9}")
+        for mode in MODES:
+            process = ctx.Process(target=load, args=(mode, csv_path, results))
+            process.start()
+            mode, rows, elapsed, peak, frame = results.get()
+            process.join()
+            print(f"{mode:>18} {rows:>9} {elapsed:>7.2f} {peak:>12.0f} {frame:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
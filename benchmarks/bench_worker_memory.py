@@ -0,0 +1,79 @@
+"""Measure per-worker memory with pickled vs memory-mapped serving artifacts.
+
+Starts N worker processes at once, each loading the service and answering one
+request, and reports RSS plus PSS (proportional set size, which splits shared
+pages between the processes mapping them) per worker. Linux only.
+
+    python benchmarks/bench_worker_memory.py --workers 4
+"""
+import argparse
+import multiprocessing as mp
+import os
+import time
+from datetime import datetime
+
+from synthetic import build_artifacts
+
+
+def memory_kb():
+    """RSS and PSS of the current process, from /proc/self/smaps_rollup"""
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:'):
+                values[parts[0][:-1].lower()] = int(parts[1])
+    return values
+
+
+def worker(dirs, backend, barrier, results):
+    from recommendation_service import RecommendationService
+
+    start = time.perf_counter()
+    service = RecommendationService(**dirs, inference_backend=backend)
+    load_s = time.perf_counter() - start
+    service.recommend_slots(7, 'Team meeting', 6, datetime(2025, 3, 14), list(range(8, 19)))
+    # Measure while every worker is alive, so shared pages are split between them
+    barrier.wait()
+    results.put(dict(memory_kb(), load_s=load_s))
+    barrier.wait()
+
+
+def run(dirs, backend, n_workers):
+    ctx = mp.get_context('spawn')
+    barrier = ctx.Barrier(n_workers)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(dirs, backend, barrier, results)) for _ in range(n_workers)]
+    for p in processes:
+        p.start()
+    samples = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--train-rows', type=int, default=50_000)
+    parser.add_argument('--trees', type=int, default=100)
+    args = parser.parse_args()
+
+    pickled = build_artifacts(n_rows=args.train_rows, n_estimators=args.trees)
+    mapped = build_artifacts(n_rows=args.train_rows, n_estimators=args.trees, serving_arrays=True)
+    model_mb = os.path.getsize(os.path.join(pickled['models_dir'], 'model_2000-01-01_00-00.pkl')) / 2 ** 20
+    print(f"model pickle: {model_mb:.1f} MB, {args.workers} workers")
+
+    print(f"{'artifacts':>22} {'RSS MB':>8} {'PSS MB':>8} {'total PSS MB':>13} {'load s':>7}")
+    for label, dirs, backend in (('pickle + sklearn', pickled, 'sklearn'),
+                                 ('pickle + compiled', pickled, 'compiled'),
+                                 ('memory-mapped compiled', mapped, 'compiled')):
+        samples = run(dirs, backend, args.workers)
+        rss = sum(s['rss'] for s in samples) / len(samples) / 1024
+        pss = sum(s['pss'] for s in samples) / len(samples) / 1024
+        load_s = sum(s['load_s'] for s in samples) / len(samples)
+        print(f"{label:>22} {rss:>8.1f} {pss:>8.1f} {pss * len(samples):>13.1f} {load_s:>7.2f}")
+
+
+if __name__ == '__main__':
+    main()
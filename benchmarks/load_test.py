@@ -0,0 +1,137 @@
+"""In-process load test of the /recommend endpoint of app/main.py.
+
+Drives the FastAPI app through httpx's ASGI transport, so no server or
+sockets are involved and the numbers cover routing, validation, the micro
+batcher, scoring and serialization. The app starts through its own lifespan
+(loading and warming up the artifacts) with BACKGROUND_LOADING=0. Each
+concurrency level runs that many clients in a closed loop, each sending its
+next request as soon as the previous one answers, and reports throughput and
+p50/p95/p99 latency.
+
+Unless set in the environment, the recommendation cache is turned off
+(RECOMMEND_CACHE_SIZE=0) so every request is scored; other settings of
+main.py, such as RECOMMEND_BATCH_WINDOW_MS, are read from the environment.
+
+    python benchmarks/load_test.py --concurrency 1 8 32 --requests 500
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from synthetic import PURPOSES, build_artifacts
+
+
+def percentiles_ms(latencies: List[float]) -> Dict[str, float]:
+    values = np.asarray(latencies) * 1e3
+    return {f'p{q}_ms': round(float(np.percentile(values, q)), 3) for q in (50, 95, 99)}
+
+
+def make_payloads(n_payloads: int, n_users: int, n_hours: int, top_k: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """JSON bodies for /recommend over a spread of users, purposes, head counts and days"""
+    rng = np.random.default_rng(seed)
+    first_hour = max(0, min(8, 24 - n_hours))
+    return [{
+        'user_id': int(rng.integers(1, n_users + 1)),
+        'purpose': PURPOSES[int(rng.integers(0, len(PURPOSES)))],
+        'attendees': int(rng.integers(1, 16)),
+        'target_date': f"2025-{int(rng.integers(1, 13)):02d}-{int(rng.integers(1, 29)):02d}T00:00:00",
+        'target_hours': list(range(first_hour, first_hour + n_hours)),
+        'top_k': top_k,
+    } for _ in range(n_payloads)]
+
+
+def load_app(dirs: Dict[str, str]):
+    """Import app/main.py configured for the given artifact folders"""
+    os.environ.update(MODELS_DIR=dirs['models_dir'], MODEL_INFO_DIR=dirs['info_dir'],
+                      ENCODER_DIR=dirs['encoder_dir'], BACKGROUND_LOADING='0')
+    os.environ.setdefault('RECOMMEND_CACHE_SIZE', '0')
+    return importlib.import_module('main').app
+
+
+async def _drive(client, payloads: List[Dict[str, Any]], concurrency: int, n_requests: int) -> Dict[str, Any]:
+    latencies = []
+    errors = 0
+    issued = 0
+
+    async def client_loop():
+        nonlocal errors, issued
+        while issued < n_requests:
+            payload = payloads[issued % len(payloads)]
+            issued += 1
+            started = time.perf_counter()
+            response = await client.post('/recommend', json=payload)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        **percentiles_ms(latencies),
+    }
+
+
+async def _run(app, payloads: List[Dict[str, Any]], concurrency_levels: List[int], n_requests: int,
+               warmup: int) -> List[Dict[str, Any]]:
+    import httpx
+
+    results = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            ready = await client.get('/readyz')
+            if ready.status_code != 200:
+                raise RuntimeError(f"App is not ready: {ready.text}")
+            for concurrency in concurrency_levels:
+                if warmup:
+                    await _drive(client, payloads, concurrency, warmup)
+                results.append(await _drive(client, payloads, concurrency, n_requests))
+    return results
+
+
+def run_load_test(app, payloads: List[Dict[str, Any]], concurrency_levels: List[int],
+                  n_requests: int = 500, warmup: int = 20) -> List[Dict[str, Any]]:
+    """Throughput and latency percentiles of /recommend at each concurrency level"""
+    return asyncio.run(_run(app, payloads, concurrency_levels, n_requests, warmup))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--requests', type=int, default=500, help='requests per concurrency level')
+    parser.add_argument('--warmup', type=int, default=20, help='unmeasured requests before each level')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--rooms', type=int, default=25)
+    parser.add_argument('--hours', type=int, default=11, help='target hours per request')
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--trees', type=int, default=100)
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    args = parser.parse_args()
+
+    dirs = build_artifacts(n_users=args.users, n_rooms=args.rooms, n_estimators=args.trees, serving_arrays=True)
+    payloads = make_payloads(256, args.users, args.hours, args.top_k)
+    results = run_load_test(load_app(dirs), payloads, args.concurrency, args.requests, args.warmup)
+
+    print(f"{'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}")
+    for row in results:
+        print(f"{row['concurrency']:>7} {row['throughput_rps']:>8.1f} {row['p50_ms']:>8.2f} "
+              f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['errors']:>6}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'parameters': vars(args), 'load': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
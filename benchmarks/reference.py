@@ -0,0 +1,91 @@
+"""The original serving path, kept as a reference for parity checks in the benchmarks"""
+import pandas as pd
+
+
+def legacy_candidate_slots(service, user_id, purpose, attendees, target_date, target_hours):
+    """Original dict-per-candidate loop from RecommendationService.get_candidate_slots"""
+    candidates = []
+    user_preferred_rooms = service.user_preferences.get(str(user_id), [])
+
+    for hour in target_hours:
+        for room_id in service.room_lookup.keys():
+            start_time = target_date.replace(hour=hour, minute=0, second=0, microsecond=0)
+
+            candidates.append({
+                'user_id': user_id,
+                'purpose': purpose,
+                'room_type': service.room_lookup[room_id]['room_type'],
+                'has_projector': service.room_lookup[room_id]['has_projector'],
+                'has_whiteboard': service.room_lookup[room_id]['has_whiteboard'],
+                'attendees': attendees,
+                'room_capacity': service.room_lookup[room_id]['room_capacity'],
+                'hour_of_day': hour,
+                'day_of_week': start_time.weekday(),
+                'is_weekend': 1 if start_time.weekday() >= 5 else 0,
+                'is_preferred_room': 1 if room_id in user_preferred_rooms else 0,
+                'capacity_utilization': attendees / service.room_lookup[room_id]['room_capacity'],
+                'season': ((start_time.month % 12) // 3) + 1,
+                'room_id': room_id,
+                'start_time': start_time
+            })
+
+    return pd.DataFrame(candidates)
+
+
+def legacy_feature_matrix(service, candidates):
+    """Original encoder.transform + pd.concat feature assembly"""
+    X_candidate = candidates[service.feature_info['features']]
+    cat_features = service.feature_info['categorical_features']
+    X_cat = X_candidate[cat_features]
+    X_num = X_candidate.drop(columns=cat_features)
+    X_encoded_cat = pd.DataFrame(
+        service.encoder.transform(X_cat).toarray(),
+        columns=service.encoder.get_feature_names_out(cat_features)
+    )
+    return pd.concat([X_encoded_cat, X_num.reset_index(drop=True)], axis=1)
+
+
+def legacy_recommend_slots(service, user_id, purpose, attendees, target_date, target_hours, top_k=10):
+    """Original RecommendationService.recommend_slots"""
+    candidates = legacy_candidate_slots(service, user_id, purpose, attendees, target_date, target_hours)
+    X_final = legacy_feature_matrix(service, candidates)
+    return legacy_rank_candidates(candidates, service.model.predict_proba(service.artifacts.model_input(X_final))[:, 1], top_k)
+
+
+def legacy_rank_candidates(candidates, success_probabilities, top_k):
+    """Original full sort_values + iterrows ranking step"""
+    candidates['success_probability'] = success_probabilities
+    top_recommendations = candidates.sort_values('success_probability', ascending=False).head(top_k)
+
+    recommendations = []
+    for _, row in top_recommendations.iterrows():
+        recommendations.append({
+            'room_id': row['room_id'],
+            'start_time': row['start_time'].isoformat(),
+            'success_probability': float(row['success_probability']),
+            'room_type': row['room_type'],
+            'room_capacity': int(row['room_capacity']),
+            'has_projector': bool(row['has_projector']),
+            'has_whiteboard': bool(row['has_whiteboard']),
+            'capacity_utilization': float(row['capacity_utilization'])
+        })
+    return recommendations
+
+
+def same_ranking(actual, expected):
+    """Whether two recommendation lists agree up to the order of tied scores.
+
+    The original path used an unstable sort, so candidates with equal
+    probabilities may come out in any order, and a tie straddling top_k may
+    keep different members.
+    """
+    if [r['success_probability'] for r in actual] != [r['success_probability'] for r in expected]:
+        return False
+    if not actual:
+        return True
+    cutoff = actual[-1]['success_probability']
+
+    def above_cutoff(records):
+        return sorted(sorted(r.items()) for r in records if r['success_probability'] > cutoff)
+
+    return above_cutoff(actual) == above_cutoff(expected)
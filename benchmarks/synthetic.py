@@ -0,0 +1,124 @@
+"""Build small synthetic model artifacts so benchmarks can run without a trained model"""
+import json
+import os
+import sys
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+APP_DIR = os.path.join(os.path.dirname(__file__), '..', 'app')
+SCRIPTS_DIR = os.path.join(os.path.dirname(__file__), '..', 'scripts')
+for path in (APP_DIR, SCRIPTS_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from serving_artifacts import write_serving_artifacts  # noqa: E402
+from training_features import encode_training_features, fit_input  # noqa: E402
+
+FEATURES = [
+    'user_id', 'purpose', 'room_type',
+    'has_projector', 'has_whiteboard', 'attendees', 'room_capacity',
+    'hour_of_day', 'day_of_week', 'is_weekend', 'is_preferred_room',
+    'capacity_utilization', 'season'
+]
+CATEGORICAL_FEATURES = ['user_id', 'purpose', 'room_type']
+PURPOSES = [
+    'Team meeting', 'Project presentation', 'Interview', 'Training session', 'Client meeting',
+    'Workshop', 'Conference call', 'Brainstorming', 'Demo', 'One-on-one'
+]
+ROOM_TYPES = ['meeting', 'training', 'interview', 'flex']
+
+
+def make_rooms(n_rooms: int, rng: np.random.Generator) -> dict:
+    """Random room_lookup in the format written by scripts/train_model.py"""
+    return {
+        f"R{i + 1}": {
+            'room_capacity': int(rng.integers(5, 31)),
+            'room_type': str(rng.choice(ROOM_TYPES)),
+            'has_projector': bool(rng.integers(0, 2)),
+            'has_whiteboard': bool(rng.integers(0, 2)),
+        }
+        for i in range(n_rooms)
+    }
+
+
+def make_bookings(n_rows: int, room_lookup: dict, user_preferences: dict,
+                  rng: np.random.Generator) -> pd.DataFrame:
+    """Random booking rows carrying every training feature plus a target"""
+    room_ids = np.array(list(room_lookup.keys()), dtype=object)
+    n_users = len(user_preferences)
+    user_id = rng.integers(1, n_users + 1, n_rows)
+    room_id = room_ids[rng.integers(0, len(room_ids), n_rows)]
+    capacity = np.array([room_lookup[r]['room_capacity'] for r in room_id])
+    attendees = rng.integers(1, capacity + 6)
+    hour = rng.integers(5, 23, n_rows)
+    day_of_week = rng.integers(0, 7, n_rows)
+    preferred = np.array([r in user_preferences[str(u)] for u, r in zip(user_id, room_id)], dtype=int)
+    df = pd.DataFrame({
+        'user_id': user_id,
+        'purpose': np.array(PURPOSES, dtype=object)[rng.integers(0, len(PURPOSES), n_rows)],
+        'room_type': [room_lookup[r]['room_type'] for r in room_id],
+        'has_projector': [room_lookup[r]['has_projector'] for r in room_id],
+        'has_whiteboard': [room_lookup[r]['has_whiteboard'] for r in room_id],
+        'attendees': attendees,
+        'room_capacity': capacity,
+        'hour_of_day': hour,
+        'day_of_week': day_of_week,
+        'is_weekend': (day_of_week >= 5).astype(int),
+        'is_preferred_room': preferred,
+        'capacity_utilization': attendees / capacity,
+        'season': rng.integers(1, 5, n_rows),
+        'room_id': room_id,
+    })
+    noise = rng.random(n_rows) < 0.1
+    df['target'] = ((attendees <= capacity) & (hour >= 7) & (hour <= 19) & ~noise).astype(int)
+    return df
+
+
+def build_artifacts(out_dir: str = None, n_users: int = 100, n_rooms: int = 25,
+                    n_rows: int = 20_000, n_estimators: int = 100, seed: int = 42,
+                    serving_arrays: bool = False) -> dict:
+    """Train a model on random bookings and write every serving artifact under out_dir.
+
+    With ``serving_arrays`` the memory-mappable arrays are written next to the
+    model as well, as scripts/train_model.py does.
+    """
+    out_dir = out_dir or tempfile.mkdtemp(prefix='booking_bench_')
+    dirs = {name: os.path.join(out_dir, name) for name in ('models_dir', 'info_dir', 'encoder_dir')}
+    for path in dirs.values():
+        os.makedirs(path, exist_ok=True)
+
+    rng = np.random.default_rng(seed)
+    room_lookup = make_rooms(n_rooms, rng)
+    room_ids = list(room_lookup.keys())
+    user_preferences = {
+        str(user_id): [str(r) for r in rng.choice(room_ids, size=min(5, n_rooms), replace=False)]
+        for user_id in range(1, n_users + 1)
+    }
+    df = make_bookings(n_rows, room_lookup, user_preferences, rng)
+
+    encoder, X_encoded = encode_training_features(df, FEATURES, CATEGORICAL_FEATURES)
+    model = RandomForestClassifier(n_estimators=n_estimators, random_state=seed, n_jobs=-1)
+    model.fit(fit_input(X_encoded), df['target'])
+    model.set_params(n_jobs=None)
+
+    model_path = os.path.join(dirs['models_dir'], 'model_2000-01-01_00-00.pkl')
+    if serving_arrays:
+        write_serving_artifacts(model_path, model, room_lookup, user_preferences)
+    joblib.dump(model, model_path)
+    joblib.dump(encoder, os.path.join(dirs['encoder_dir'], 'encoder.pkl'))
+    with open(os.path.join(dirs['info_dir'], 'room_lookup.json'), 'w') as f:
+        json.dump(room_lookup, f)
+    with open(os.path.join(dirs['info_dir'], 'user_preferences.json'), 'w') as f:
+        json.dump(user_preferences, f)
+    with open(os.path.join(dirs['info_dir'], 'model_info.json'), 'w') as f:
+        json.dump({
+            'features': FEATURES,
+            'categorical_features': CATEGORICAL_FEATURES,
+            'model_version': 'synthetic',
+            'trained_date': '2000-01-01T00:00:00'
+        }, f)
+    return dirs
@@ -0,0 +1,4 @@
+@echo off
+cd /d %~dp0..\scripts
+python train_incremental.py
+python materialize_scores.py
@@ -1,3 +1,4 @@
 @echo off
 cd /d %~dp0..\scripts
 python train_model.py
+python materialize_scores.py
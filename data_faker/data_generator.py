@@ -3,6 +3,11 @@ import random
 from faker import Faker
 from datetime import timedelta
 import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from purposes import PURPOSE_REQUIREMENTS
 
 
 # Set seeds for reproducibility
@@ -25,20 +30,6 @@ rooms = [{
     "room_type": random.choice(["meeting", "training", "interview", "flex"])
 } for i in range(NUM_ROOMS)]
 
-# Booking purposes with required room features
-purposes = {
-    "Team meeting": {"room_type": ["meeting", "flex"], "min_capacity": 8},
-    "Project presentation": {"has_projector": True, "room_type": ["training", "meeting"]},
-    "Interview": {"room_type": ["interview"], "max_noise": True},
-    "Training session": {"has_whiteboard": True, "min_capacity": 10},
-    "Client meeting": {"room_type": ["meeting"], "min_capacity": 5},
-    "Workshop": {"has_whiteboard": True, "room_type": ["training"]},
-    "Conference call": {"room_type": ["flex", "meeting"], "min_capacity": 3},
-    "Brainstorming": {"has_whiteboard": True, "room_type": ["meeting", "flex"]},
-    "Demo": {"has_projector": True, "room_type": ["meeting", "training"]},
-    "One-on-one": {"room_type": ["interview", "flex"], "max_capacity": 5}
-}
-
 # User-room preferences (each user prefers rooms matching their needs)
 user_preferences = {}
 for user_id in range(1, NUM_USERS + 1):
@@ -96,8 +87,8 @@ for batch in range(0, NUM_ENTRIES, batch_size):
             print(f"Progress: {batch + i}/{NUM_ENTRIES} ({((batch + i) / NUM_ENTRIES) * 100:.1f}%)")
 
         user_id = random.randint(1, NUM_USERS)
-        purpose = random.choice(list(purposes.keys()))
-        purpose_reqs = purposes[purpose]
+        purpose = random.choice(list(PURPOSE_REQUIREMENTS.keys()))
+        purpose_reqs = PURPOSE_REQUIREMENTS[purpose]
 
         # Filter rooms that match purpose requirements
         compatible_rooms = [
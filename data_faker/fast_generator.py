@@ -0,0 +1,312 @@
+"""Vectorized, parallel booking generator for scale testing.
+
+Produces the same columns and distributions as data_generator.py, but draws
+every column for a chunk of rows at once with NumPy instead of one row at a
+time:
+
+- purpose -> compatible room and user -> preferred room tables are computed
+  once, so picking a room is a few array lookups per chunk
+- descriptions come from a pool built once with Faker (``--description-pool``
+  per purpose; ``0`` leaves them empty, since training does not read them)
+- chunks are generated by ``--workers`` processes, each from its own seed
+  spawned from ``--seed``, so the output does not depend on the worker count
+- each chunk is written as soon as it is ready, as ``part-<chunk>.csv`` or
+  ``.parquet`` in ``--output``; ``--merge-csv`` then streams the CSV parts into
+  a single file such as ``data/dataset.csv``
+
+Start times fall in the 90 days before ``--end-date`` (default: today at
+midnight, so a run is reproducible within a day).
+
+    python fast_generator.py --rows 10000000 --users 5000 --rooms 200 --format parquet
+"""
+import argparse
+import glob
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from purposes import PURPOSE_REQUIREMENTS
+
+ROOM_TYPES = ["meeting", "training", "interview", "flex"]
+DURATIONS = np.array([30, 60, 90, 120])
+ANOMALY_HOURS = np.array([5, 6, 20, 21, 22])
+MAX_PREFERRED_ROOMS = 5
+DAYS = 90
+US_PER_HOUR = 3_600_000_000
+# Files written to --output, the only ones a rerun removes
+PART_FILE = re.compile(r'part-\d{5}\.(csv|parquet)(\.tmp)?')
+
+# Same templates as data_generator.py, filled from Faker once per pool entry
+DESCRIPTION_TEMPLATES = {
+    "Team meeting": lambda fake: f"Team sync on {fake.bs()}",
+    "Project presentation": lambda fake: f"Presentation for {fake.job()} stakeholders",
+    "Interview": lambda fake: f"Interview with {fake.name()} for {fake.job()} role",
+    "Training session": lambda fake: f"Training on {fake.catch_phrase()}",
+    "Client meeting": lambda fake: f"Client meeting with {fake.company()}",
+    "Workshop": lambda fake: f"Workshop on {fake.bs()}",
+    "Conference call": lambda fake: f"Conference call with {fake.company()}",
+    "Brainstorming": lambda fake: f"Brainstorming session for {fake.catch_phrase()}",
+    "Demo": lambda fake: f"Demo of {fake.catch_phrase()}",
+    "One-on-one": lambda fake: f"One-on-one with {fake.name()}",
+}
+
+# Built in the parent by build_tables and handed to each worker by init_worker
+tables = None
+
+
+def make_rooms(n_rooms: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    return {
+        'room_id': np.array([f"R{i + 1}" for i in range(n_rooms)], dtype=object),
+        'capacity': rng.integers(5, 31, n_rooms),
+        'has_projector': rng.random(n_rooms) < 0.5,
+        'has_whiteboard': rng.random(n_rooms) < 0.5,
+        'room_type': np.array(ROOM_TYPES, dtype=object)[rng.integers(0, len(ROOM_TYPES), n_rooms)],
+    }
+
+
+def compatible_rooms(rooms: Dict[str, np.ndarray], requirements: Dict[str, Any]) -> np.ndarray:
+    """Boolean mask of the rooms meeting one purpose's requirements (check_room_compatibility)"""
+    mask = np.ones(len(rooms['capacity']), dtype=bool)
+    for key, value in requirements.items():
+        if key == "min_capacity":
+            mask &= rooms['capacity'] >= value
+        elif key == "max_capacity":
+            mask &= rooms['capacity'] <= value
+        elif key == "room_type":
+            mask &= np.isin(rooms['room_type'], value if isinstance(value, list) else [value])
+        elif key in ["has_projector", "has_whiteboard"]:
+            mask &= rooms[key] == value
+    # Fallback to all rooms if no matches
+    return mask if mask.any() else np.ones_like(mask)
+
+
+def preferred_rooms(n_users: int, rooms: Dict[str, np.ndarray], rng: np.random.Generator,
+                    block: int = 10_000) -> np.ndarray:
+    """First MAX_PREFERRED_ROOMS preferred room indices per user, -1 padded, with data_generator.py's rules"""
+    n_rooms = len(rooms['capacity'])
+    preferred = np.full((n_users, MAX_PREFERRED_ROOMS), -1, dtype=np.int32)
+    for start in range(0, n_users, block):
+        user_ids = np.arange(start + 1, min(start + block, n_users) + 1)[:, None]
+        mask = (((user_ids % 5 == 0) & rooms['has_projector']) |
+                ((user_ids % 3 == 0) & (rooms['room_type'] == "interview")) |
+                ((user_ids % 7 == 0) & rooms['has_whiteboard']) |
+                (rng.random((len(user_ids), n_rooms)) < 0.3))
+        # Ensure each user has at least 2 preferred rooms
+        for row in np.flatnonzero(mask.sum(axis=1) < 2):
+            mask[row, rng.choice(n_rooms, size=min(2, n_rooms), replace=False)] = True
+        # Rooms in index order, preferred first; keep the top 5
+        order = np.argsort(~mask, axis=1, kind='stable')[:, :MAX_PREFERRED_ROOMS]
+        kept = np.take_along_axis(mask, order, axis=1)
+        preferred[start:start + len(user_ids), :order.shape[1]] = np.where(kept, order, -1)
+    return preferred
+
+
+def description_pool(pool_size: int, seed: int) -> Dict[str, np.ndarray]:
+    if pool_size == 0:
+        return {}
+    from faker import Faker
+
+    fake = Faker()
+    fake.seed_instance(seed)
+    return {purpose: np.array([DESCRIPTION_TEMPLATES.get(purpose, lambda f: f"{purpose}: {f.sentence()}")(fake)
+                               for _ in range(pool_size)], dtype=object)
+            for purpose in PURPOSE_REQUIREMENTS}
+
+
+def build_tables(n_users: int, n_rooms: int, seed: int, pool_size: int, end_date: datetime) -> Dict[str, Any]:
+    """Everything shared by the chunks: rooms, preferences, compatible rooms and descriptions"""
+    rng = np.random.default_rng(np.random.SeedSequence([seed, 0]))
+    rooms = make_rooms(n_rooms, rng)
+    purposes = list(PURPOSE_REQUIREMENTS)
+    compatible = np.array([compatible_rooms(rooms, PURPOSE_REQUIREMENTS[p]) for p in purposes])
+    # Compatible room indices per purpose, left-aligned and padded, with their counts
+    counts = compatible.sum(axis=1)
+    compatible_index = np.argsort(~compatible, axis=1, kind='stable')
+    return {
+        'n_users': n_users,
+        'rooms': rooms,
+        'purposes': np.array(purposes, dtype=object),
+        'compatible': compatible,
+        'compatible_index': compatible_index,
+        'compatible_counts': counts,
+        'preferred': preferred_rooms(n_users, rooms, rng),
+        'descriptions': description_pool(pool_size, seed),
+        'end_us': int(pd.Timestamp(end_date).value // 1000),
+    }
+
+
+def generate_chunk(n_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """n_rows bookings drawn column by column"""
+    rooms, preferred = tables['rooms'], tables['preferred']
+    user_index = rng.integers(0, tables['n_users'], n_rows)
+    purpose_index = rng.integers(0, len(tables['purposes']), n_rows)
+
+    # 70% chance to use one of the user's preferred rooms that is compatible with the purpose
+    candidates = preferred[user_index]
+    usable = (candidates >= 0) & tables['compatible'][purpose_index[:, None], np.maximum(candidates, 0)]
+    n_usable = usable.sum(axis=1)
+    pick = (rng.random(n_rows) * n_usable).astype(np.int64)
+    # Column of the pick-th usable preferred room in each row
+    preferred_choice = candidates[np.arange(n_rows), np.argmax(np.cumsum(usable, axis=1) > pick[:, None], axis=1)]
+    any_compatible = tables['compatible_index'][
+        purpose_index, (rng.random(n_rows) * tables['compatible_counts'][purpose_index]).astype(np.int64)]
+    use_preferred = (rng.random(n_rows) < 0.7) & (n_usable > 0)
+    room_index = np.where(use_preferred, preferred_choice, any_compatible)
+    capacity = rooms['capacity'][room_index]
+
+    # Start times over the last 90 days, with 10% moved to odd hours
+    start_us = tables['end_us'] - (rng.random(n_rows) * DAYS * 24 * US_PER_HOUR).astype(np.int64)
+    odd_hours = rng.random(n_rows) < 0.1
+    hour = (start_us // US_PER_HOUR) % 24
+    start_us += np.where(odd_hours, (ANOMALY_HOURS[rng.integers(0, len(ANOMALY_HOURS), n_rows)] - hour), 0) \
+        * US_PER_HOUR
+    start_time = pd.DatetimeIndex(start_us.astype('datetime64[us]'))
+    duration = DURATIONS[rng.integers(0, len(DURATIONS), n_rows)]
+
+    # Attendees up to capacity, 15% overbooked by 1-5
+    attendees = rng.integers(1, capacity + 1)
+    attendees += np.where(rng.random(n_rows) < 0.15, rng.integers(1, 6, n_rows), 0)
+
+    purpose = tables['purposes'][purpose_index]
+    description = np.full(n_rows, '', dtype=object)
+    for p, name in enumerate(tables['purposes']):
+        pool = tables['descriptions'].get(name)
+        rows = np.flatnonzero(purpose_index == p)
+        if pool is not None and len(rows):
+            description[rows] = pool[rng.integers(0, len(pool), len(rows))]
+
+    hour_of_day = start_time.hour.to_numpy()
+    day_of_week = start_time.dayofweek.to_numpy()
+    month = start_time.month.to_numpy()
+    df = pd.DataFrame({
+        "user_id": user_index + 1,
+        "room_id": rooms['room_id'][room_index],
+        "room_capacity": capacity,
+        "room_type": rooms['room_type'][room_index],
+        "has_projector": rooms['has_projector'][room_index],
+        "has_whiteboard": rooms['has_whiteboard'][room_index],
+        "purpose": purpose,
+        "start_time": start_time,
+        "end_time": start_time + pd.to_timedelta(duration, unit='m'),
+        "duration_minutes": duration,
+        "attendees": attendees,
+        "overloaded": (attendees > capacity).astype(int),
+        "description": description,
+        "conflict_flag": (rng.random(n_rows) < 0.1).astype(int),
+        "anomaly_flag": ((hour_of_day < 7) | (hour_of_day > 19)).astype(int),
+        "is_preferred_room": (preferred[user_index] == room_index[:, None]).any(axis=1).astype(int),
+        "is_purpose_compatible": 1,
+        "day_of_week": day_of_week,
+        "hour_of_day": hour_of_day,
+        "month": month,
+        "is_weekend": (day_of_week >= 5).astype(int),
+    })
+    df['capacity_utilization'] = df['attendees'] / df['room_capacity']
+    df['is_peak_hour'] = ((df['hour_of_day'] >= 9) & (df['hour_of_day'] <= 17)).astype(int)
+    df['season'] = ((df['month'] % 12) // 3) + 1  # 1=Winter, 2=Spring, 3=Summer, 4=Fall
+    return df
+
+
+def init_worker(shared_tables):
+    global tables
+    tables = shared_tables
+
+
+def write_chunk(chunk: int, n_rows: int, seed: np.random.SeedSequence, output_dir: str, file_format: str) -> int:
+    """Generate one chunk and write it to its own part file; returns the bytes written"""
+    df = generate_chunk(n_rows, np.random.default_rng(seed))
+    path = os.path.join(output_dir, f"part-{chunk:05d}.{file_format}")
+    if file_format == 'parquet':
+        df.to_parquet(path + '.tmp', index=False)
+    else:
+        df.to_csv(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+    return os.path.getsize(path)
+
+
+def prepare_output_dir(output_dir: str):
+    """Create output_dir, or clear the part files of a previous run from it.
+
+    Only this tool's own ``part-*`` files are removed; a folder holding
+    anything else is refused rather than emptied.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    entries = os.listdir(output_dir)
+    parts = [name for name in entries if PART_FILE.fullmatch(name)]
+    others = sorted(set(entries) - set(parts))
+    if others:
+        raise ValueError(f"{output_dir} holds files this generator did not write ({', '.join(others[:3])}"
+                         f"{', ...' if len(others) > 3 else ''}); pick an empty or new folder")
+    for name in parts:
+        os.remove(os.path.join(output_dir, name))
+
+
+def merge_csv_parts(output_dir: str, merged_path: str):
+    """Stream the CSV parts, in chunk order, into one CSV with a single header"""
+    with open(merged_path + '.tmp', 'wb') as merged:
+        for i, part in enumerate(sorted(glob.glob(os.path.join(output_dir, 'part-*.csv')))):
+            with open(part, 'rb') as f:
+                if i:
+                    f.readline()
+                shutil.copyfileobj(f, merged, 16 << 20)
+    os.replace(merged_path + '.tmp', merged_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=300_000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--rooms', type=int, default=25)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-rows', type=int, default=500_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(__file__), '..', 'data', 'generated'))
+    parser.add_argument('--merge-csv', help='also concatenate the CSV parts into this file, e.g. ../data/dataset.csv')
+    parser.add_argument('--description-pool', type=int, default=1000, help='descriptions per purpose (0: empty)')
+    parser.add_argument('--end-date', type=datetime.fromisoformat,
+                        default=datetime.now().replace(hour=0, minute=0, second=0, microsecond=0))
+    args = parser.parse_args()
+    if args.merge_csv and args.format != 'csv':
+        parser.error("--merge-csv needs --format csv")
+
+    started = time.perf_counter()
+    shared_tables = build_tables(args.users, args.rooms, args.seed, args.description_pool, args.end_date)
+    try:
+        prepare_output_dir(args.output)
+    except ValueError as e:
+        parser.error(str(e))
+
+    sizes = [min(args.chunk_rows, args.rows - start) for start in range(0, args.rows, args.chunk_rows)]
+    seeds = np.random.SeedSequence([args.seed, 1]).spawn(len(sizes))
+    print(f"Generating {args.rows:,} bookings ({args.users} users, {args.rooms} rooms) "
+          f"in {len(sizes)} chunks on {args.workers} workers...")
+    written = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                             initargs=(shared_tables,)) as pool:
+        futures = [pool.submit(write_chunk, i, size, seed, args.output, args.format)
+                   for i, (size, seed) in enumerate(zip(sizes, seeds))]
+        for done, future in enumerate(futures, 1):
+            written += future.result()
+            print(f"Progress: {done}/{len(futures)} chunks", end='\r')
+
+    if args.merge_csv:
+        print("\nMerging CSV parts...")
+        merge_csv_parts(args.output, args.merge_csv)
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ Generated {args.rows:,} bookings in {elapsed:.1f}s ({args.rows / elapsed:,.0f} rows/s), "
+          f"{written / 1e6:.0f} MB in {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Room lookup and user preferences from the booking history, in grouped passes.
+
+Both are built with a constant number of vectorized passes over the bookings
+instead of one boolean scan of the dataset per user. The input can be a
+DataFrame, a pyarrow Table or the path of a Parquet file or directory (such
+as the cache written by training_data.py); from Parquet only the columns
+needed are read.
+
+Each user's preferred rooms are ordered by ``rank_by``:
+
+- ``'first_seen'``: order of the user's first booking of each room (the order
+  train_model.py has always produced)
+- ``'frequency'``: most booked first
+- ``'recency'``: most recently booked (latest ``start_time``) first
+
+Ties keep first-seen order.
+
+Preferences are ranked from per-(user, room) statistics. Incremental training
+keeps these statistics and merges in those of new bookings with
+``merge_preference_stats``, which gives the same preferences as a rebuild
+over the whole history.
+"""
+from typing import Any, Dict, List, Union
+
+import numpy as np
+import pandas as pd
+
+RANKINGS = ('first_seen', 'frequency', 'recency')
+ROOM_COLUMNS = ['room_id', 'room_capacity', 'room_type', 'has_projector', 'has_whiteboard']
+
+
+def _columns(source: Union[pd.DataFrame, str, Any], columns: List[str]) -> pd.DataFrame:
+    """The given columns of a DataFrame, a pyarrow Table or a Parquet path"""
+    if isinstance(source, pd.DataFrame):
+        return source[columns]
+    if isinstance(source, str):
+        return pd.read_parquet(source, columns=columns)
+    # pyarrow.Table, without importing pyarrow unless one is passed
+    return source.select(columns).to_pandas()
+
+
+def build_room_lookup(source) -> Dict[str, Dict[str, Any]]:
+    """Attributes of every room, in order of first appearance, ready for JSON"""
+    rooms = _columns(source, ROOM_COLUMNS).drop_duplicates('room_id')
+    return {
+        str(room_id): {
+            'room_capacity': int(capacity),
+            'room_type': str(room_type),
+            'has_projector': bool(projector),
+            'has_whiteboard': bool(whiteboard),
+        }
+        for room_id, capacity, room_type, projector, whiteboard in zip(
+            rooms['room_id'].tolist(), rooms['room_capacity'].tolist(), rooms['room_type'].tolist(),
+            rooms['has_projector'].tolist(), rooms['has_whiteboard'].tolist())
+    }
+
+
+def merge_room_lookup(room_lookup: Dict[str, Dict[str, Any]],
+                      new_rooms: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Add rooms first seen in newer bookings; known rooms keep their attributes and order"""
+    merged = dict(room_lookup)
+    for room_id, info in new_rooms.items():
+        merged.setdefault(room_id, info)
+    return merged
+
+
+def preference_stats(source, row_offset: int = 0) -> pd.DataFrame:
+    """One row per (user, room) pair: first booking row, booking count and latest start_time.
+
+    ``row_offset`` is the position of the first booking in the full history,
+    so stats of newer bookings can be merged into those of older ones.
+    """
+    df = _columns(source, ['user_id', 'room_id', 'start_time'])
+
+    # Integer codes in order of first appearance, so users and ties keep the order of the data
+    user_codes, users = pd.factorize(df['user_id'])
+    room_codes, rooms = pd.factorize(df['room_id'])
+    pairs = pd.DataFrame({'user': user_codes, 'room': room_codes, 'row': np.arange(len(df)),
+                          'time': df['start_time'].to_numpy()})
+
+    # One grouped pass over every booking
+    stats = pairs.groupby(['user', 'room'], sort=False).agg(
+        first=('row', 'min'), count=('row', 'size'), last=('time', 'max')).reset_index()
+    return pd.DataFrame({
+        'user_id': np.asarray(users)[stats['user'].to_numpy()],
+        'room_id': np.asarray(rooms.astype(str))[stats['room'].to_numpy()],
+        'first': stats['first'].to_numpy() + row_offset,
+        'count': stats['count'].to_numpy(),
+        'last': stats['last'].to_numpy(),
+    })
+
+
+def merge_preference_stats(stats: pd.DataFrame, new_stats: pd.DataFrame) -> pd.DataFrame:
+    """Combine the stats of older and newer bookings, as if computed over both at once"""
+    combined = pd.concat([stats, new_stats], ignore_index=True)
+    return combined.groupby(['user_id', 'room_id'], sort=False).agg(
+        first=('first', 'min'), count=('count', 'sum'), last=('last', 'max')).reset_index()
+
+
+def rank_preferences(stats: pd.DataFrame, rank_by: str = 'first_seen') -> Dict[str, List[str]]:
+    """User preferences from pair stats, users in order of first appearance, rooms ranked by ``rank_by``"""
+    if rank_by not in RANKINGS:
+        raise ValueError(f"rank_by must be one of {RANKINGS}, got {rank_by!r}")
+    if not len(stats):
+        return {}
+    first = stats['first'].to_numpy()
+    user_first = stats.groupby('user_id', sort=False)['first'].transform('min').to_numpy()
+
+    # Sort by user, then rank, then first booking
+    keys = [first]
+    if rank_by == 'frequency':
+        keys.append(-stats['count'].to_numpy())
+    elif rank_by == 'recency':
+        keys.append(-stats['last'].to_numpy().astype(np.int64))
+    keys.append(user_first)
+    order = np.lexsort(keys)
+
+    user_ids = stats['user_id'].to_numpy()[order]
+    room_ids = stats['room_id'].to_numpy()[order]
+    bounds = np.flatnonzero(np.diff(user_first[order])) + 1
+    return {
+        str(user_id): rooms.tolist()
+        for user_id, rooms in zip(user_ids[np.r_[0, bounds]].tolist(), np.split(room_ids, bounds))
+    }
+
+
+def build_user_preferences(source, rank_by: str = 'first_seen') -> Dict[str, List[str]]:
+    """Rooms each user has booked, users in order of first appearance, rooms ranked by ``rank_by``"""
+    if rank_by not in RANKINGS:
+        raise ValueError(f"rank_by must be one of {RANKINGS}, got {rank_by!r}")
+    return rank_preferences(preference_stats(source), rank_by)
@@ -0,0 +1,155 @@
+"""Score the full input grid of the latest model into a memory-mappable table.
+
+Run after train_model.py. Every (user, purpose, attendee bucket, season,
+weekday, hour, room) combination is scored through the same candidate and
+feature pipeline the API uses, one (user, purpose, attendee bucket) chunk of
+4 x 7 x 24 x rooms rows at a time, spread over worker processes. The result
+lands in models/model_<timestamp>.scores/ and is served when the API runs
+with SCORE_LOOKUP=1. When that directory already holds a table built with the
+same attendee buckets, there is nothing to do unless ``--force`` is given, so
+cron jobs can run this after every training run.
+
+    python materialize_scores.py --workers 4
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from model_artifacts import latest_model_file
+from recommendation_service import RecommendationService
+from score_table import (SCORE_TABLE_FORMAT_VERSION, SCORE_SCALE, DEFAULT_ATTENDEE_EDGES, SEASON_MONTHS,
+                         scores_dir_for, attendee_values, quantize)
+
+base_dir = os.path.join(os.path.dirname(__file__), '..')
+
+# Set in each worker process by init_worker
+service = None
+
+
+def grid_dates():
+    """One date per (season, weekday), in table order"""
+    dates = []
+    for season in sorted(SEASON_MONTHS):
+        first = datetime(2025, SEASON_MONTHS[season], 1)
+        for weekday in range(7):
+            dates.append(first + timedelta(days=(weekday - first.weekday()) % 7))
+    return dates
+
+
+def table_is_current(scores_dir: str, edges) -> bool:
+    """Whether scores_dir holds a published table in this format with these attendee edges"""
+    try:
+        with open(os.path.join(scores_dir, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return meta.get('format_version') == SCORE_TABLE_FORMAT_VERSION and meta.get('attendee_edges') == edges
+
+
+def init_worker(models_dir, info_dir, encoder_dir, model_file):
+    global service
+    service = RecommendationService(models_dir, info_dir, encoder_dir)
+    if service.artifacts.model_file != model_file:
+        raise RuntimeError(f"Worker loaded {service.artifacts.model_file}, expected {model_file}")
+
+
+def score_user(user_id, purposes, attendees):
+    """Quantized scores of one user, shaped (purposes, attendee buckets, 4, 7, 24, rooms)"""
+    artifacts = service.artifacts
+    dates = grid_dates()
+    n_rooms = len(artifacts.room_ids)
+    scores = np.empty((len(purposes), len(attendees), 4, 7, 24, n_rooms), dtype=np.uint16)
+    for p, purpose in enumerate(purposes):
+        for a, head_count in enumerate(attendees):
+            blocks = [service._candidate_columns(artifacts, user_id, purpose, head_count, date, list(range(24)))
+                      for date in dates]
+            X = service._feature_matrix(artifacts, blocks)
+            probabilities = service._predict_success(artifacts, X)
+            scores[p, a] = quantize(probabilities).reshape(4, 7, 24, n_rooms)
+    return scores
+
+
+def main():
+    global service
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--models-dir', default=os.path.join(base_dir, 'models'))
+    parser.add_argument('--info-dir', default=os.path.join(base_dir, 'model_info'))
+    parser.add_argument('--encoder-dir', default=os.path.join(base_dir, 'encoder'))
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--attendee-edges', type=int, nargs='+', default=list(DEFAULT_ATTENDEE_EDGES),
+                        help='bucket boundaries; bucket i covers [edge i, edge i+1)')
+    parser.add_argument('--force', action='store_true', help='rescore even if the latest model has a table')
+    args = parser.parse_args()
+
+    edges = sorted(set(args.attendee_edges))
+    if len(edges) < 2 or edges[0] < 1:
+        parser.error("need at least two attendee edges, all >= 1")
+
+    # The meta file is published with the table, so a current one means the model has been scored
+    scores_dir = scores_dir_for(latest_model_file(args.models_dir))
+    if not args.force and table_is_current(scores_dir, edges):
+        print(f"⏭️ {scores_dir} is up to date; nothing to do")
+        return
+
+    dirs = (args.models_dir, args.info_dir, args.encoder_dir)
+    reference = RecommendationService(*dirs)
+    artifacts = reference.artifacts
+    categories = dict(zip(artifacts.feature_info['categorical_features'], artifacts.encoder.categories_))
+    user_ids = sorted(int(user_id) for user_id in categories['user_id'])
+    purposes = [str(purpose) for purpose in categories['purpose']]
+    attendees = attendee_values(edges)
+
+    shape = (len(user_ids), len(purposes), len(attendees), 4, 7, 24, len(artifacts.room_ids))
+    print(f"Scoring {int(np.prod(shape)):,} cells {shape} for {os.path.basename(artifacts.model_file)}")
+
+    scores_dir = scores_dir_for(artifacts.model_file)
+    tmp_dir = scores_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    table = np.lib.format.open_memmap(os.path.join(tmp_dir, 'scores.npy'), mode='w+', dtype=np.uint16, shape=shape)
+
+    started = time.perf_counter()
+    if args.workers > 1:
+        with ProcessPoolExecutor(args.workers, initializer=init_worker,
+                                 initargs=(*dirs, artifacts.model_file)) as pool:
+            futures = [pool.submit(score_user, user_id, purposes, attendees) for user_id in user_ids]
+            for u, future in enumerate(futures):
+                table[u] = future.result()
+                print(f"  {u + 1}/{len(user_ids)} users", end='\r')
+    else:
+        service = reference
+        for u, user_id in enumerate(user_ids):
+            table[u] = score_user(user_id, purposes, attendees)
+            print(f"  {u + 1}/{len(user_ids)} users", end='\r')
+    table.flush()
+    del table
+
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump({
+            'format_version': SCORE_TABLE_FORMAT_VERSION,
+            'model_file': os.path.basename(artifacts.model_file),
+            'user_ids': user_ids,
+            'purposes': purposes,
+            'room_ids': [str(room_id) for room_id in artifacts.room_ids],
+            'attendee_edges': edges,
+            'attendee_values': attendees,
+            'scale': SCORE_SCALE,
+            'created': datetime.now().isoformat(),
+        }, f)
+
+    # Publish the directory in one step so a loader never sees half of it
+    shutil.rmtree(scores_dir, ignore_errors=True)
+    os.rename(tmp_dir, scores_dir)
+    print(f"\n✅ Wrote {scores_dir} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+"""Pick the forest to ship by accuracy under a serving latency budget.
+
+Serving cost grows with trees x depth, and the pickle size drives startup
+time and memory, so with ``MODEL_SELECTION=1`` train_model.py fits several
+candidate configurations instead of one 100-tree forest:
+
+- every configuration (tree count, ``max_depth``, ``min_samples_leaf``) is
+  fitted by a worker process on 80% of the training split, the other 20%
+  being the validation set; the worker measures validation accuracy, pickle
+  size, compiled node-array size and node count, and, with pruning on, picks
+  the smallest greedy subset of trees whose averaged probabilities stay
+  within ``prune_tolerance`` (RMSE) of the full forest's as a pruned variant
+- the fitted forests are parked on disk, and the p50/p99 latency of scoring
+  one working-day request (every room x 11 hours) on the serving backend is
+  then measured for each, one forest in memory at a time; the request is
+  built by the serving FeatureCompiler and scored as the API scores it (the
+  compiled forest on compact rows, predict_proba on their sparse expansion)
+
+Among the candidates whose p99 is within the budget, those within
+``accuracy_tolerance`` of the best validation accuracy count as equally good
+and the fastest of them wins. If none fits the budget, the fastest is taken.
+The winning configuration is then refit on the whole training split (and
+pruned again if the pruned variant won), so the shipped forest sees as much
+data as a default run; the table describes the 80% fits. It is written to
+model_info.json and the training log.
+"""
+import copy
+import json
+import os
+import pickle
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+import joblib
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+from compiled_forest import COMPILED_MAX_ROWS, CompiledForest
+from feature_compiler import FeatureCompiler
+from serving_artifacts import room_arrays
+from training_features import fit_input
+
+DEFAULT_CANDIDATES = [
+    {'n_estimators': n_estimators, 'max_depth': max_depth, 'min_samples_leaf': min_samples_leaf}
+    for n_estimators in (50, 100, 200)
+    for max_depth in (None, 16)
+    for min_samples_leaf in (1, 5)
+]
+# Hours in the request whose latency is measured, as in a working-day /recommend call
+LATENCY_REQUEST_HOURS = 11
+# Validation rows used to choose which trees to keep
+PRUNE_MAX_ROWS = 20_000
+
+
+def load_candidates(path: str = None) -> List[Dict[str, Any]]:
+    """Candidate configurations from a JSON list of RandomForestClassifier parameters, or the default grid"""
+    if not path:
+        return DEFAULT_CANDIDATES
+    with open(path, 'r') as f:
+        candidates = json.load(f)
+    if not candidates or not all(isinstance(c, dict) and c.get('n_estimators') for c in candidates):
+        raise ValueError(f"{path} must hold a list of objects with at least n_estimators")
+    return candidates
+
+
+def candidate_name(config: Dict[str, Any]) -> str:
+    return (f"trees={config['n_estimators']},depth={config.get('max_depth')},"
+            f"leaf={config.get('min_samples_leaf', 1)}")
+
+
+def prune_trees(model: RandomForestClassifier, X_val, tolerance: float) -> List[int]:
+    """Positions of the fewest trees, chosen greedily, that track the forest's probabilities.
+
+    Trees are added one at a time, each time the one that brings the running
+    mean closest to the full forest's positive-class probability, until the
+    RMSE is within ``tolerance``.
+    """
+    tree_probs = np.stack([tree.predict_proba(X_val)[:, -1] for tree in model.estimators_])
+    target = tree_probs.mean(axis=0)
+    selected = []
+    total = np.zeros_like(target)
+    remaining = np.arange(len(tree_probs))
+    while len(remaining):
+        errors = np.sqrt((((total + tree_probs[remaining]) / (len(selected) + 1) - target) ** 2).mean(axis=1))
+        best = int(np.argmin(errors))
+        selected.append(remaining[best])
+        total += tree_probs[remaining[best]]
+        remaining = np.delete(remaining, best)
+        if errors[best] <= tolerance:
+            break
+
+    return sorted(int(i) for i in selected)
+
+
+def keep_trees(model: RandomForestClassifier, trees: List[int]) -> RandomForestClassifier:
+    """A shallow copy of the forest holding only the trees at the given positions"""
+    pruned = copy.copy(model)
+    pruned.estimators_ = [model.estimators_[i] for i in trees]
+    pruned.set_params(n_estimators=len(pruned.estimators_))
+    return pruned
+
+
+def latency_request(encoder, feature_info: Dict[str, Any],
+                    room_lookup: Dict[str, Dict[str, Any]]) -> Tuple[FeatureCompiler, np.ndarray]:
+    """The serving feature compiler and the compact candidate matrix of one working-day request.
+
+    The request is for the first known user and purpose, 4 attendees, on a
+    spring Wednesday from 8:00, with the first room preferred; rows are
+    (hour, room) pairs in serving order.
+    """
+    rooms = room_arrays(room_lookup)
+    compiler = FeatureCompiler(encoder, feature_info, {
+        'room_type': rooms['room_types'],
+        'has_projector': rooms['room_has_projector'],
+        'has_whiteboard': rooms['room_has_whiteboard'],
+        'room_capacity': rooms['room_capacities'],
+    }, compact=True)
+    categories = dict(zip(feature_info['categorical_features'], encoder.categories_))
+    n_rooms, attendees = len(rooms['room_ids']), 4
+    X = compiler.compile({
+        'room_index': np.tile(np.arange(n_rooms), LATENCY_REQUEST_HOURS),
+        'user_id': categories['user_id'][0],
+        'purpose': categories['purpose'][0],
+        'attendees': attendees,
+        'hour_of_day': np.repeat(np.arange(8, 8 + LATENCY_REQUEST_HOURS), n_rooms),
+        'day_of_week': 2,
+        'is_weekend': 0,
+        'is_preferred_room': np.tile(np.arange(n_rooms) == 0, LATENCY_REQUEST_HOURS).astype(np.int64),
+        'capacity_utilization': np.tile(attendees / rooms['room_capacities'], LATENCY_REQUEST_HOURS),
+        'season': 2,
+    })
+    return compiler, X
+
+
+def inference_latency(model: RandomForestClassifier, compiler: FeatureCompiler, X_batch: np.ndarray,
+                      backend: str, repeats: int) -> Tuple[float, float]:
+    """p50 and p99 milliseconds to score the compact X_batch as the serving backend does"""
+    if backend == 'compiled' or (backend == 'auto' and len(X_batch) <= COMPILED_MAX_ROWS):
+        compiled = CompiledForest.from_sklearn(model).with_compact_input(*compiler.column_slots())
+        score = lambda: compiled.predict_proba(np.asarray(X_batch, dtype=np.float32))  # noqa: E731
+    else:
+        score = lambda: model.predict_proba(compiler.expand(X_batch))  # noqa: E731
+    score()
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        score()
+        timings.append(time.perf_counter() - started)
+    p50, p99 = np.percentile(np.asarray(timings) * 1e3, [50, 99])
+    return float(p50), float(p99)
+
+
+class _ByteCounter:
+    """File-like sink that only counts what is written to it"""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        return len(data)
+
+
+def describe(model: RandomForestClassifier) -> Dict[str, Any]:
+    """Size of the artifacts a forest produces"""
+    compiled = CompiledForest.from_sklearn(model)
+    counter = _ByteCounter()
+    pickle.dump(model, counter)
+    return {
+        'model_mb': round(counter.size / 1e6, 2),
+        'serving_mb': round(sum(array.nbytes for array in compiled.to_arrays().values()) / 1e6, 2),
+        'nodes': int(sum(tree.tree_.node_count for tree in model.estimators_)),
+    }
+
+
+def _fit_candidate(config: Dict[str, Any], X_fit, y_fit, X_val, y_val: np.ndarray,
+                   prune: bool, prune_tolerance: float, random_state: int, model_path: str) -> Dict[str, Any]:
+    """Fit one configuration in a worker, measure everything but latency and park the forest on disk"""
+    started = time.perf_counter()
+    model = RandomForestClassifier(random_state=random_state, n_jobs=1, **config)
+    model.fit(X_fit, y_fit)
+    fit_seconds = time.perf_counter() - started
+    joblib.dump(model, model_path)
+
+    name = candidate_name(config)
+    variants = [(name, None, model)]
+    if prune:
+        trees = prune_trees(model, X_val[:PRUNE_MAX_ROWS], prune_tolerance)
+        if len(trees) < len(model.estimators_):
+            variants.append((name + ',pruned', trees, keep_trees(model, trees)))
+    rows = [{
+        'name': variant_name,
+        'n_estimators': len(variant.estimators_),
+        'max_depth': config.get('max_depth'),
+        'min_samples_leaf': config.get('min_samples_leaf', 1),
+        'pruned_from': None if trees is None else len(model.estimators_),
+        'accuracy': round(float((variant.predict(X_val) == y_val).mean()), 4),
+        **describe(variant),
+        'fit_seconds': round(fit_seconds, 2),
+        'trees': trees,
+    } for variant_name, trees, variant in variants]
+    return {'config': config, 'model_path': model_path, 'rows': rows}
+
+
+def select_model(X_train, y_train, compiler: FeatureCompiler, X_batch: np.ndarray, latency_budget_ms: float,
+                 candidates: List[Dict[str, Any]] = None, accuracy_tolerance: float = 0.002,
+                 prune: bool = True, prune_tolerance: float = 0.02,
+                 backend: str = 'sklearn', workers: int = None, latency_repeats: int = 100,
+                 random_state: int = 42) -> Tuple[RandomForestClassifier, Dict[str, Any]]:
+    """Evaluate the candidates, then refit the chosen one on all of X_train; returns it with the trade-off table.
+
+    Latency is measured on the compact candidate matrix X_batch from
+    ``compiler``, see latency_request.
+    """
+    candidates = candidates or DEFAULT_CANDIDATES
+    workers = workers or os.cpu_count()
+    X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=0.2, random_state=random_state)
+    # X_val stays sparse: forests predict on CSR, and a dense copy is rows x users
+    X_fit = fit_input(X_fit)
+    y_val = np.asarray(y_val)
+
+    rows = []
+    with tempfile.TemporaryDirectory(prefix='model_selection_') as tmp_dir:
+        fitted = Parallel(n_jobs=workers)(
+            delayed(_fit_candidate)(config, X_fit, y_fit, X_val, y_val, prune, prune_tolerance, random_state,
+                                    os.path.join(tmp_dir, f'candidate_{i}.pkl'))
+            for i, config in enumerate(candidates))
+        del X_fit
+
+        # Latency is measured with the workers done, one forest in memory at a time
+        for candidate in fitted:
+            model = joblib.load(candidate['model_path'])
+            for row in candidate['rows']:
+                variant = model if row['trees'] is None else keep_trees(model, row['trees'])
+                p50, p99 = inference_latency(variant, compiler, X_batch, backend, latency_repeats)
+                row.update(config=candidate['config'], latency_p50_ms=round(p50, 3), latency_p99_ms=round(p99, 3))
+                rows.append(row)
+            del model
+
+    within = [i for i, row in enumerate(rows) if row['latency_p99_ms'] <= latency_budget_ms]
+    if within:
+        best_accuracy = max(rows[i]['accuracy'] for i in within)
+        chosen = min((i for i in within if rows[i]['accuracy'] >= best_accuracy - accuracy_tolerance),
+                     key=lambda i: rows[i]['latency_p99_ms'])
+    else:
+        chosen = min(range(len(rows)), key=lambda i: rows[i]['latency_p99_ms'])
+    winner = rows[chosen]
+    config, was_pruned = winner['config'], winner['trees'] is not None
+    for i, row in enumerate(rows):
+        row['within_budget'] = row['latency_p99_ms'] <= latency_budget_ms
+        row['selected'] = i == chosen
+        del row['config'], row['trees']
+
+    # Refit the winning configuration on the whole training split
+    started = time.perf_counter()
+    model = RandomForestClassifier(random_state=random_state, n_jobs=workers, **config)
+    model.fit(fit_input(X_train), y_train)
+    if was_pruned:
+        model = keep_trees(model, prune_trees(model, X_val[:PRUNE_MAX_ROWS], prune_tolerance))
+    model.set_params(n_jobs=None)
+
+    selection = {
+        'latency_budget_p99_ms': latency_budget_ms,
+        'budget_met': bool(within),
+        'inference_backend': backend,
+        'latency_batch_rows': len(X_batch),
+        'accuracy_tolerance': accuracy_tolerance,
+        'validation_rows': len(y_val),
+        'prune_tolerance': prune_tolerance if prune else None,
+        'selected': winner['name'],
+        'refit': {
+            'rows': X_train.shape[0],
+            'n_estimators': len(model.estimators_),
+            'pruned': was_pruned,
+            'fit_seconds': round(time.perf_counter() - started, 2),
+        },
+        'candidates': rows,
+    }
+    return model, selection
+
+
+def format_table(selection: Dict[str, Any]) -> str:
+    """The trade-off table as fixed-width text for the training log"""
+    lines = [f"{'candidate':<36} {'trees':>5} {'accuracy':>8} {'p50 ms':>8} {'p99 ms':>8} "
+             f"{'model MB':>8} {'serve MB':>8} {'nodes':>9} {'fit s':>7}"]
+    for row in selection['candidates']:
+        mark = ' *' if row['selected'] else (' ' if row['within_budget'] else ' over budget')
+        lines.append(f"{row['name']:<36} {row['n_estimators']:>5} {row['accuracy'] * 100:>7.2f}% "
+                     f"{row['latency_p50_ms']:>8.2f} {row['latency_p99_ms']:>8.2f} {row['model_mb']:>8.2f} "
+                     f"{row['serving_mb']:>8.2f} {row['nodes']:>9} {row['fit_seconds']:>7.1f}{mark}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,221 @@
+"""Incremental retraining: update the latest model with the bookings added since the last run.
+
+Only the rows appended to the bookings CSV after the high-water mark in
+models/training_state/ are parsed. Their rooms and per-user booking stats are
+merged into room_lookup.json and user_preferences.json. The model is then
+updated in one of two ways:
+
+- ``warm_start`` (default): the latest forest gets ``--trees`` new trees fitted
+  on the new bookings only, and the oldest trees are dropped beyond
+  ``--max-trees``. The encoder is kept, so users first seen since the last full
+  or window run are encoded as unknown until the next one.
+- ``window``: a new encoder and forest are fitted on the bookings of the last
+  ``--window-days`` days, counted back from the latest start_time. The window
+  is kept in the training state, so later runs do not re-read the CSV either.
+
+With ``--full``, or when there is no usable state (first run, a rewritten
+CSV, or a latest model that is not the one recorded), the full training of
+train_model.py runs instead, on the same CSV and directories.
+cron/train_incremental.bat runs this often; cron/train_model.bat runs the full
+rebuild on a longer schedule.
+
+    python train_incremental.py --mode warm_start --trees 20
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from model_artifacts import latest_model_file
+from serving_artifacts import write_serving_artifacts
+from artifact_builder import RANKINGS, build_room_lookup, merge_room_lookup, merge_preference_stats, \
+    preference_stats, rank_preferences
+from training_data import concat_training_frames, load_training_data, read_training_csv_from
+from training_features import encode_training_features, fit_input
+from training_state import csv_mark, is_appended, load_training_state, load_window, save_training_state
+from train_model import train
+
+base_dir = os.path.join(os.path.dirname(__file__), '..')
+MODES = ('warm_start', 'window')
+
+
+def add_target(df: pd.DataFrame) -> pd.DataFrame:
+    """Binary success label, as in train_model.py"""
+    df['target'] = ((df['overloaded'] == 0) &
+                    (df['conflict_flag'] == 0) &
+                    (df['anomaly_flag'] == 0)).astype(int)
+    return df
+
+
+def rebuild_reason(args, state, models_dir):
+    """Why this run has to be a full rebuild, or None"""
+    if args.full:
+        return "requested with --full"
+    if state is None:
+        return "no training state yet"
+    if not is_appended(args.csv, state):
+        return "the bookings CSV was rewritten"
+    if os.path.basename(latest_model_file(models_dir)) != state['model_file']:
+        return f"the latest model is not {state['model_file']}"
+    return None
+
+
+def warm_start(model: RandomForestClassifier, X, y, n_trees: int, max_trees: int) -> RandomForestClassifier:
+    """Add n_trees trees fitted on (X, y), then keep only the newest max_trees"""
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_trees)
+    model.fit(fit_input(X), y)
+    if len(model.estimators_) > max_trees:
+        del model.estimators_[:len(model.estimators_) - max_trees]
+    model.set_params(warm_start=False, n_estimators=len(model.estimators_))
+    return model
+
+
+def sliding_window(window: pd.DataFrame, days: int) -> pd.DataFrame:
+    """Bookings within ``days`` days of the latest start_time"""
+    cutoff = window['start_time'].max() - pd.Timedelta(days=days)
+    return window[window['start_time'] >= cutoff].reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mode', choices=MODES, default='warm_start')
+    parser.add_argument('--csv', default=os.path.join(base_dir, 'data', 'dataset.csv'))
+    parser.add_argument('--models-dir', default=os.path.join(base_dir, 'models'))
+    parser.add_argument('--info-dir', default=os.path.join(base_dir, 'model_info'))
+    parser.add_argument('--encoder-dir', default=os.path.join(base_dir, 'encoder'))
+    parser.add_argument('--logs-dir', default=os.path.join(base_dir, 'logs'))
+    parser.add_argument('--trees', type=int, default=20, help='trees added per warm_start run')
+    parser.add_argument('--max-trees', type=int, default=300, help='most trees kept in warm_start mode')
+    parser.add_argument('--window-days', type=int, default=180)
+    parser.add_argument('--window-trees', type=int, default=100, help='trees fitted per window run')
+    parser.add_argument('--min-new-rows', type=int, default=500,
+                        help='skip the run (leaving the new rows for the next one) below this many new bookings')
+    parser.add_argument('--full', action='store_true', help='run the full train_model.py rebuild')
+    args = parser.parse_args()
+
+    preference_ranking = os.getenv('PREFERENCE_RANKING', 'first_seen')
+    if preference_ranking not in RANKINGS:
+        parser.error(f"PREFERENCE_RANKING must be one of {RANKINGS}, got {preference_ranking!r}")
+
+    state = None if args.full else load_training_state(args.models_dir)
+    reason = rebuild_reason(args, state, args.models_dir)
+    if reason:
+        print(f"🔁 Full rebuild: {reason}")
+        train(args.csv, args.models_dir, args.info_dir, args.encoder_dir, args.logs_dir)
+        return
+
+    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M')
+    model_path = os.path.join(args.models_dir, f'model_{timestamp}.pkl')
+    if os.path.exists(model_path):
+        print(f"⏭️ {os.path.basename(model_path)} already exists; the new bookings are left for the next run")
+        return
+
+    # Only the bookings appended since the last run
+    mark = state['csv']
+    load_started = time.perf_counter()
+    new, end_offset = read_training_csv_from(args.csv, mark['offset'])
+    load_seconds = time.perf_counter() - load_started
+    if len(new) == 0 or len(new) < args.min_new_rows:
+        print(f"⏭️ {len(new)} new bookings since {mark['last_start_time']}, "
+              f"fewer than {max(args.min_new_rows, 1)}; nothing to do")
+        return
+    new = add_target(new)
+    print(f"📥 {len(new)} new bookings in {load_seconds:.2f}s")
+
+    with open(os.path.join(args.info_dir, 'model_info.json'), 'r') as f:
+        feature_info = json.load(f)
+    features = feature_info['features']
+    categorical_features = feature_info['categorical_features']
+
+    # Merge the new bookings into the room lookup and preference stats
+    with open(os.path.join(args.info_dir, 'room_lookup.json'), 'r') as f:
+        room_lookup = merge_room_lookup(json.load(f), build_room_lookup(new))
+    user_stats = merge_preference_stats(state['preference_stats'],
+                                        preference_stats(new, row_offset=mark['rows']))
+    user_preferences = rank_preferences(user_stats, rank_by=preference_ranking)
+
+    window = None
+    fit_started = time.perf_counter()
+    if args.mode == 'warm_start':
+        train_df = new
+        model = joblib.load(latest_model_file(args.models_dir))
+        encoder = joblib.load(os.path.join(args.encoder_dir, 'encoder.pkl'))
+        n_trees_before = len(model.estimators_)
+        _, X = encode_training_features(train_df, features, categorical_features, encoder=encoder)
+        X_train, X_test, y_train, y_test = train_test_split(X, train_df['target'], test_size=0.2, random_state=42)
+        if set(np.unique(y_train)) != set(model.classes_):
+            print(f"⏭️ New bookings do not cover every class {model.classes_.tolist()}; nothing to do")
+            return
+        model = warm_start(model, X_train, y_train, args.trees, args.max_trees)
+        unknown_users = len(set(train_df['user_id'].unique()) - set(encoder.categories_[0].tolist()))
+    else:
+        previous = load_window(args.models_dir, state)
+        if previous is None:
+            # First window run: the previously consumed rows, read once
+            previous = load_training_data(args.csv).head(mark['rows'])
+        window = sliding_window(concat_training_frames([previous, new.drop(columns='target')]), args.window_days)
+        train_df = add_target(window.copy())
+        n_trees_before = 0
+        encoder, X = encode_training_features(train_df, features, categorical_features)
+        X_train, X_test, y_train, y_test = train_test_split(X, train_df['target'], test_size=0.2, random_state=42)
+        model = RandomForestClassifier(n_estimators=args.window_trees, random_state=42)
+        model.fit(fit_input(X_train), y_train)
+        unknown_users = 0
+    fit_seconds = time.perf_counter() - fit_started
+
+    y_pred = model.predict(X_test)
+    accuracy = accuracy_score(y_test, y_pred)
+    report = classification_report(y_test, y_pred)
+
+    # Publish in the same order as train_model.py: lookups, serving arrays, then the model
+    with open(os.path.join(args.info_dir, 'room_lookup.json'), 'w') as f:
+        json.dump(room_lookup, f)
+    feature_info.update(trained_date=datetime.now().isoformat(), training_mode=args.mode)
+    with open(os.path.join(args.info_dir, 'model_info.json'), 'w') as f:
+        json.dump(feature_info, f)
+    with open(os.path.join(args.info_dir, 'user_preferences.json'), 'w') as f:
+        json.dump(user_preferences, f)
+
+    write_serving_artifacts(model_path, model, room_lookup, user_preferences)
+    if args.mode == 'window':
+        joblib.dump(encoder, os.path.join(args.encoder_dir, 'encoder.pkl'))
+    with open(model_path, 'wb') as f:
+        pickle.dump(model, f)
+
+    rows = mark['rows'] + len(new)
+    last_start_time = max(pd.Timestamp(mark['last_start_time']), new['start_time'].max()) \
+        if mark['last_start_time'] else new['start_time'].max()
+    save_training_state(args.models_dir, csv_mark(args.csv, end_offset, rows, last_start_time), model_path,
+                        args.mode, user_stats, window=window, n_estimators=model.n_estimators)
+
+    log_file_path = os.path.join(args.logs_dir, f"training_{timestamp}.log")
+    with open(log_file_path, 'w') as log_file:
+        log_file.write(f"Model Training Log - {timestamp} ({args.mode})\n")
+        log_file.write(f"New Records: {len(new)} (read in {load_seconds:.2f}s), Total Records: {rows}\n")
+        if args.mode == 'warm_start':
+            log_file.write(f"Trees: {n_trees_before} + {args.trees} -> {len(model.estimators_)}; "
+                           f"{unknown_users} new users unknown to the encoder\n")
+        else:
+            log_file.write(f"Window: {len(window)} bookings over the last {args.window_days} days\n")
+        log_file.write(f"Fit: {fit_seconds:.2f}s\n")
+        log_file.write(f"User Preferences: {len(user_preferences)} users ranked by {preference_ranking}\n")
+        log_file.write(f"Success Rate (target mean): {train_df['target'].mean() * 100:.2f}%\n")
+        log_file.write(f"Accuracy Score (held-out 20%): {accuracy * 100:.2f}%\n\n")
+        log_file.write("Classification Report:\n")
+        log_file.write(report)
+    print(f"✅ {os.path.basename(model_path)} ({args.mode}, {model.n_estimators} trees) in {fit_seconds:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
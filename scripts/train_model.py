@@ -1,9 +1,14 @@
+"""Full training run: fit the encoder and forest on the whole bookings CSV and publish every artifact.
+
+    python train_model.py --csv ../data/dataset.csv
+"""
+import argparse
 import pickle
 
-import pandas as pd
 import os
+import sys
+import time
 from sklearn.metrics import accuracy_score
-from sklearn.preprocessing import OneHotEncoder
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
@@ -11,123 +16,168 @@ import joblib
 import json
 from datetime import datetime
 
-# generating a time stamp
-timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M')
-
-# models directory
-models_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
-# encoder directory
-encoder_dir = os.path.join(os.path.dirname(__file__), '..', 'encoder')
-
-# Load the dataset
-df = pd.read_csv("../data/dataset.csv", parse_dates=["start_time", "end_time"])
-
-# Create binary target label
-df['target'] = ((df['overloaded'] == 0) &
-                (df['conflict_flag'] == 0) &
-                (df['anomaly_flag'] == 0)).astype(int)
-
-# Features used for training
-features = [
-    'user_id', 'purpose', 'room_type',
-    'has_projector', 'has_whiteboard', 'attendees', 'room_capacity',
-    'hour_of_day', 'day_of_week', 'is_weekend', 'is_preferred_room',
-    'capacity_utilization', 'season'
-]
-
-X_raw = df[features]
-y = df['target']
-
-# Split categorical and numerical features
-X_cat = X_raw[['user_id', 'purpose', 'room_type']]
-X_num = X_raw.drop(columns=X_cat.columns)
-
-# One-hot encode categorical features
-encoder = OneHotEncoder(handle_unknown='ignore')
-X_encoded_cat = pd.DataFrame(
-    encoder.fit_transform(X_cat).toarray(),
-    columns=encoder.get_feature_names_out(X_cat.columns)
-)
-
-# Combine encoded categorical and numerical features
-X_encoded = pd.concat([X_encoded_cat, X_num.reset_index(drop=True)], axis=1)
-
-# Train/test split
-X_train, X_test, y_train, y_test = train_test_split(X_encoded, y, test_size=0.2, random_state=42)
-
-# Train Random Forest model
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
-
-# Evaluate model
-y_pred = model.predict(X_test)
-accuracy = accuracy_score(y_test, y_pred)
-report = classification_report(y_test, y_pred)
-
-
-json_dir = os.path.join(os.path.dirname(__file__), '..', 'model_info')
-
-# Create room lookup dictionary
-room_info = df[['room_id', 'room_capacity', 'room_type', 'has_projector', 'has_whiteboard']].drop_duplicates()
-room_lookup = room_info.set_index('room_id').to_dict('index')
-
-# Convert boolean values to native Python types for JSON
-room_lookup_json = {
-    room_id: {
-        'room_capacity': int(info['room_capacity']),
-        'room_type': str(info['room_type']),
-        'has_projector': bool(info['has_projector']),
-        'has_whiteboard': bool(info['has_whiteboard'])
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from serving_artifacts import write_serving_artifacts
+from artifact_builder import RANKINGS, build_room_lookup, preference_stats, rank_preferences
+from training_data import load_training_data
+from training_features import encode_training_features, fit_input
+from training_state import csv_mark, save_training_state
+from model_selection import format_table, latency_request, load_candidates, select_model
+
+base_dir = os.path.join(os.path.dirname(__file__), '..')
+
+
+def train(csv_path: str, models_dir: str, info_dir: str, encoder_dir: str, logs_dir: str):
+    """Train on csv_path and write the model, encoder, model info and log to the given directories"""
+    # generating a time stamp
+    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M')
+
+    # Order of each user's preferred rooms: first_seen, frequency or recency
+    preference_ranking = os.getenv('PREFERENCE_RANKING', 'first_seen')
+    if preference_ranking not in RANKINGS:
+        raise ValueError(f"PREFERENCE_RANKING must be one of {RANKINGS}, got {preference_ranking!r}")
+
+    # Fit several candidate forests and keep the most accurate within a p99 scoring latency budget (see model_selection.py)
+    model_selection = os.getenv('MODEL_SELECTION', '0') == '1'
+    latency_budget_ms = float(os.getenv('MODEL_LATENCY_BUDGET_MS', '50'))
+    model_candidates = load_candidates(os.getenv('MODEL_CANDIDATES_FILE')) if model_selection else None
+
+    # Load the training columns of the dataset (from the Parquet cache when the CSV has not changed)
+    csv_size = os.path.getsize(csv_path)
+    load_started = time.perf_counter()
+    df = load_training_data(csv_path)
+    load_seconds = time.perf_counter() - load_started
+
+    # Create binary target label
+    df['target'] = ((df['overloaded'] == 0) &
+                    (df['conflict_flag'] == 0) &
+                    (df['anomaly_flag'] == 0)).astype(int)
+
+    # Features used for training
+    features = [
+        'user_id', 'purpose', 'room_type',
+        'has_projector', 'has_whiteboard', 'attendees', 'room_capacity',
+        'hour_of_day', 'day_of_week', 'is_weekend', 'is_preferred_room',
+        'capacity_utilization', 'season'
+    ]
+
+    y = df['target']
+
+    # One-hot encode the categorical features into a sparse matrix (never densified)
+    categorical_features = ['user_id', 'purpose', 'room_type']
+    encoder, X_encoded = encode_training_features(df, features, categorical_features)
+
+    # Train/test split
+    X_train, X_test, y_train, y_test = train_test_split(X_encoded, y, test_size=0.2, random_state=42)
+
+    # Create room lookup dictionary
+    room_lookup_json = build_room_lookup(df)
+
+    # Train Random Forest model
+    fit_started = time.perf_counter()
+    selection = None
+    if model_selection:
+        # Latency is timed on one request's candidates, compiled as the API compiles them
+        compiler, X_batch = latency_request(
+            encoder, {'features': features, 'categorical_features': categorical_features}, room_lookup_json)
+        model, selection = select_model(
+            X_train, y_train, compiler, X_batch, latency_budget_ms=latency_budget_ms,
+            candidates=model_candidates,
+            accuracy_tolerance=float(os.getenv('MODEL_ACCURACY_TOLERANCE', '0.002')),
+            prune=os.getenv('MODEL_PRUNE', '1') == '1',
+            prune_tolerance=float(os.getenv('MODEL_PRUNE_TOLERANCE', '0.02')),
+            backend=os.getenv('INFERENCE_BACKEND', 'sklearn'),
+            workers=int(os.getenv('MODEL_SELECTION_WORKERS', '0')) or None)
+    else:
+        model = RandomForestClassifier(n_estimators=100, random_state=42)
+        model.fit(fit_input(X_train), y_train)
+    fit_seconds = time.perf_counter() - fit_started
+
+    # Evaluate model
+    y_pred = model.predict(X_test)
+    accuracy = accuracy_score(y_test, y_pred)
+    report = classification_report(y_test, y_pred)
+
+
+    # Save room_lookup.json
+    with open(os.path.join(info_dir, 'room_lookup.json'), 'w') as f:
+        json.dump(room_lookup_json, f)
+
+    # Save model feature info
+    feature_info = {
+        'features': features,
+        'categorical_features': categorical_features,
+        'model_version': '1.0',
+        'trained_date': datetime.now().isoformat(),
+        'training_mode': 'full'
     }
-    for room_id, info in room_lookup.items()
-}
-
-
-# Save room_lookup.json
-with open(os.path.join(json_dir, 'room_lookup.json'), 'w') as f:
-    json.dump(room_lookup_json, f, indent=2)
-
-# Save model feature info
-feature_info = {
-    'features': features,
-    'categorical_features': ['user_id', 'purpose', 'room_type'],
-    'model_version': '1.0',
-    'trained_date': datetime.now().isoformat()
-}
-with open(os.path.join(json_dir, 'model_info.json'), 'w') as f:
-    json.dump(feature_info, f, indent=2)
-
-
-
-# Create a user preferences dictionary
-user_preferences = {}
-for user_id in df['user_id'].unique():
-    preferred_rooms = df[df['user_id'] == user_id]['room_id'].unique().tolist()
-    user_preferences[str(user_id)] = preferred_rooms
-
-# Save user_preferences.json
-with open(os.path.join(json_dir, 'user_preferences.json'), 'w') as f:
-    json.dump(user_preferences, f, indent=2)
-
-
-# Save model with timestamp
-model_path = os.path.join(models_dir, f'model_{timestamp}.pkl')
-with open(model_path, 'wb') as f:
-    pickle.dump(model, f)
-
-# save the encoder
-joblib.dump(encoder, os.path.join(encoder_dir, 'encoder.pkl'))
-
-
-# logs directory
-logs_dir = os.path.join(os.path.dirname(__file__), '..', 'logs')
-
-log_file_path = os.path.join(logs_dir, f"training_{timestamp}.log")
-# Write to log file
-with open(log_file_path, 'w') as log_file:
-    log_file.write(f"Model Training Log - {timestamp}\n")
-    log_file.write(f"Total Records: {len(df)}\n")
-    log_file.write(f"Success Rate (target mean): {df['target'].mean() * 100:.2f}%\n")
-    log_file.write(f"Accuracy Score: {accuracy * 100:.2f}%\n\n")
-    log_file.write("Classification Report:\n")
-    log_file.write(report)
+    if selection is not None:
+        feature_info['model_selection'] = selection
+    with open(os.path.join(info_dir, 'model_info.json'), 'w') as f:
+        json.dump(feature_info, f)
+
+
+
+    # Create a user preferences dictionary in one grouped pass, each user's rooms ranked by PREFERENCE_RANKING
+    artifacts_started = time.perf_counter()
+    user_stats = preference_stats(df)
+    user_preferences = rank_preferences(user_stats, rank_by=preference_ranking)
+    artifacts_seconds = time.perf_counter() - artifacts_started
+
+    # Save user_preferences.json
+    with open(os.path.join(info_dir, 'user_preferences.json'), 'w') as f:
+        json.dump(user_preferences, f)
+
+
+    # Save model with timestamp
+    model_path = os.path.join(models_dir, f'model_{timestamp}.pkl')
+
+    # Save memory-mappable serving arrays first, so they exist once the model is visible
+    write_serving_artifacts(model_path, model, room_lookup_json, user_preferences)
+
+    with open(model_path, 'wb') as f:
+        pickle.dump(model, f)
+
+    # save the encoder
+    joblib.dump(encoder, os.path.join(encoder_dir, 'encoder.pkl'))
+
+    # Record how far into the CSV this model got, for scripts/train_incremental.py
+    save_training_state(models_dir, csv_mark(csv_path, csv_size, len(df), df['start_time'].max()), model_path, 'full',
+                        user_stats, n_estimators=model.n_estimators)
+
+
+    log_file_path = os.path.join(logs_dir, f"training_{timestamp}.log")
+    # Write to log file
+    with open(log_file_path, 'w') as log_file:
+        log_file.write(f"Model Training Log - {timestamp}\n")
+        log_file.write(f"Total Records: {len(df)}\n")
+        log_file.write(f"Data Load: {load_seconds:.2f}s, {df.memory_usage(deep=True).sum() / 1e6:.1f} MB in memory\n")
+        log_file.write(f"Features: {X_encoded.shape[1]} columns, {X_encoded.nnz} non-zeros; Fit: {fit_seconds:.2f}s\n")
+        log_file.write(f"User Preferences: {len(user_preferences)} users ranked by {preference_ranking} in {artifacts_seconds:.2f}s\n")
+        log_file.write(f"Success Rate (target mean): {df['target'].mean() * 100:.2f}%\n")
+        log_file.write(f"Accuracy Score: {accuracy * 100:.2f}%\n\n")
+        if selection is not None:
+            log_file.write(f"Model Selection: {selection['selected']} "
+                           f"(p99 budget {selection['latency_budget_p99_ms']:g} ms on {selection['latency_batch_rows']} rows, "
+                           f"{selection['inference_backend']} backend"
+                           f"{'' if selection['budget_met'] else '; no candidate met it, fastest taken'}), "
+                           f"refit on {selection['refit']['rows']} rows with {selection['refit']['n_estimators']} trees "
+                           f"in {selection['refit']['fit_seconds']:.2f}s\n")
+            log_file.write(format_table(selection) + "\n")
+        log_file.write("Classification Report:\n")
+        log_file.write(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--csv', default=os.path.join(base_dir, 'data', 'dataset.csv'))
+    parser.add_argument('--models-dir', default=os.path.join(base_dir, 'models'))
+    parser.add_argument('--info-dir', default=os.path.join(base_dir, 'model_info'))
+    parser.add_argument('--encoder-dir', default=os.path.join(base_dir, 'encoder'))
+    parser.add_argument('--logs-dir', default=os.path.join(base_dir, 'logs'))
+    args = parser.parse_args()
+    train(args.csv, args.models_dir, args.info_dir, args.encoder_dir, args.logs_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""Typed, chunked loading of the booking history for training.
+
+Only the columns training uses are read (the free-text ``description`` and
+other unused columns are skipped), each with an explicit compact dtype, in
+chunks of ``chunksize`` rows. Incremental training reads only the rows
+appended since its last run with ``read_training_csv_from``. The parsed frame is cached as Parquet next to
+the CSV, keyed on the CSV's size and modification time, so repeated cron runs
+skip CSV parsing. The cache needs pyarrow; without it every run parses the CSV.
+"""
+import hashlib
+import io
+import json
+import os
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+# Bump when the columns or dtypes below change, to invalidate existing caches
+CACHE_VERSION = 1
+DEFAULT_CHUNKSIZE = 500_000
+# Bytes hashed at each end of the consumed part of the CSV to detect rewrites
+FINGERPRINT_BYTES = 1 << 20
+
+# Columns read for training and their dtypes; start_time is parsed separately
+TRAINING_DTYPES = {
+    'user_id': 'int32',
+    'room_id': 'category',
+    'room_capacity': 'int16',
+    'room_type': 'category',
+    'has_projector': 'bool',
+    'has_whiteboard': 'bool',
+    'purpose': 'category',
+    'attendees': 'int16',
+    'overloaded': 'int8',
+    'conflict_flag': 'int8',
+    'anomaly_flag': 'int8',
+    'is_preferred_room': 'int8',
+    'day_of_week': 'int8',
+    'hour_of_day': 'int8',
+    'is_weekend': 'int8',
+    # The forest works in float32, so this loses nothing the model would see
+    'capacity_utilization': 'float32',
+    'season': 'int8',
+}
+DATE_COLUMNS = ['start_time']
+
+
+def cache_path_for(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+
+def _source_key(csv_path: str) -> Dict[str, int]:
+    stat = os.stat(csv_path)
+    return {'version': CACHE_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def concat_training_frames(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate frames of training columns, keeping categorical columns categorical across differing categories"""
+    if len(chunks) == 1:
+        return chunks[0]
+    for column in [name for name, dtype in TRAINING_DTYPES.items() if dtype == 'category']:
+        categories = pd.api.types.union_categoricals([chunk[column] for chunk in chunks]).categories
+        for chunk in chunks:
+            chunk[column] = chunk[column].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_training_csv(csv_path, chunksize: int = DEFAULT_CHUNKSIZE) -> pd.DataFrame:
+    """Parse the training columns of the bookings CSV (a path or a file object) with compact dtypes"""
+    reader = pd.read_csv(csv_path, usecols=list(TRAINING_DTYPES) + DATE_COLUMNS, dtype=TRAINING_DTYPES,
+                         parse_dates=DATE_COLUMNS, date_format='ISO8601', chunksize=chunksize)
+    df = concat_training_frames(list(reader))
+    # Column order as in TRAINING_DTYPES, whatever the CSV order
+    return df[list(TRAINING_DTYPES) + DATE_COLUMNS]
+
+
+def read_training_csv_from(csv_path: str, offset: int,
+                           chunksize: int = DEFAULT_CHUNKSIZE) -> Tuple[pd.DataFrame, int]:
+    """Parse only the rows appended after byte ``offset`` (the end of a previous read).
+
+    Returns the new rows and the byte offset they end at. A last line still
+    being written (no trailing newline yet) is left for the next read.
+    """
+    with open(csv_path, 'rb') as f:
+        header = f.readline()
+        f.seek(max(offset, len(header)))
+        tail = f.read()
+    complete = tail.rfind(b'\n') + 1
+    return read_training_csv(io.BytesIO(header + tail[:complete]), chunksize), max(offset, len(header)) + complete
+
+
+def csv_fingerprint(csv_path: str, offset: int) -> str:
+    """Hash of the start of the CSV and of the bytes just before ``offset``.
+
+    Appending rows keeps it unchanged; regenerating or rewriting the file
+    almost always changes it.
+    """
+    digest = hashlib.sha1()
+    with open(csv_path, 'rb') as f:
+        digest.update(f.read(min(offset, FINGERPRINT_BYTES)))
+        f.seek(max(offset - FINGERPRINT_BYTES, 0))
+        digest.update(f.read(min(offset, FINGERPRINT_BYTES)))
+    return digest.hexdigest()
+
+
+def load_training_data(csv_path: str, use_cache: bool = True,
+                       chunksize: int = DEFAULT_CHUNKSIZE) -> pd.DataFrame:
+    """Training columns of the bookings CSV, from the Parquet cache when it is up to date"""
+    cache_path = cache_path_for(csv_path)
+    key_path = cache_path + '.json'
+    key = _source_key(csv_path)
+
+    if use_cache and os.path.exists(cache_path) and os.path.exists(key_path):
+        with open(key_path, 'r') as f:
+            if json.load(f) == key:
+                try:
+                    return pd.read_parquet(cache_path)
+                except ImportError:
+                    pass
+
+    df = read_training_csv(csv_path, chunksize)
+
+    if use_cache:
+        try:
+            df.to_parquet(cache_path + '.tmp', index=False)
+        except ImportError:
+            print("⚠️ pyarrow is not installed, training data will not be cached")
+        else:
+            os.replace(cache_path + '.tmp', cache_path)
+            with open(key_path, 'w') as f:
+                json.dump(key, f)
+    return df
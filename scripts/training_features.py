@@ -0,0 +1,47 @@
+"""Sparse model input for training.
+
+The one-hot encoding of the categorical features is kept as the sparse matrix
+the encoder returns, and the numerical features are appended as sparse
+columns, so memory grows with the non-zero entries (about one per categorical
+feature per row) rather than rows x (users + purposes + room types). Columns
+are in the order the serving FeatureCompiler writes them: the encoded
+categories, then the numerical features in ``features`` order.
+
+The forest's sparse splitter is several times slower than the dense one on the
+always-populated numerical columns, so ``fit_input`` hands the forest a dense
+float32 copy while that stays under ``DENSE_FIT_MAX_MB`` and the sparse matrix
+beyond it, where densifying is what used to exhaust memory.
+"""
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.preprocessing import OneHotEncoder
+
+# Largest dense float32 fit matrix, in MB, before fitting on the sparse matrix instead
+DENSE_FIT_MAX_MB = 256
+
+
+def encode_training_features(df: pd.DataFrame, features: List[str], categorical_features: List[str],
+                             encoder: OneHotEncoder = None) -> Tuple[OneHotEncoder, sp.csr_matrix]:
+    """Fit the encoder (unless a fitted one is given) and build the CSR feature matrix.
+
+    The matrix is float32, the dtype the forest converts its input to, so
+    fitting does not make another full copy to change the dtype.
+    """
+    numerical_features = [f for f in features if f not in categorical_features]
+    if encoder is None:
+        encoder = OneHotEncoder(handle_unknown='ignore', dtype=np.float32)
+        X_cat = encoder.fit_transform(df[categorical_features])
+    else:
+        X_cat = encoder.transform(df[categorical_features])
+    X_num = sp.csr_matrix(df[numerical_features].to_numpy(dtype=np.float32))
+    return encoder, sp.hstack([X_cat, X_num], format='csr', dtype=np.float32)
+
+
+def fit_input(X: sp.csr_matrix, max_dense_mb: float = DENSE_FIT_MAX_MB):
+    """The matrix to fit the forest on: dense float32 when small enough, else CSC (the sparse splitter's layout)"""
+    if X.shape[0] * X.shape[1] * 4 <= max_dense_mb * 1e6:
+        return X.toarray()
+    return X.tocsc()
@@ -0,0 +1,103 @@
+"""Where training left off, kept next to the models for incremental retraining.
+
+Every training run, full or incremental, writes ``models/training_state/``:
+
+- ``state.json``: the high-water mark in the bookings CSV (byte offset and row
+  count consumed, a fingerprint of the consumed bytes and the last
+  ``start_time``), the model it produced and how it was trained
+- ``preference_stats.npz``: per (user, room) booking stats, from which
+  user_preferences.json is ranked and into which new bookings are merged
+- ``window.pkl``: the bookings of the sliding window, only in window mode
+
+The next incremental run reads only the rows after the offset. If the CSV was
+rewritten (it shrank or the fingerprint changed) or the latest model is not
+the one recorded, it rebuilds from scratch instead.
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from training_data import csv_fingerprint
+
+STATE_FORMAT_VERSION = 1
+STATS_COLUMNS = ['user_id', 'room_id', 'first', 'count', 'last']
+
+
+def state_dir_for(models_dir: str) -> str:
+    return os.path.join(models_dir, 'training_state')
+
+
+def csv_mark(csv_path: str, offset: int, rows: int, last_start_time) -> Dict[str, Any]:
+    """High-water mark after consuming ``rows`` rows, up to byte ``offset``, of the CSV"""
+    return {
+        'csv_path': os.path.abspath(csv_path),
+        'offset': int(offset),
+        'rows': int(rows),
+        'fingerprint': csv_fingerprint(csv_path, offset),
+        'last_start_time': pd.Timestamp(last_start_time).isoformat() if pd.notna(last_start_time) else None,
+    }
+
+
+def is_appended(csv_path: str, state: Dict[str, Any]) -> bool:
+    """Whether the CSV still starts with exactly the bytes the state consumed"""
+    mark = state['csv']
+    return (os.path.abspath(csv_path) == mark['csv_path']
+            and os.path.getsize(csv_path) >= mark['offset']
+            and csv_fingerprint(csv_path, mark['offset']) == mark['fingerprint'])
+
+
+def load_training_state(models_dir: str) -> Optional[Dict[str, Any]]:
+    """The recorded state with its preference stats, or None if there is none"""
+    state_dir = state_dir_for(models_dir)
+    state_path = os.path.join(state_dir, 'state.json')
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path, 'r') as f:
+        state = json.load(f)
+    if state.get('format_version') != STATE_FORMAT_VERSION:
+        return None
+    with np.load(os.path.join(state_dir, 'preference_stats.npz'), allow_pickle=False) as arrays:
+        state['preference_stats'] = pd.DataFrame({name: arrays[name] for name in STATS_COLUMNS})
+    return state
+
+
+def load_window(models_dir: str, state: Dict[str, Any]) -> Optional[pd.DataFrame]:
+    """The stored sliding-window bookings, if they reach the state's high-water mark"""
+    window_path = os.path.join(state_dir_for(models_dir), 'window.pkl')
+    if state.get('window_rows') != state['csv']['rows'] or not os.path.exists(window_path):
+        return None
+    return pd.read_pickle(window_path)
+
+
+def save_training_state(models_dir: str, mark: Dict[str, Any], model_file: str, mode: str,
+                        preference_stats: pd.DataFrame, window: pd.DataFrame = None, **details):
+    """Replace the recorded state; call once the model it describes is published"""
+    state_dir = state_dir_for(models_dir)
+    tmp_dir = state_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    np.savez(os.path.join(tmp_dir, 'preference_stats.npz'),
+             **{name: preference_stats[name].to_numpy(dtype=str if name == 'room_id' else None)
+                for name in STATS_COLUMNS})
+    state = {
+        'format_version': STATE_FORMAT_VERSION,
+        'csv': mark,
+        'model_file': os.path.basename(model_file),
+        'mode': mode,
+        'updated_at': datetime.now().isoformat(),
+        **details,
+    }
+    if window is not None:
+        window.to_pickle(os.path.join(tmp_dir, 'window.pkl'))
+        state['window_rows'] = mark['rows']
+    with open(os.path.join(tmp_dir, 'state.json'), 'w') as f:
+        json.dump(state, f)
+
+    shutil.rmtree(state_dir, ignore_errors=True)
+    os.rename(tmp_dir, state_dir)
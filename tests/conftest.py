@@ -0,0 +1,16 @@
+"""Shared fixtures: small synthetic artifacts from benchmarks/synthetic.py, which also puts app/ and scripts/ on the path"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from synthetic import build_artifacts  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def artifact_dirs(tmp_path_factory):
+    """Artifacts of a small forest; few trees, so many candidates tie on their score"""
+    return build_artifacts(str(tmp_path_factory.mktemp('artifacts')), n_users=30, n_rooms=8,
+                           n_rows=3000, n_estimators=8)
@@ -0,0 +1,51 @@
+"""Vectorized candidate generation and ranking against the original per-candidate path"""
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from reference import legacy_candidate_slots, legacy_recommend_slots, same_ranking
+from recommendation_service import RecommendationService
+
+REQUESTS = [
+    dict(user_id=7, purpose='Team meeting', attendees=6,
+         target_date=datetime(2025, 3, 14), target_hours=list(range(8, 19)), top_k=10),
+    dict(user_id=12, purpose='Interview', attendees=2,
+         target_date=datetime(2025, 8, 2, 15, 30), target_hours=[9, 13, 17], top_k=50),
+    dict(user_id=999, purpose='Unknown purpose', attendees=40,
+         target_date=datetime(2025, 12, 28), target_hours=list(range(8, 19)), top_k=5),
+    # More slots than the forest has distinct scores, and top_k cutting through ties
+    dict(user_id=3, purpose='Demo', attendees=4,
+         target_date=datetime(2025, 6, 4), target_hours=list(range(0, 24)), top_k=37),
+]
+
+
+@pytest.fixture(scope='module')
+def service(artifact_dirs):
+    return RecommendationService(**artifact_dirs)
+
+
+@pytest.mark.parametrize('request_args', REQUESTS)
+def test_candidate_slots_match_legacy(service, request_args):
+    args = {k: v for k, v in request_args.items() if k != 'top_k'}
+    pd.testing.assert_frame_equal(service.get_candidate_slots(**args).reset_index(drop=True),
+                                  legacy_candidate_slots(service, **args))
+
+
+@pytest.mark.parametrize('request_args', REQUESTS)
+def test_recommend_slots_match_legacy(service, request_args):
+    assert same_ranking(service.recommend_slots(**request_args), legacy_recommend_slots(service, **request_args))
+
+
+def test_ties_are_covered(service):
+    scores = [r['success_probability'] for r in service.recommend_slots(**REQUESTS[-1])]
+    assert len(set(scores)) < len(scores)
+
+
+@pytest.mark.parametrize('target_hours', [[17, 9, 13], [9, 9, 13, 17, 13], [20, 8, 8, 8]])
+def test_duplicate_and_unordered_hours(service, target_hours):
+    request = dict(user_id=12, purpose='Interview', attendees=2, target_date=datetime(2025, 8, 4), top_k=20)
+    actual = service.recommend_slots(target_hours=target_hours, **request)
+    # Hours are answered sorted and without duplicates
+    assert same_ranking(actual, legacy_recommend_slots(service, target_hours=sorted(set(target_hours)), **request))
+    assert len({(r['room_id'], r['start_time']) for r in actual}) == len(actual)
@@ -0,0 +1,41 @@
+"""CompiledForest probabilities against RandomForestClassifier.predict_proba"""
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from compiled_forest import CompiledForest
+from recommendation_service import RecommendationService
+
+
+@pytest.mark.parametrize('n_classes', [2, 3])
+def test_dense_input_matches_predict_proba(n_classes):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 12)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] * X[:, 2] > 0).astype(int) + (n_classes == 3) * (X[:, 3] > 1)
+    model = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+    X_test = rng.normal(size=(700, 12)).astype(np.float32)
+
+    compiled = CompiledForest.from_sklearn(model)
+    np.testing.assert_allclose(compiled.predict_proba(X_test), model.predict_proba(X_test), rtol=0, atol=1e-12)
+    assert compiled.apply(X_test).shape == (20, 700)
+
+
+def test_compact_input_matches_predict_proba(artifact_dirs):
+    service = RecommendationService(**artifact_dirs)
+    artifacts = service.artifacts
+    compiler = artifacts.feature_compiler
+    assert compiler.compact
+    blocks = [service._candidate_columns(artifacts, user_id, purpose, 5, datetime(2025, 3, day), list(range(24)))
+              for user_id, purpose, day in [(1, 'Demo', 10), (30, 'Workshop', 15), (999, 'Unknown', 16)]]
+    X = service._feature_matrix(artifacts, blocks)
+
+    compiled = CompiledForest.from_sklearn(service.model).with_compact_input(*compiler.column_slots())
+    expected = service.model.predict_proba(compiler.expand(X))
+    np.testing.assert_allclose(compiled.predict_proba(X.astype(np.float32)), expected, rtol=0, atol=1e-12)
+
+    # The sparse expansion is the one-hot matrix of the unnarrowed compiler
+    one_hot = artifacts.build_feature_compiler()
+    np.testing.assert_array_equal(compiler.expand(X).toarray(),
+                                  np.vstack([one_hot.compile(columns) for columns in blocks]).astype(np.float32))